@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks of dfactory seeders, handlers, writers and pipelines
+
+run with python -m benchmarks, see python -m benchmarks --help
+"""
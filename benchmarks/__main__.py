@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmark command line
+
+python -m benchmarks --output results.json
+python -m benchmarks --baseline baseline.json --threshold 0.1
+"""
+import argparse
+import platform
+import sys
+
+from . import micro, pipelines  # noqa: F401  pylint: disable=unused-import
+from .runner import run_benchmarks, save_results, load_results, compare
+
+
+def main(argv=None) -> int:
+    """
+    run benchmarks
+    :param argv: command line arguments
+    :return: exit code, 1 if any regression against baseline
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000, help="number of generated items")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of every benchmark")
+    parser.add_argument("--fields", type=int, default=8, help="fields of generated items")
+    parser.add_argument("--cardinality", type=int, default=1000,
+                        help="distinct values of generated fields")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of generated data")
+    parser.add_argument("--filter", dest="pattern", help="regex to select benchmarks by name")
+    parser.add_argument("--output", help="json file to save results")
+    parser.add_argument("--baseline", help="json results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed relative throughput loss against baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.size, args.repeat, args.pattern, args.fields,
+                             args.cardinality, args.seed)
+    for name, result in results.items():
+        print(f"{name:<40} {result['items_per_second']:>14.1f} items/s {result['best']:>10.4f}s")
+    if args.output is not None:
+        save_results(results, args.output, size=args.size, repeat=args.repeat, fields=args.fields,
+                     cardinality=args.cardinality, seed=args.seed,
+                     python=platform.python_version())
+    if args.baseline is None:
+        return 0
+    rows = compare(results, load_results(args.baseline), args.threshold)
+    regressions = [row for row in rows if row["regression"]]
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:<40} {row['ratio']:>8.3f} {flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
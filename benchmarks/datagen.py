@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+seeded synthetic data generators
+"""
+import json
+import random
+import string
+from typing import Dict, List
+
+
+class DataGenerator:
+    """
+    generate rows of string fields with a given cardinality,
+    the same seed always generates the same data
+    """
+
+    def __init__(self, fields: int = 8, cardinality: int = 1000, seed: int = 0):
+        """
+        :param fields: number of fields of a row, the first one is a unique id
+        :param cardinality: number of distinct values of the other fields
+        :param seed: random seed
+        """
+        self.fields = fields
+        self.cardinality = cardinality
+        self.seed = seed
+        self.keys = [f"f{i}" for i in range(fields)]
+        rand = random.Random(seed)
+        self.values = [["".join(rand.choices(string.ascii_lowercase, k=rand.randint(3, 12)))
+                        for _ in range(cardinality)] for _ in range(fields)]
+
+    def rows(self, count: int) -> List[Dict[str, str]]:
+        """
+        generate rows
+        :param count: number of rows
+        :return: list of dict
+        """
+        rand = random.Random(self.seed + 1)
+        values = self.values
+        rows = []
+        for index in range(count):
+            row = {self.keys[0]: str(index)}
+            for i in range(1, self.fields):
+                row[self.keys[i]] = values[i][rand.randrange(self.cardinality)]
+            rows.append(row)
+        return rows
+
+    def mapper(self, field: int = 1) -> Dict[str, str]:
+        """
+        a mapper from every value of a field to a new value
+        :param field: field index
+        :return: dict
+        """
+        return {value: value.upper() for value in self.values[field]}
+
+    def write_csv(self, filename: str, count: int, separator: str = ","):
+        """
+        write rows to csv file without header
+        :param filename: output file
+        :param count: number of rows
+        :param separator: field separator
+        :return: None
+        """
+        with open(filename, "w", encoding="utf-8") as fout:
+            for row in self.rows(count):
+                fout.write(separator.join(row.values()) + "\n")
+
+    def write_jsonl(self, filename: str, count: int):
+        """
+        write rows to json file one row per line
+        :param filename: output file
+        :param count: number of rows
+        :return: None
+        """
+        with open(filename, "w", encoding="utf-8") as fout:
+            for row in self.rows(count):
+                fout.write(json.dumps(row) + "\n")
+
+    def write_json_object(self, filename: str, count: int):
+        """
+        write rows to json file as one object keyed by the id field
+        :param filename: output file
+        :param count: number of rows
+        :return: None
+        """
+        with open(filename, "w", encoding="utf-8") as fout:
+            json.dump({row[self.keys[0]]: row for row in self.rows(count)}, fout)
+
+    def write_mapper(self, filename: str, field: int = 1):
+        """
+        write mapper of a field to json file
+        :param filename: output file
+        :param field: field index
+        :return: None
+        """
+        with open(filename, "w", encoding="utf-8") as fout:
+            json.dump(self.mapper(field), fout)
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+
+"""
+micro benchmarks of built-in seeders, handlers, matches and writers
+"""
+import os
+
+from dfactory.core import ColumnBatch
+from dfactory.handlers.aggregator import Aggregator
+from dfactory.handlers.converters import DictConverter
+from dfactory.handlers.dedup import Dedup
+from dfactory.handlers.matches import (KeyMatch, DictMatch, TrueMatch, RegexMatch, AndMatch,
+                                       OrMatch, NotMatch)
+from dfactory.handlers.sorter import Sorter
+from dfactory.handlers.updaters import RegexUpdater, MapperUpdater
+from dfactory.seeders import CsvSeeder, FastCsvSeeder, JsonSeeder, RecordSeeder, SqliteSeeder
+from dfactory.utils.jsoncodec import available_codecs, get_codec
+from dfactory.utils.mapperstore import build_mapper_store
+from dfactory.writers import CsvWriter, JsonWriter, PartitionedWriter, RecordWriter, SqliteWriter
+
+from .runner import benchmark
+
+
+def _consume(iterable):
+    for _ in iterable:
+        pass
+
+
+def _handle_all(handle, rows):
+    def run():
+        for row in rows():
+            handle(row)
+
+    return run
+
+
+@benchmark("seeder.csv.line2item")
+def csv_line2item(context):
+    """CsvSeeder.line2item over pre-read lines"""
+    seeder = CsvSeeder(path=context.file("csv"), keys=context.keys)
+    with open(seeder.src_fn, encoding="utf-8") as fin:
+        lines = [line.strip() for line in fin]
+    line2item = seeder.line2item
+
+    def run():
+        for line in lines:
+            line2item(line)
+
+    return len(lines), run
+
+
+@benchmark("seeder.csv.iter")
+def csv_iter(context):
+    """CsvSeeder.iter from file"""
+    seeder = CsvSeeder(path=context.file("csv"), keys=context.keys)
+    return context.size, lambda: _consume(seeder.iter())
+
+
+@benchmark("seeder.fastcsv.iter")
+def fastcsv_iter(context):
+    """FastCsvSeeder.iter from file"""
+    seeder = FastCsvSeeder(path=context.file("csv"), keys=context.keys)
+    return context.size, lambda: _consume(seeder.iter())
+
+
+@benchmark("seeder.fastcsv.batch")
+def fastcsv_batch(context):
+    """FastCsvSeeder.iter_batch from file"""
+    seeder = FastCsvSeeder(path=context.file("csv"), keys=context.keys)
+    return context.size, lambda: _consume(seeder.iter_batch(1000))
+
+
+@benchmark("seeder.json.lines")
+def json_lines(context):
+    """JsonSeeder in list mode"""
+    seeder = JsonSeeder(context.file("jsonl"), is_list=True)
+    return context.size, lambda: _consume(seeder.iter())
+
+
+@benchmark("seeder.json.lines.auto")
+def json_lines_auto(context):
+    """JsonSeeder in list mode with the fastest json codec installed"""
+    seeder = JsonSeeder(context.file("jsonl"), is_list=True, codec="auto")
+    return context.size, lambda: _consume(seeder.iter())
+
+
+@benchmark("seeder.json.object")
+def json_object(context):
+    """JsonSeeder in dict mode"""
+    seeder = JsonSeeder(context.file("json"))
+    return context.size, lambda: _consume(seeder.iter())
+
+
+@benchmark("seeder.sqlite")
+def sqlite_seeder(context):
+    """SqliteSeeder reading a whole table"""
+    path = context.path("seeder.db")
+    if not os.path.exists(path):
+        writer = SqliteWriter(path=path, table="items", keys=context.keys)
+        writer.__enter__()
+        writer.handle_batch(context.rows())
+        writer.__exit__(None, None, None)
+    seeder = SqliteSeeder(path=path, table="items")
+    return context.size, lambda: _consume(seeder.iter_batch(1000))
+
+
+@benchmark("seeder.record")
+def record_seeder(context):
+    """RecordSeeder of a marshal record file"""
+    path = context.path("seeder.rec")
+    if not os.path.exists(path):
+        writer = RecordWriter(path=path)
+        writer.__enter__()
+        writer.handle_batch(context.rows())
+        writer.__exit__(None, None, None)
+    seeder = RecordSeeder(path=path)
+    return context.size, lambda: _consume(seeder.iter_batch(1000))
+
+
+@benchmark("handler.dict_converter")
+def dict_converter(context):
+    """DictConverter with a mapper file"""
+    converter = DictConverter(key=context.keys[1], dst="mapped", mapper=context.file("mapper"))
+    return context.size, _handle_all(converter.handle, context.rows)
+
+
+@benchmark("handler.dict_converter.columns")
+def dict_converter_columns(context):
+    """DictConverter on ColumnBatch of 1000 items"""
+    converter = DictConverter(key=context.keys[1], dst="mapped", mapper=context.file("mapper"))
+    rows = context.rows()
+    batches = [ColumnBatch.from_rows(rows[i:i + 1000]) for i in range(0, len(rows), 1000)]
+
+    def run():
+        for batch in batches:
+            converter.handle_batch(batch)
+
+    return len(rows), run
+
+
+@benchmark("handler.dict_converter.store")
+def dict_converter_store(context):
+    """DictConverter with a compiled mapper store"""
+    store = context.path("mapper.dfm")
+    build_mapper_store(context.file("mapper"), store)
+    converter = DictConverter(key=context.keys[1], dst="mapped", mapper=store)
+    return context.size, _handle_all(converter.handle, context.rows)
+
+
+@benchmark("handler.regex_updater")
+def regex_updater(context):
+    """RegexUpdater on one field"""
+    key = context.keys[2]
+    updater = RegexUpdater({key: None}, pattern="[aeiou]+", field=key, replace="_")
+    return context.size, _handle_all(updater.handle, context.rows)
+
+
+@benchmark("handler.mapper_updater")
+def mapper_updater(context):
+    """MapperUpdater on one field"""
+    updater = MapperUpdater({"mapped": None}, {"mapped": {"key": "m", "item_key": context.keys[1]}},
+                            {"m": context.generator.mapper(1)})
+    return context.size, _handle_all(updater.handle, context.rows)
+
+
+def _dedup_benchmark(dedup, rows):
+    def run():
+        dedup.__enter__()
+        try:
+            dedup.handle_batch(rows)
+        finally:
+            dedup.__exit__(None, None, None)
+
+    return len(rows), run
+
+
+@benchmark("handler.dedup")
+def dedup_exact(context):
+    """Dedup on two fields with digests in memory"""
+    return _dedup_benchmark(Dedup(keys=context.keys[1:3]), context.rows())
+
+
+@benchmark("handler.dedup.spill")
+def dedup_spill(context):
+    """Dedup on the unique field with a 1MB budget spilling digests to runs"""
+    return _dedup_benchmark(Dedup(keys=context.keys[:1], memory=1 << 20), context.rows())
+
+
+@benchmark("handler.dedup.bloom")
+def dedup_bloom(context):
+    """Dedup on two fields with a bloom filter of 1% false positives"""
+    dedup = Dedup(keys=context.keys[1:3], mode="bloom", capacity=context.size, error_rate=0.01)
+    return _dedup_benchmark(dedup, context.rows())
+
+
+def _aggregator_benchmark(context, **kwargs):
+    keys = context.keys
+    aggregator = Aggregator(keys=keys[1:3], aggregates={
+        "count": ["count"], "first": ["first", keys[0]], "min": ["min", keys[3]],
+        "max": ["max", keys[4]]}, **kwargs)
+    rows = context.rows()
+
+    def run():
+        aggregator.__enter__()
+        try:
+            aggregator.handle_batch(rows)
+            _consume(aggregator.finish())
+        finally:
+            aggregator.__exit__(None, None, None)
+
+    return len(rows), run
+
+
+@benchmark("handler.aggregator")
+def aggregator_memory(context):
+    """Aggregator of four reducers grouped by two fields"""
+    return _aggregator_benchmark(context)
+
+
+@benchmark("handler.aggregator.spill")
+def aggregator_spill(context):
+    """Aggregator spilling every 1000 groups to partitions"""
+    return _aggregator_benchmark(context, max_groups=1000)
+
+
+def _sorter_benchmark(context, **kwargs):
+    keys = context.keys
+    sorter = Sorter(keys=[keys[1], [keys[0], "desc"]], **kwargs)
+    rows = context.rows()
+
+    def run():
+        sorter.__enter__()
+        try:
+            sorter.handle_batch(list(rows))
+            _consume(sorter.finish())
+        finally:
+            sorter.__exit__(None, None, None)
+
+    return len(rows), run
+
+
+@benchmark("handler.sorter")
+def sorter_memory(context):
+    """Sorter by one ascending and one descending field in memory"""
+    return _sorter_benchmark(context)
+
+
+@benchmark("handler.sorter.spill")
+def sorter_spill(context):
+    """Sorter merging runs of 10000 items"""
+    return _sorter_benchmark(context, buffer_size=10000)
+
+
+@benchmark("handler.sorter.workers")
+def sorter_workers(context):
+    """Sorter building runs of 10000 items in two worker processes"""
+    return _sorter_benchmark(context, buffer_size=10000, workers=2)
+
+
+def _match_benchmark(name, make):
+    @benchmark(f"match.{name}")
+    def run_match(context):
+        match = make(context).match
+        rows = context.rows()
+
+        def run():
+            for row in rows:
+                match(row)
+
+        return len(rows), run
+
+    return run_match
+
+
+def _value(context, field=1, index=0):
+    return context.generator.values[field][index]
+
+
+_match_benchmark("key", lambda c: KeyMatch(c.keys[1], _value(c)))
+_match_benchmark("key_list", lambda c: KeyMatch(c.keys[1], [_value(c, 1, i) for i in range(10)]))
+_match_benchmark("dict", lambda c: DictMatch({c.keys[1]: _value(c), c.keys[2]: _value(c, 2)}))
+_match_benchmark("true", lambda c: TrueMatch())
+_match_benchmark("regex", lambda c: RegexMatch(c.keys[1], "[a-m]"))
+_match_benchmark("and", lambda c: AndMatch(KeyMatch(c.keys[1], _value(c)), TrueMatch()))
+_match_benchmark("or", lambda c: OrMatch(KeyMatch(c.keys[1], _value(c)), TrueMatch()))
+_match_benchmark("not", lambda c: NotMatch(KeyMatch(c.keys[1], _value(c))))
+
+
+def _writer_benchmark(writer, rows):
+    def run():
+        writer.__enter__()
+        try:
+            for row in rows:
+                writer.handle(row)
+        finally:
+            writer.__exit__(None, None, None)
+
+    return len(rows), run
+
+
+@benchmark("writer.csv")
+def csv_writer(context):
+    """CsvWriter with headers"""
+    writer = CsvWriter(path=context.path("out.csv"), headers=context.keys)
+    return _writer_benchmark(writer, context.rows())
+
+
+@benchmark("writer.csv.buffered")
+def csv_writer_buffered(context):
+    """CsvWriter collecting lines into 64KB writes"""
+    writer = CsvWriter(path=context.path("out.csv"), headers=context.keys, buffer_size=1 << 16)
+    return _writer_benchmark(writer, context.rows())
+
+
+@benchmark("writer.csv.background")
+def csv_writer_background(context):
+    """CsvWriter writing lines in a background thread"""
+    writer = CsvWriter(path=context.path("out.csv"), headers=context.keys, background=True)
+    return _writer_benchmark(writer, context.rows())
+
+
+@benchmark("writer.csv.typed")
+def csv_writer_typed(context):
+    """CsvWriter with headers declared as str fields"""
+    writer = CsvWriter(path=context.path("out.csv"), headers=context.keys,
+                       types={key: "str" for key in context.keys})
+    return _writer_benchmark(writer, context.rows())
+
+
+@benchmark("writer.json")
+def json_writer(context):
+    """JsonWriter of whole items"""
+    writer = JsonWriter(path=context.path("out.jsonl"))
+    return _writer_benchmark(writer, context.rows())
+
+
+@benchmark("writer.json.headers")
+def json_writer_headers(context):
+    """JsonWriter with headers declared as str fields"""
+    writer = JsonWriter(path=context.path("out.jsonl"), headers=context.keys,
+                        types={key: "str" for key in context.keys})
+    return _writer_benchmark(writer, context.rows())
+
+
+@benchmark("writer.json.auto")
+def json_writer_auto(context):
+    """JsonWriter with the fastest json codec installed"""
+    writer = JsonWriter(path=context.path("out.jsonl"), codec="auto")
+    return _writer_benchmark(writer, context.rows())
+
+
+@benchmark("writer.json.gzip")
+def json_writer_gzip(context):
+    """JsonWriter to gzip file compressed in background threads"""
+    writer = JsonWriter(path=context.path("out.jsonl.gz"))
+    return _writer_benchmark(writer, context.rows())
+
+
+@benchmark("writer.partitioned")
+def partitioned_writer(context):
+    """PartitionedWriter of jsonl files by the second field"""
+    path = context.path("partitions/{" + context.keys[1] + "}.jsonl")
+    writer = PartitionedWriter(path=path)
+    return _writer_benchmark(writer, context.rows())
+
+
+@benchmark("writer.record")
+def record_writer(context):
+    """RecordWriter with marshal codec"""
+    writer = RecordWriter(path=context.path("out.rec"))
+    return _writer_benchmark(writer, context.rows())
+
+
+@benchmark("writer.sqlite")
+def sqlite_writer(context):
+    """SqliteWriter into a new table"""
+    path = context.path("out.db")
+    rows = context.rows()
+
+    def run():
+        if os.path.exists(path):
+            os.remove(path)
+        writer = SqliteWriter(path=path, table="items", keys=context.keys)
+        writer.__enter__()
+        try:
+            writer.handle_batch(rows)
+        finally:
+            writer.__exit__(None, None, None)
+
+    return len(rows), run
+
+
+def _codec_benchmarks(name):
+    codec = get_codec(name)
+
+    @benchmark(f"codec.{name}.loads")
+    def codec_loads(context):
+        with open(context.file("jsonl"), encoding="utf-8") as fin:
+            lines = fin.read().splitlines()
+        loads = codec.loads
+
+        def run():
+            for line in lines:
+                loads(line)
+
+        return len(lines), run
+
+    @benchmark(f"codec.{name}.loads_lines")
+    def codec_loads_lines(context):
+        with open(context.file("jsonl"), encoding="utf-8") as fin:
+            lines = fin.read().splitlines()
+        return len(lines), lambda: codec.loads_lines(lines)
+
+    @benchmark(f"codec.{name}.dumps_lines")
+    def codec_dumps_lines(context):
+        rows = context.rows()
+        return len(rows), lambda: codec.dumps_lines(rows)
+
+
+for _name in available_codecs():
+    _codec_benchmarks(_name)
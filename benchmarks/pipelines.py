@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+end to end benchmarks of pipelines built from config
+"""
+from dfactory.core import Pipeline
+
+from .runner import benchmark
+
+
+def csv_pipeline_config(context, **options) -> dict:
+    """
+    a pipeline reading csv, filtering, converting and writing json
+    :param context: benchmark context
+    :param options: extra pipeline options
+    :return: pipeline config
+    """
+    keys = context.keys
+    cfg = {
+        "seeder": {"class": "dfactory.seeders.CsvSeeder", "path": context.file("csv"),
+                   "keys": keys},
+        "handlers": [
+            {"class": "dfactory.handlers.filters.Filter",
+             "matcher": {"class": "dfactory.handlers.matches.RegexMatch", "key": keys[2],
+                         "pattern": "[a-c]"}},
+            {"class": "dfactory.handlers.converters.DictConverter", "key": keys[1],
+             "dst": "mapped", "mapper": context.file("mapper")},
+            {"class": "dfactory.strings.StringCutter",
+             "keys": {keys[3]: {"end": 4, "append": "~"}}},
+            {"class": "dfactory.writers.JsonWriter", "path": context.path("pipeline.jsonl")},
+        ],
+    }
+    cfg.update(options)
+    return cfg
+
+
+def _pipeline_benchmark(name, make_config):
+    @benchmark(f"pipeline.{name}")
+    def run_pipeline(context):
+        cfg = make_config(context)
+        return context.size, lambda: Pipeline.from_dict(cfg).run()
+
+    return run_pipeline
+
+
+_pipeline_benchmark("csv_to_json", csv_pipeline_config)
+_pipeline_benchmark("csv_to_json.batch", lambda c: csv_pipeline_config(c, batch_size=1000))
+_pipeline_benchmark("csv_to_json.compiled", lambda c: csv_pipeline_config(c, compile=True))
+_pipeline_benchmark("fastcsv_to_json.batch", lambda c: dict(
+    csv_pipeline_config(c, batch_size=1000),
+    seeder={"class": "dfactory.seeders.FastCsvSeeder", "path": c.file("csv"), "keys": c.keys}))
+_pipeline_benchmark("fastcsv_to_json.columnar", lambda c: dict(
+    csv_pipeline_config(c, batch_size=1000),
+    seeder={"class": "dfactory.seeders.FastCsvSeeder", "path": c.file("csv"), "keys": c.keys,
+            "columnar": True}))
+_pipeline_benchmark("jsonl_to_csv", lambda c: {
+    "seeder": {"class": "dfactory.seeders.JsonSeeder", "path": c.file("jsonl"), "is_list": True},
+    "handlers": [
+        {"class": "dfactory.strings.StringFormatter", "keys": c.keys[1:3], "dst": "combined",
+         "format": "{" + c.keys[1] + "}-{" + c.keys[2] + "}"},
+        {"class": "dfactory.writers.CsvWriter", "path": c.path("pipeline.csv"),
+         "headers": c.keys + ["combined"]},
+    ],
+})
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmark registry, runner and result comparison
+"""
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from .datagen import DataGenerator
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    """
+    register a benchmark
+
+    the decorated function gets a Context and returns (number of items, function to time),
+    the function to time is called once per repeat
+    :param name: benchmark name
+    :return: decorator
+    """
+
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+class Context:
+    """
+    data shared by benchmarks of one run
+    """
+
+    def __init__(self, size: int, fields: int, cardinality: int, seed: int, workdir: str):
+        self.size = size
+        self.generator = DataGenerator(fields, cardinality, seed)
+        self.workdir = workdir
+        self._files = {}
+        self._rows = None
+
+    @property
+    def keys(self) -> List[str]:
+        """field names"""
+        return self.generator.keys
+
+    def rows(self) -> List[dict]:
+        """
+        fresh copy of the generated rows
+        :return: list of dict
+        """
+        if self._rows is None:
+            self._rows = self.generator.rows(self.size)
+        return [dict(row) for row in self._rows]
+
+    def path(self, name: str) -> str:
+        """
+        path of a file in the working directory
+        :param name: file name
+        :return: path
+        """
+        return os.path.join(self.workdir, name)
+
+    def file(self, kind: str) -> str:
+        """
+        generate an input file once
+        :param kind: csv, jsonl, json or mapper
+        :return: path of the file
+        """
+        if kind not in self._files:
+            writers = {
+                "csv": self.generator.write_csv,
+                "jsonl": self.generator.write_jsonl,
+                "json": self.generator.write_json_object,
+            }
+            filename = self.path(f"input.{kind}")
+            if kind == "mapper":
+                filename = self.path("mapper.json")
+                self.generator.write_mapper(filename)
+            else:
+                writers[kind](filename, self.size)
+            self._files[kind] = filename
+        return self._files[kind]
+
+
+def time_call(func: Callable, repeat: int) -> List[float]:
+    """
+    time func
+    :param func: function without arguments
+    :param repeat: number of runs
+    :return: wall time of every run
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmarks(size: int = 100000, repeat: int = 3, pattern: str = None,
+                   fields: int = 8, cardinality: int = 1000, seed: int = 0) -> Dict[str, dict]:
+    """
+    run registered benchmarks
+    :param size: number of generated items
+    :param repeat: runs of every benchmark
+    :param pattern: regex to select benchmarks by name
+    :param fields: number of fields of generated items
+    :param cardinality: distinct values of generated fields
+    :param seed: random seed of data generator
+    :return: results by benchmark name
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="dfactory-bench-") as workdir:
+        context = Context(size, fields, cardinality, seed, workdir)
+        for name, factory in sorted(BENCHMARKS.items()):
+            if pattern is not None and re.search(pattern, name) is None:
+                continue
+            items, func = factory(context)
+            timings = time_call(func, repeat)
+            best = min(timings)
+            results[name] = {
+                "items": items,
+                "best": best,
+                "median": statistics.median(timings),
+                "items_per_second": items / best if best > 0 else 0.0,
+            }
+    return results
+
+
+def save_results(results: Dict[str, dict], filename: str, **meta):
+    """
+    save results to json file
+    :param results: benchmark results
+    :param filename: output file
+    :param meta: extra information of the run
+    :return: None
+    """
+    with open(filename, "w", encoding="utf-8") as fout:
+        json.dump({"meta": meta, "results": results}, fout, indent=2, sort_keys=True)
+
+
+def load_results(filename: str) -> Dict[str, dict]:
+    """
+    load results saved by save_results
+    :param filename: result file
+    :return: results by benchmark name
+    """
+    with open(filename, encoding="utf-8") as fin:
+        return json.load(fin)["results"]
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[dict]:
+    """
+    compare results with baseline
+    :param results: current results
+    :param baseline: baseline results
+    :param threshold: allowed relative throughput loss, 0.1 for 10%
+    :return: comparison of every benchmark in both, with regression flag
+    """
+    rows = []
+    for name in sorted(set(results) & set(baseline)):
+        base = baseline[name]["items_per_second"]
+        current = results[name]["items_per_second"]
+        ratio = current / base if base > 0 else 1.0
+        rows.append({"name": name, "baseline": base, "current": current, "ratio": ratio,
+                     "regression": ratio < 1 - threshold})
+    return rows
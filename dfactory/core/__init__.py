@@ -4,6 +4,13 @@
 """
 
 from .base import Seeder, Handler, HandlerBase, CondHandler, LoaderMixin
+from .columns import ColumnBatch
 from .pipeline import Pipeline
+from .profiler import OperatorStats, PipelineStats
+from .process import ProcessPipeline
+from .staged import StagedPipeline
+from .asyncpipeline import AsyncHandler, AsyncPipeline, ThreadPoolHandler
 
-__all__ = ["LoaderMixin", "HandlerBase", "Seeder", "Handler", "CondHandler", "Pipeline"]
+__all__ = ["LoaderMixin", "HandlerBase", "Seeder", "Handler", "CondHandler", "Pipeline",
+           "ProcessPipeline", "AsyncHandler", "AsyncPipeline", "ThreadPoolHandler",
+           "StagedPipeline", "OperatorStats", "PipelineStats", "ColumnBatch"]
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio execution for I/O bound handlers
+
+AsyncHandler is a handler with a coroutine handle function,
+ThreadPoolHandler runs a sync handler in a thread pool
+and AsyncPipeline keeps a bounded number of items in flight over them
+"""
+import abc
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+from .base import Handler
+from .pipeline import Pipeline
+
+
+class AsyncHandler(Handler):
+    """
+    handler with a coroutine handle_async function, run by AsyncPipeline,
+    other pipelines can not await it so handle raises an error
+    """
+
+    def handle(self, item: dict) -> dict:
+        raise RuntimeError(f"{type(self).__name__} is an AsyncHandler, run it in AsyncPipeline")
+
+    @abc.abstractmethod
+    async def handle_async(self, item: dict) -> dict:
+        """
+        abstract coroutine handle function
+        :param item: item to be handled
+        :return: item
+        """
+        raise NotImplementedError("virtual function called")
+
+
+class ThreadPoolHandler(Handler):
+    """
+    run a sync handler in a thread pool with at most workers items at the same time
+
+    in AsyncPipeline items are handled concurrently by handle_async,
+    in Pipeline batch mode items of a batch are handled concurrently by handle_batch
+    """
+
+    def __init__(self, handler: Handler = None, workers: int = 8):
+        super().__init__()
+        self.handler = handler
+        self.workers = workers
+        self._executor = None
+
+    def load_data(self, cfg: dict):
+        self.handler = Handler.from_dict(cfg["handler"])
+        self.workers = cfg.get("workers", self.workers)
+
+    @property
+    def parallel_safe(self):
+        """the wrapped handler tells if it is parallel safe"""
+        return getattr(self.handler, 'parallel_safe', True)
+
+    @property
+    def resumable(self):
+        """the wrapped handler tells if it is resumable"""
+        return getattr(self.handler, 'resumable', True)
+
+    def __enter__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        if hasattr(self.handler, '__enter__'):
+            self.handler.__enter__()
+        self.on_create()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._executor = None
+        if hasattr(self.handler, '__exit__'):
+            self.handler.__exit__(exc_type, exc_val, exc_tb)
+        self.on_destroy()
+
+    def handle(self, item: dict) -> dict:
+        return self.handler.handle(item)
+
+    def finish(self) -> Iterable[dict]:
+        return self.handler.finish() if hasattr(self.handler, 'finish') else ()
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        if self._executor is None:
+            return self.handler.handle_batch(items)
+        return [obj for obj in self._executor.map(self.handler.handle, items) if obj is not None]
+
+    async def handle_async(self, item: dict) -> dict:
+        """
+        handle item in thread pool
+        :param item: item to be handled
+        :return: item
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.handler.handle, item)
+
+
+class AsyncPipeline(Pipeline):
+    """
+    pipeline running items concurrently over async handlers
+
+    at most concurrency items are in flight, if ordered is True
+    the operators after the last async one see items in input order.
+    Checkpoints are not supported as items in flight are not written yet.
+    """
+    supports_checkpoint = False
+
+    def __init__(self):
+        super().__init__()
+        self.concurrency = 100
+        self.ordered = True
+
+    def load_data(self, cfg: dict):
+        """
+        load pipeline and async options from dict data
+        :param cfg: pipeline config
+        :return: None
+        """
+        super().load_data(cfg)
+        self.concurrency = cfg.get('concurrency', self.concurrency)
+        self.ordered = cfg.get('ordered', self.ordered)
+
+    @staticmethod
+    def from_dict(cfg: Dict):
+        """
+        create AsyncPipeline object from dict data
+        :param cfg: pipeline config
+        :return: a new AsyncPipeline object
+        """
+        pipeline = AsyncPipeline()
+        pipeline.load_data(cfg)
+        return pipeline
+
+    @staticmethod
+    def get_step(operator):
+        """
+        get handle function of operator
+        :param operator: handler
+        :return: (handle function, True if the function is a coroutine function)
+        """
+        if hasattr(operator, 'handle_async'):
+            return operator.handle_async, True
+        return operator.handle, False
+
+    def handle(self):
+        """
+        handle over operators with asyncio
+        :return:
+        """
+        asyncio.run(self.handle_async())
+
+    def handle_batches(self):
+        """
+        items are handled concurrently one by one, batch_size does not apply
+        :return:
+        """
+        self.handle()
+
+    async def handle_async(self):
+        """
+        coroutine to handle seeder items over operators
+        :return:
+        """
+        steps = [self.get_step(operator) for operator in self.operators]
+        split = len(steps)
+        if self.ordered:
+            split = max((i + 1 for i, (_, is_async) in enumerate(steps) if is_async), default=0)
+        head, tail = steps[:split], steps[split:]
+
+        async def process(obj):
+            for func, is_async in head:
+                obj = await func(obj) if is_async else func(obj)
+                if obj is None:
+                    break
+            return obj
+
+        def finish(obj):
+            for func, _ in tail:
+                if obj is None:
+                    break
+                obj = func(obj)
+
+        pending = deque()
+        try:
+            for obj in self.seeder.iter():
+                if obj is None:
+                    break
+                if len(pending) >= self.concurrency:
+                    pending = await self._wait(pending, finish)
+                pending.append(asyncio.ensure_future(process(obj)))
+            while pending:
+                pending = await self._wait(pending, finish)
+        finally:
+            for task in pending:
+                task.cancel()
+        for index, operator in enumerate(self.operators):
+            if not hasattr(operator, 'finish'):
+                continue
+            # items held by operator run one by one over the operators after it
+            for obj in operator.finish():
+                for func, is_async in steps[index + 1:]:
+                    obj = await func(obj) if is_async else func(obj)
+                    if obj is None:
+                        break
+
+    async def _wait(self, pending: deque, finish) -> deque:
+        """
+        wait for items in flight
+        :param pending: tasks in input order
+        :param finish: function to run on the result of a task
+        :return: tasks still pending
+        """
+        if self.ordered:
+            finish(await pending.popleft())
+            return pending
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            finish(task.result())
+        return deque(task for task in pending if task not in done)
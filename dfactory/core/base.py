@@ -10,8 +10,10 @@ Seeder is the data generator to generate data to feed the pipeline
 
 import abc
 from abc import ABC
+from itertools import islice
+from typing import Callable, Iterable, List, Optional
 
-from .utils import import_class
+from .utils import import_class, overrides
 
 
 class LoaderMixin:
@@ -42,7 +44,16 @@ class LoaderMixin:
 class HandlerBase(LoaderMixin):
     """
     handler base
+
+    parallel_safe tells if the handler can run in a worker process on part of the items,
+    handlers which keep output or state over all items (writers for example) shall not.
+    columnar tells if handle_batch takes a ColumnBatch, other handlers get batches as row dicts.
+    resumable tells if the state of the handler is saved by checkpoint, pipelines
+    with checkpoint refuse handlers keeping state over all items which is not
     """
+    parallel_safe = True
+    columnar = False
+    resumable = True
 
     @abc.abstractmethod
     def handle(self, item: dict) -> dict:
@@ -53,6 +64,30 @@ class HandlerBase(LoaderMixin):
         """
         raise NotImplementedError("virtual function called")
 
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        handle a batch of items, items dropped by handle are not returned
+        :param items: items to be handled
+        :return: list of handled items
+        """
+        return [obj for obj in map(self.handle, items) if obj is not None]
+
+    def compile(self) -> Callable[[dict], dict]:
+        """
+        get a function doing the same as handle, subclasses may return a specialized one
+        :return: function(item) -> item or None
+        """
+        return self.handle
+
+    def finish(self) -> Iterable[dict]:
+        """
+        items held until the end of input (groups of an aggregator for example),
+        called after the last item and before __exit__, the items are handled
+        by the operators after this one
+        :return: iterable of items
+        """
+        return ()
+
 
 class Handler(HandlerBase, ABC):
     """
@@ -77,6 +112,20 @@ class Handler(HandlerBase, ABC):
         :return: None
         """
 
+    def checkpoint(self) -> Optional[dict]:
+        """
+        flush output and get state to resume from, called between items
+        :return: json serializable state, None if nothing to resume
+        """
+        return None
+
+    def restore(self, state: dict):
+        """
+        restore state saved by checkpoint, called before __enter__
+        :param state: state returned by checkpoint
+        :return: None
+        """
+
 
 class Seeder(LoaderMixin):
     """
@@ -90,6 +139,50 @@ class Seeder(LoaderMixin):
         """
         raise NotImplementedError('virtual function called')
 
+    def iter_batch(self, size: int):
+        """
+        generate items in batches
+        :param size: max number of items in one batch
+        :return: generator of item lists
+        """
+        items = iter(iter(self.iter()).__next__, None)
+        while True:
+            batch = list(islice(items, size))
+            if not batch:
+                break
+            yield batch
+
+    def tell(self):
+        """
+        position of the next item, items before it are all generated
+        :return: json serializable position, None if not supported
+        """
+        return None
+
+    def seek(self, position):
+        """
+        start next iter from position
+        :param position: position returned by tell
+        :return: None
+        """
+        raise NotImplementedError('seek not supported')
+
+    def shards(self, count: int) -> Optional[list]:
+        """
+        split the source into independent shards
+        :param count: number of shards wanted
+        :return: list of shard descriptions or None if the seeder can not be sharded,
+                 seeders are not sharded by default
+        """
+
+    def iter_shard(self, shard):
+        """
+        generate items of one shard
+        :param shard: shard description returned by shards
+        :return: generator of items
+        """
+        raise NotImplementedError('virtual function called')
+
 
 class CondHandler(Handler):
     """
@@ -123,3 +216,49 @@ class CondHandler(Handler):
         if self.check(item):
             return self.operate(item)
         return item
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        handle a batch of items
+        :param items: items to be handled
+        :return: list of handled items
+        """
+        if overrides(self, CondHandler, 'handle'):
+            return super().handle_batch(items)
+        check = self.check
+        operate = self.operate
+        result = []
+        for item in items:
+            if check(item):
+                item = operate(item)
+                if item is None:
+                    continue
+            result.append(item)
+        return result
+
+    def compile_check(self) -> Optional[Callable[[dict], bool]]:
+        """
+        get a function doing the same as check
+        :return: function(item) -> bool, None if every item shall be handled
+        """
+        return self.check
+
+    def compile_operate(self) -> Callable[[dict], dict]:
+        """
+        get a function doing the same as operate
+        :return: function(item) -> item or None
+        """
+        return self.operate
+
+    def compile(self) -> Callable[[dict], dict]:
+        if overrides(self, CondHandler, 'handle'):
+            return self.handle
+        check = self.compile_check()
+        operate = self.compile_operate()
+        if check is None:
+            return operate
+
+        def handle(item: dict) -> dict:
+            return operate(item) if check(item) else item
+
+        return handle
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+"""
+columnar batches
+
+a ColumnBatch keeps the items of a batch as columns, one sequence per key.
+Handlers with columnar True take a ColumnBatch in handle_batch and work on
+whole columns, other handlers get the batch converted to row dicts.
+Numeric columns are numpy arrays when numpy is installed, other columns are lists.
+"""
+from itertools import compress, repeat
+from typing import Callable, Dict, List, Sequence
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+NUMPY_TYPES = {
+    "int": "int64",
+    "float": "float64",
+    "bool": "bool",
+}
+
+
+class ColumnBatch:
+    """
+    a batch of items stored by column, all the items have the same keys
+    """
+
+    def __init__(self, columns: Dict[str, Sequence], size: int = None):
+        """
+        :param columns: key to column values
+        :param size: number of items, length of the first column by default
+        """
+        self.columns = columns
+        self.size = size if size is not None else len(next(iter(columns.values()), ()))
+
+    @staticmethod
+    def from_rows(rows: List[dict], keys: List[str] = None):
+        """
+        create a ColumnBatch from row dicts
+        :param rows: items
+        :param keys: keys of columns, keys of the first item by default
+        :return: ColumnBatch
+        """
+        if keys is None:
+            keys = list(rows[0]) if rows else []
+        return ColumnBatch({key: [row.get(key) for row in rows] for key in keys}, len(rows))
+
+    def to_rows(self) -> List[dict]:
+        """
+        convert to row dicts
+        :return: list of new items
+        """
+        keys = list(self.columns)
+        if not keys:
+            return [{} for _ in range(self.size)]
+        columns = [to_list(column) for column in self.columns.values()]
+        return list(map(dict, map(zip, repeat(keys), zip(*columns))))
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """rows as new dicts, changes to them are not kept in the batch"""
+        return iter(self.to_rows())
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    def __getitem__(self, key) -> Sequence:
+        return self.columns[key]
+
+    def __setitem__(self, key, values: Sequence):
+        self.columns[key] = values
+
+    def get(self, key, default=None):
+        """
+        column of key
+        :param key: key
+        :param default: value returned if there is no such column
+        :return: column values
+        """
+        return self.columns.get(key, default)
+
+    def copy(self):
+        """
+        shallow copy, columns are shared until replaced
+        :return: new ColumnBatch
+        """
+        return ColumnBatch(dict(self.columns), self.size)
+
+    def slice(self, start: int, stop: int = None):
+        """
+        items from start to stop
+        :param start: index of the first item
+        :param stop: index after the last item, None for the end
+        :return: new ColumnBatch
+        """
+        start, stop, _ = slice(start, stop).indices(self.size)
+        return ColumnBatch({key: column[start:stop] for key, column in self.columns.items()},
+                           max(stop - start, 0))
+
+    def select(self, mask: Sequence):
+        """
+        items where mask is True
+        :param mask: boolean mask
+        :return: new ColumnBatch
+        """
+        if numpy is not None:
+            mask = numpy.asarray(mask, dtype=bool)
+            indices = numpy.flatnonzero(mask)
+            columns = {key: column[mask] if isinstance(column, numpy.ndarray)
+                       else [column[i] for i in indices.tolist()]
+                       for key, column in self.columns.items()}
+            return ColumnBatch(columns, len(indices))
+        columns = {key: list(compress(column, mask)) for key, column in self.columns.items()}
+        return ColumnBatch(columns, sum(1 for value in mask if value))
+
+
+def to_list(column: Sequence) -> list:
+    """
+    column values as list of python objects
+    :param column: list or numpy array
+    :return: list
+    """
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        return column.tolist()
+    return column if isinstance(column, list) else list(column)
+
+
+def typed_column(values: Sequence, type_name: str = "str") -> Sequence:
+    """
+    column of a type, numpy array for numeric types if numpy is installed
+    and there is no None in values
+    :param values: values
+    :param type_name: int, float, bool or str
+    :return: numpy array or list
+    """
+    dtype = NUMPY_TYPES.get(type_name)
+    if numpy is not None and dtype is not None and None not in values:
+        return numpy.array(values, dtype=dtype)
+    return list(values)
+
+
+def to_mask(values: Sequence) -> Sequence:
+    """
+    boolean mask of values
+    :param values: values tested for truth
+    :return: numpy bool array or list of bool
+    """
+    if numpy is not None:
+        if isinstance(values, numpy.ndarray) and values.dtype == bool:
+            return values
+        return numpy.fromiter(map(bool, values), dtype=bool, count=len(values))
+    return list(map(bool, values))
+
+
+def full_mask(size: int, value: bool) -> Sequence:
+    """
+    mask of the same value
+    :param size: length
+    :param value: True or False
+    :return: mask
+    """
+    if numpy is not None:
+        return numpy.full(size, value, dtype=bool)
+    return [value] * size
+
+
+def mask_and(mask_a: Sequence, mask_b: Sequence) -> Sequence:
+    """element-wise and of masks"""
+    if numpy is not None:
+        return numpy.logical_and(mask_a, mask_b)
+    return [a and b for a, b in zip(mask_a, mask_b)]
+
+
+def mask_or(mask_a: Sequence, mask_b: Sequence) -> Sequence:
+    """element-wise or of masks"""
+    if numpy is not None:
+        return numpy.logical_or(mask_a, mask_b)
+    return [a or b for a, b in zip(mask_a, mask_b)]
+
+
+def mask_not(mask: Sequence) -> Sequence:
+    """element-wise not of mask"""
+    if numpy is not None:
+        return numpy.logical_not(mask)
+    return [not value for value in mask]
+
+
+def column_equals(column: Sequence, value) -> Sequence:
+    """
+    mask of column values equal to value
+    :param column: column values
+    :param value: value to compare
+    :return: mask
+    """
+    if numpy is not None and isinstance(column, numpy.ndarray) and \
+            isinstance(value, (int, float, bool)):
+        return column == value
+    return to_mask([item == value for item in column])
+
+
+def column_isin(column: Sequence, values: list) -> Sequence:
+    """
+    mask of column values in values
+    :param column: column values
+    :param values: list of values
+    :return: mask
+    """
+    if numpy is not None and isinstance(column, numpy.ndarray) and \
+            all(isinstance(value, (int, float, bool)) for value in values):
+        return numpy.isin(column, values)
+    try:
+        value_set = set(values)
+    except TypeError:
+        return to_mask([item in values for item in column])
+    return to_mask([item in value_set for item in column])
+
+
+def map_column(column: Sequence, func: Callable) -> list:
+    """
+    apply func once per distinct value of column
+    :param column: column values, hashable
+    :param func: function of a value
+    :return: list of results
+    """
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        uniques, inverse = numpy.unique(column, return_inverse=True)
+        results = [func(value) for value in uniques.tolist()]
+        return [results[index] for index in inverse.tolist()]
+    results = {value: func(value) for value in dict.fromkeys(column)}
+    return [results[value] for value in column]
+
+
+def handle_batch(operator, batch):
+    """
+    run handle_batch of operator, ColumnBatch is converted to rows
+    for operators not columnar
+    :param operator: handler
+    :param batch: list of items or ColumnBatch
+    :return: result of handle_batch
+    """
+    if isinstance(batch, ColumnBatch) and not getattr(operator, 'columnar', False):
+        batch = batch.to_rows()
+    return operator.handle_batch(batch)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""
+compiler to fuse a chain of operators into one function
+"""
+from typing import Callable, List
+
+from .base import CondHandler, HandlerBase
+from .utils import overrides
+
+
+def compile_operators(operators: List[HandlerBase]) -> Callable[[dict], dict]:
+    """
+    generate one function running item over operators,
+    condition of CondHandler is inlined as a branch and the chain stops when an operator
+    returns None
+    :param operators: handlers in order
+    :return: function(item) -> item or None
+    """
+    env = {}
+    lines = ["def fused(item):"]
+    for index, operator in enumerate(operators):
+        if isinstance(operator, CondHandler) and not overrides(operator, CondHandler, 'handle'):
+            check = operator.compile_check()
+            env[f"operate{index}"] = operator.compile_operate()
+            indent = "    "
+            if check is not None:
+                env[f"check{index}"] = check
+                lines.append(f"    if check{index}(item):")
+                indent = "        "
+            lines += [f"{indent}item = operate{index}(item)",
+                      f"{indent}if item is None:",
+                      f"{indent}    return None"]
+        else:
+            env[f"handle{index}"] = operator.compile()
+            lines += [f"    item = handle{index}(item)",
+                      "    if item is None:",
+                      "        return None"]
+    lines.append("    return item")
+    code = compile("\n".join(lines), "<dfactory fused pipeline>", "exec")
+    exec(code, env)  # pylint: disable=exec-used
+    return env["fused"]
@@ -4,32 +4,204 @@
 Pipeline is a data flow pipeline with a group of handlers
 to operate actions on a flow of dict data
 """
-from typing import Dict
+import json
+import os
+import time
+from itertools import islice
+from typing import Dict, List, Optional
 
 from .base import Handler, Seeder, LoaderMixin
+from .columns import handle_batch
+from .compiler import compile_operators
+from .profiler import OperatorStats, PipelineStats, ProfiledSeeder, wrap_operator
+
+
+def handle_operators(operators: list, batch):
+    """
+    handle one batch of items over operators
+    :param operators: operators in order
+    :param batch: items to handle
+    :return: items left after the last operator
+    """
+    for operator in operators:
+        batch = handle_batch(operator, batch)
+        if not batch:
+            break
+    return batch
+
+
+def iter_finished(operators: list, batch_size: int = 1000):
+    """
+    call finish of operators in order, the items an operator returns are handled
+    in batches by the operators after it
+    :param operators: operators in order
+    :param batch_size: items per batch
+    :return: generator of batches left after the last operator
+    """
+    for index, operator in enumerate(operators):
+        if not hasattr(operator, 'finish'):
+            continue
+        items = iter(operator.finish())
+        rest = operators[index + 1:]
+        while True:
+            batch = list(islice(items, batch_size))
+            if not batch:
+                break
+            batch = handle_operators(rest, batch)
+            if batch:
+                yield batch
 
 
 class Pipeline(LoaderMixin):
     """
     data pipeline class
+
+    supports_checkpoint tells if checkpoints are saved while items are handled,
+    pipelines which do not support it refuse to run with checkpoint set
     """
+    supports_checkpoint = True
 
     def __init__(self):
         self.seeder = None
         self.operators = []
+        self.batch_size = 0
+        self.compiled = False
+        self.checkpoint_path = None
+        self.checkpoint_interval = 100000
 
     def handle(self):
         """
         handle over operators
         :return:
         """
-        for obj in self.seeder.iter():
-            if obj is None:
-                break
-            for operator in self.operators:
-                obj = operator.handle(obj)
+        if self.compiled:
+            fused = self.compile()
+            for obj in self.iter_items():
+                if obj is None:
+                    break
+                fused(obj)
+        else:
+            for obj in self.iter_items():
                 if obj is None:
                     break
+                for operator in self.operators:
+                    obj = operator.handle(obj)
+                    if obj is None:
+                        break
+        self.finish()
+
+    def compile(self):
+        """
+        fuse operators into one function
+        :return: function(item) -> item or None
+        """
+        return compile_operators(self.operators)
+
+    def handle_batches(self):
+        """
+        handle over operators batch by batch
+        :return:
+        """
+        for batch in self.iter_items(self.batch_size):
+            self.process_batch(batch)
+        self.finish()
+
+    def finish(self):
+        """
+        handle the items operators hold until the end of input
+        :return: None
+        """
+        for _ in iter_finished(self.operators, self.batch_size or 1000):
+            pass
+
+    def iter_items(self, batch_size: int = 0):
+        """
+        seeder items, a checkpoint is saved every checkpoint_interval items if enabled
+        :param batch_size: 0 for items one by one otherwise batches of items
+        :return: generator of items or batches
+        """
+        items = self.seeder.iter_batch(batch_size) if batch_size > 0 else self.seeder.iter()
+        if self.checkpoint_path is None:
+            return items
+        return self._checkpointed(items, batch_size > 0)
+
+    def _checkpointed(self, items, batched: bool):
+        count = 0
+        for obj in items:
+            yield obj
+            # resumed after the previous item is handled over all operators
+            count += len(obj) if batched else 1
+            if count >= self.checkpoint_interval:
+                self.save_checkpoint()
+                count = 0
+
+    def save_checkpoint(self):
+        """
+        save seeder position and operator states to checkpoint file
+        :return: None
+        """
+        position = self.seeder.tell()
+        if position is None:
+            raise ValueError(f"{type(self.seeder).__name__} does not support checkpoint")
+        state = {
+            "seeder": position,
+            "operators": [operator.checkpoint() if hasattr(operator, 'checkpoint') else None
+                          for operator in self.operators],
+        }
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fout:
+            json.dump(state, fout)
+            fout.flush()
+            os.fsync(fout.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def check_checkpoint(self):
+        """
+        check the pipeline and its operators can resume from checkpoints if checkpoint is set
+        :return: None
+        """
+        if self.checkpoint_path is None:
+            return
+        if not self.supports_checkpoint:
+            raise ValueError(f"{type(self).__name__} does not support checkpoint")
+        for index, operator in enumerate(self.operators):
+            if not getattr(operator, 'resumable', True):
+                # profiled operators wrap the configured one
+                name = type(getattr(operator, 'operator', operator)).__name__
+                raise ValueError(f"operator {index} ({name}) keeps state not saved "
+                                 f"by checkpoint, run it without checkpoint")
+
+    def load_checkpoint(self) -> Optional[dict]:
+        """
+        load checkpoint file
+        :return: checkpoint state, None if checkpoint is disabled or no checkpoint saved
+        """
+        if self.checkpoint_path is None or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding="utf-8") as fin:
+            state = json.load(fin)
+        if len(state["operators"]) != len(self.operators):
+            raise ValueError(f"checkpoint {self.checkpoint_path} does not match the operators")
+        return state
+
+    def restore(self, state: dict):
+        """
+        move seeder to the checkpoint position and restore operator states
+        :param state: checkpoint state
+        :return: None
+        """
+        self.seeder.seek(state["seeder"])
+        for operator, operator_state in zip(self.operators, state["operators"]):
+            if operator_state is not None:
+                operator.restore(operator_state)
+
+    def process_batch(self, batch: List[dict]) -> List[dict]:
+        """
+        handle one batch of items over operators
+        :param batch: items to handle
+        :return: items left after the last operator
+        """
+        return handle_operators(self.operators, batch)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         for operator in self.operators:
@@ -55,15 +227,23 @@ class Pipeline(LoaderMixin):
 
     def load_data(self, cfg: dict):
         """
-        load operators from dict data
+        load operators from dict data,
+        branches in config are handler chains fed by the same seeder after the handlers
         :param cfg: operators config
         :return: None
         """
         self.seeder = Seeder.from_dict(cfg['seeder'])
-        for handler_cfg in cfg['handlers']:
+        self.batch_size = cfg.get('batch_size', self.batch_size)
+        self.compiled = cfg.get('compile', self.compiled)
+        self.checkpoint_path = cfg.get('checkpoint', self.checkpoint_path)
+        self.checkpoint_interval = cfg.get('checkpoint_interval', self.checkpoint_interval)
+        for handler_cfg in cfg.get('handlers', []):
             obj = Handler.from_dict(handler_cfg)
             if obj is not None:
                 self.add(obj)
+        if 'branches' in cfg:
+            self.add(Handler.from_dict({"class": "dfactory.handlers.router.Router",
+                                        "mode": "all", "routes": cfg['branches']}))
 
     @staticmethod
     def from_dict(cfg: Dict):
@@ -76,11 +256,49 @@ class Pipeline(LoaderMixin):
         pipeline.load_data(cfg)
         return pipeline
 
-    def run(self):
+    def run(self, profile: bool = False, report: str = None):
         """
         start pipeline
+        :param profile: collect statistics of seeder and every operator
+        :param report: json file to save statistics, statistics are collected if specified
+        :return: PipelineStats if profiling otherwise None
+        """
+        if not profile and report is None:
+            self.execute()
+            return None
+        stats = PipelineStats()
+        seeder, operators = self.seeder, self.operators
+        stats.seeder = OperatorStats(f"seeder:{type(seeder).__name__}")
+        stats.operators = [OperatorStats(f"{index}:{type(operator).__name__}")
+                           for index, operator in enumerate(operators)]
+        self.seeder = ProfiledSeeder(seeder, stats.seeder)
+        self.operators = [wrap_operator(operator, operator_stats)
+                          for operator, operator_stats in zip(operators, stats.operators)]
+        start = time.perf_counter()
+        try:
+            self.execute()
+        finally:
+            stats.elapsed = time.perf_counter() - start
+            self.seeder, self.operators = seeder, operators
+        if report is not None:
+            stats.save(report)
+        return stats
+
+    def execute(self):
+        """
+        run operators over seeder items, resume from checkpoint if there is one
         :return: None
         """
+        self.check_checkpoint()
+        state = self.load_checkpoint()
+        if state is not None:
+            self.restore(state)
         with self:
-            if len(self.operators) > 0:
+            if len(self.operators) == 0:
+                return
+            if self.batch_size > 0:
+                self.handle_batches()
+            else:
                 self.handle()
+        if self.checkpoint_path is not None and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
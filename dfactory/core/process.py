@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""
+ProcessPipeline runs the handlers of a Pipeline in a pool of worker processes
+"""
+import multiprocessing
+import os
+import queue
+import traceback
+from typing import Dict
+
+from .pipeline import Pipeline
+
+ERROR_INDEX = -1
+
+
+def _build_worker_pipeline(source, split: int) -> Pipeline:
+    """
+    build the pipeline running in a worker
+    :param source: pipeline config or (seeder, operators) tuple
+    :param split: number of operators to run in worker
+    :return: Pipeline
+    """
+    if isinstance(source, dict):
+        pipeline = Pipeline.from_dict(source)
+    else:
+        pipeline = Pipeline()
+        pipeline.seeder, pipeline.operators = source
+    pipeline.operators = pipeline.operators[:split]
+    return pipeline
+
+
+def _worker(source, split: int, batch_size: int, tasks, results):
+    """
+    worker process main function
+    :param source: pipeline config or (seeder, operators) tuple
+    :param split: number of operators to run in worker
+    :param batch_size: items per result batch for shard tasks
+    :param tasks: task queue, None to stop
+    :param results: result queue of (task index, items, done)
+    :return: None
+    """
+    try:
+        pipeline = _build_worker_pipeline(source, split)
+        with pipeline:
+            for index, shard, items in iter(tasks.get, None):
+                if items is not None:
+                    results.put((index, pipeline.process_batch(items), True))
+                    continue
+                batch = []
+                for item in pipeline.seeder.iter_shard(shard):
+                    batch.append(item)
+                    if len(batch) >= batch_size:
+                        batch = pipeline.process_batch(batch)
+                        if batch:
+                            results.put((index, batch, False))
+                        batch = []
+                results.put((index, pipeline.process_batch(batch) if batch else [], True))
+    except Exception:  # pylint: disable=broad-except
+        results.put((ERROR_INDEX, traceback.format_exc(), True))
+
+
+class ProcessPipeline(Pipeline):
+    """
+    pipeline running handlers in worker processes
+
+    the operators before the first one which is not parallel_safe run in workers,
+    the rest of them (writers for example) run in the main process on the results.
+    Seeders which support shards are read by the workers, otherwise the main process
+    reads the items and sends them to the workers in batches.
+    Checkpoints are supported only when no operator runs in worker processes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.workers = os.cpu_count() or 1
+        self.ordered = True
+        self.shard_count = None
+        self.config = None
+
+    def load_data(self, cfg: dict):
+        """
+        load pipeline and process options from dict data
+        :param cfg: pipeline config
+        :return: None
+        """
+        super().load_data(cfg)
+        self.config = cfg
+        self.workers = cfg.get('workers', self.workers)
+        self.ordered = cfg.get('ordered', self.ordered)
+        self.shard_count = cfg.get('shards', self.shard_count)
+
+    @staticmethod
+    def from_dict(cfg: Dict):
+        """
+        create ProcessPipeline object from dict data
+        :param cfg: pipeline config
+        :return: a new ProcessPipeline object
+        """
+        pipeline = ProcessPipeline()
+        pipeline.load_data(cfg)
+        return pipeline
+
+    @property
+    def supports_checkpoint(self) -> bool:
+        """
+        checkpoint is not saved while items are in worker processes
+        :return: True if all operators run in the main process
+        """
+        return self.workers <= 1 or self.split_index() == 0
+
+    def split_index(self) -> int:
+        """
+        number of leading operators which can run in worker processes
+        :return: index of the first operator not parallel safe
+        """
+        for index, operator in enumerate(self.operators):
+            if not getattr(operator, 'parallel_safe', True):
+                return index
+        return len(self.operators)
+
+    def iter_tasks(self):
+        """
+        generate worker tasks, (index, shard, None) for shards or (index, None, items)
+        :return: generator of tasks
+        """
+        shards = self.seeder.shards(self.shard_count or self.workers * 4)
+        if shards is not None:
+            for index, shard in enumerate(shards):
+                yield index, shard, None
+            return
+        for index, items in enumerate(self.seeder.iter_batch(self.batch_size or 1000)):
+            yield index, None, items
+
+    def iter_results(self, processes, tasks, results):
+        """
+        send tasks to workers and generate result batches
+        :param processes: worker processes
+        :param tasks: task queue
+        :param results: result queue
+        :return: generator of item batches
+        """
+        limit = self.workers * 2
+        pending = 0
+        next_index = 0
+        buffered = {}
+        finished = set()
+
+        def receive():
+            while True:
+                try:
+                    return results.get(timeout=1)
+                except queue.Empty:
+                    if any(p.exitcode not in (None, 0) for p in processes):
+                        raise RuntimeError("pipeline worker exited unexpectedly") from None
+
+        def collect():
+            nonlocal pending, next_index
+            index, items, done = receive()
+            if index == ERROR_INDEX:
+                raise RuntimeError(f"pipeline worker failed:\n{items}")
+            if done:
+                pending -= 1
+            if not self.ordered:
+                yield items
+                return
+            buffered.setdefault(index, []).append(items)
+            if done:
+                finished.add(index)
+            while next_index in buffered:
+                yield from buffered.pop(next_index)
+                if next_index not in finished:
+                    break
+                finished.remove(next_index)
+                next_index += 1
+
+        for task in self.iter_tasks():
+            while pending >= limit:
+                yield from collect()
+            tasks.put(task)
+            pending += 1
+        while pending > 0:
+            yield from collect()
+
+    def execute(self):
+        """
+        run operators with worker processes,
+        only operators in the main process are profiled
+        :return: None
+        """
+        split = self.split_index()
+        if self.workers <= 1 or split == 0:
+            super().execute()
+            return
+        self.check_checkpoint()
+        source = self.config if self.config is not None else (self.seeder, self.operators)
+        tail = Pipeline()
+        tail.operators = self.operators[split:]
+        tasks = multiprocessing.Queue()
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_worker, daemon=True,
+                                             args=(source, split, self.batch_size or 1000,
+                                                   tasks, results))
+                     for _ in range(self.workers)]
+        for process in processes:
+            process.start()
+        try:
+            with tail:
+                for batch in self.iter_results(processes, tasks, results):
+                    if batch and len(tail.operators) > 0:
+                        tail.process_batch(batch)
+                tail.batch_size = self.batch_size
+                tail.finish()
+        finally:
+            for _ in processes:
+                tasks.put(None)
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
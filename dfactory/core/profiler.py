@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+"""
+profiler to collect statistics of a Pipeline run
+
+operators and seeder are wrapped only while profiling,
+so a run without profiling is not affected
+"""
+import json
+import random
+import time
+from typing import Callable, Iterable, List
+
+from .base import Seeder
+
+
+class OperatorStats:  # pylint: disable=too-many-instance-attributes
+    """
+    statistics of one operator or seeder
+    """
+
+    def __init__(self, name: str, sample_size: int = 10000):
+        self.name = name
+        self.calls = 0
+        self.items_in = 0
+        self.items_out = 0
+        self.total_time = 0.0
+        self.sample_size = sample_size
+        self._samples = []
+        self._random = random.Random(0)
+
+    def record(self, elapsed: float, items_in: int, items_out: int):
+        """
+        record one call
+        :param elapsed: wall time of the call in seconds
+        :param items_in: number of items passed in
+        :param items_out: number of items returned
+        :return: None
+        """
+        self.calls += 1
+        self.items_in += items_in
+        self.items_out += items_out
+        self.total_time += elapsed
+        if len(self._samples) < self.sample_size:
+            self._samples.append(elapsed)
+            return
+        index = self._random.randrange(self.calls)
+        if index < self.sample_size:
+            self._samples[index] = elapsed
+
+    @property
+    def dropped(self) -> int:
+        """number of items dropped"""
+        return self.items_in - self.items_out
+
+    @property
+    def items_per_second(self) -> float:
+        """items handled per second of operator time"""
+        return self.items_in / self.total_time if self.total_time > 0 else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """
+        percentile of call time, estimated from a sample of calls
+        :param percent: percentile in [0, 100]
+        :return: call time in seconds
+        """
+        if len(self._samples) == 0:
+            return 0.0
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def to_dict(self) -> dict:
+        """
+        statistics in dict
+        :return: dict
+        """
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "dropped": self.dropped,
+            "total_time": self.total_time,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "items_per_second": self.items_per_second,
+        }
+
+
+class PipelineStats:
+    """
+    statistics of a Pipeline run
+    """
+
+    def __init__(self):
+        self.seeder = None
+        self.operators = []
+        self.elapsed = 0.0
+
+    @property
+    def items(self) -> int:
+        """number of items generated by seeder"""
+        return 0 if self.seeder is None else self.seeder.items_out
+
+    def to_dict(self) -> dict:
+        """
+        statistics in dict
+        :return: dict
+        """
+        return {
+            "elapsed": self.elapsed,
+            "items": self.items,
+            "items_per_second": self.items / self.elapsed if self.elapsed > 0 else 0.0,
+            "seeder": None if self.seeder is None else self.seeder.to_dict(),
+            "operators": [stats.to_dict() for stats in self.operators],
+        }
+
+    def save(self, filename: str):
+        """
+        write statistics to json file
+        :param filename: report file
+        :return: None
+        """
+        with open(filename, "w", encoding="utf-8") as fout:
+            json.dump(self.to_dict(), fout, indent=2)
+
+    def __str__(self):
+        lines = [f"{'name':<40} {'calls':>10} {'dropped':>10} {'total(s)':>10} "
+                 f"{'p99(ms)':>10} {'items/s':>12}"]
+        for stats in ([self.seeder] if self.seeder is not None else []) + self.operators:
+            lines.append(f"{stats.name[:40]:<40} {stats.calls:>10} {stats.dropped:>10} "
+                         f"{stats.total_time:>10.3f} {stats.percentile(99) * 1000:>10.3f} "
+                         f"{stats.items_per_second:>12.1f}")
+        return "\n".join(lines)
+
+
+class ProfiledOperator:
+    """
+    operator wrapper recording statistics of every call
+    """
+
+    def __init__(self, operator, stats: OperatorStats):
+        self.operator = operator
+        self.stats = stats
+        self.parallel_safe = getattr(operator, 'parallel_safe', True)
+        self.columnar = getattr(operator, 'columnar', False)
+        self.resumable = getattr(operator, 'resumable', True)
+
+    def __enter__(self):
+        if hasattr(self.operator, '__enter__'):
+            self.operator.__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if hasattr(self.operator, '__exit__'):
+            self.operator.__exit__(exc_type, exc_val, exc_tb)
+
+    def checkpoint(self):
+        """state of operator"""
+        return self.operator.checkpoint() if hasattr(self.operator, 'checkpoint') else None
+
+    def restore(self, state: dict):
+        """restore state of operator"""
+        self.operator.restore(state)
+
+    def finish(self) -> Iterable[dict]:
+        """items held by operator"""
+        return self.operator.finish() if hasattr(self.operator, 'finish') else ()
+
+    def handle(self, item: dict) -> dict:
+        """timed handle"""
+        start = time.perf_counter()
+        obj = self.operator.handle(item)
+        self.stats.record(time.perf_counter() - start, 1, 0 if obj is None else 1)
+        return obj
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """timed handle_batch"""
+        start = time.perf_counter()
+        objs = self.operator.handle_batch(items)
+        self.stats.record(time.perf_counter() - start, len(items), len(objs))
+        return objs
+
+    def compile(self) -> Callable[[dict], dict]:
+        """timed compiled function of operator"""
+        func = self.operator.compile()
+        record = self.stats.record
+        perf_counter = time.perf_counter
+
+        def handle(item: dict) -> dict:
+            start = perf_counter()
+            obj = func(item)
+            record(perf_counter() - start, 1, 0 if obj is None else 1)
+            return obj
+
+        return handle
+
+
+class ProfiledAsyncOperator(ProfiledOperator):
+    """
+    wrapper of operators run as coroutines in AsyncPipeline
+    """
+
+    async def handle_async(self, item: dict) -> dict:
+        """timed coroutine handle"""
+        start = time.perf_counter()
+        obj = await self.operator.handle_async(item)
+        self.stats.record(time.perf_counter() - start, 1, 0 if obj is None else 1)
+        return obj
+
+
+class ProfiledSeeder(Seeder):
+    """
+    seeder wrapper recording the time spent to generate items
+    """
+
+    def __init__(self, seeder: Seeder, stats: OperatorStats):
+        self.seeder = seeder
+        self.stats = stats
+
+    def _timed(self, generator, count):
+        items = iter(generator)
+        while True:
+            start = time.perf_counter()
+            try:
+                obj = next(items)
+            except StopIteration:
+                return
+            size = count(obj)
+            self.stats.record(time.perf_counter() - start, size, size)
+            yield obj
+
+    def iter(self):
+        return self._timed(self.seeder.iter(), lambda obj: 0 if obj is None else 1)
+
+    def iter_batch(self, size: int):
+        return self._timed(self.seeder.iter_batch(size), len)
+
+    def tell(self):
+        return self.seeder.tell()
+
+    def seek(self, position):
+        self.seeder.seek(position)
+
+    def shards(self, count: int):
+        return self.seeder.shards(count)
+
+    def iter_shard(self, shard):
+        return self.seeder.iter_shard(shard)
+
+
+def wrap_operator(operator, stats: OperatorStats):
+    """
+    wrap operator for profiling
+    :param operator: operator to wrap
+    :param stats: stats to record
+    :return: wrapped operator
+    """
+    if hasattr(operator, 'handle_async'):
+        return ProfiledAsyncOperator(operator, stats)
+    return ProfiledOperator(operator, stats)
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+"""
+StagedPipeline runs the seeder and groups of operators in their own threads
+joined by bounded queues, so file reading, transforming and writing overlap
+"""
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .pipeline import Pipeline, handle_operators, iter_finished
+
+_STOP = object()
+
+
+class Stage:  # pylint: disable=too-many-instance-attributes
+    """
+    a thread running a group of operators on batches from its inbox,
+    inbox and outbox are the queues before and after the stage, None for the seeder
+    and the last stage
+    """
+
+    def __init__(self, name: str, operators: list, stop: threading.Event,
+                 batch_size: int = 1000):
+        self.name = name
+        self.batch_size = batch_size
+        self.operators = operators
+        self.inbox: Optional[queue.Queue] = None
+        self.outbox: Optional[queue.Queue] = None
+        self.stop = stop
+        self.busy_time = 0.0
+        self.batches = 0
+        self.items_in = 0
+        self.items_out = 0
+        self.depth_total = 0
+        self.depth_max = 0
+        self.error = None
+        self.thread = None
+
+    def put(self, batch) -> bool:
+        """
+        put batch to outbox, wait while the outbox is full
+        :param batch: batch or _STOP
+        :return: False if pipeline is stopping
+        """
+        if self.outbox is None:
+            return True
+        depth = self.outbox.qsize()
+        self.depth_total += depth
+        self.depth_max = max(self.depth_max, depth)
+        while not self.stop.is_set():
+            try:
+                self.outbox.put(batch, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self):
+        """
+        get batch from inbox
+        :return: batch or _STOP
+        """
+        while not self.stop.is_set():
+            try:
+                return self.inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _STOP
+
+    def process(self, batch: list) -> list:
+        """
+        run operators on batch
+        :param batch: items
+        :return: items left
+        """
+        return handle_operators(self.operators, batch)
+
+    def run(self, source=None):
+        """
+        thread main function
+        :param source: batch generator for the first stage, None to read from inbox,
+                       time to generate batches counts as busy time but waiting for inbox not,
+                       at the end of input the batches finished by operators are put
+        :return: None
+        """
+        try:
+            batches = iter(iter(self.get, _STOP) if source is None else source)
+            finished = None
+            while True:
+                start = time.perf_counter()
+                batch = next(batches, _STOP)
+                if batch is _STOP:
+                    if finished is None and not self.stop.is_set():
+                        # items held by operators go on after the end of input
+                        finished = batches = iter_finished(self.operators, self.batch_size)
+                        continue
+                    break
+                if finished is None:
+                    if source is None:
+                        start = time.perf_counter()
+                    self.items_in += len(batch)
+                    batch = self.process(batch)
+                self.busy_time += time.perf_counter() - start
+                self.batches += 1
+                if batch:
+                    self.items_out += len(batch)
+                    if not self.put(batch):
+                        return
+            self.put(_STOP)
+        except Exception as ex:  # pylint: disable=broad-except
+            self.error = ex
+            self.stop.set()
+
+    def start(self, source=None):
+        """
+        start stage thread
+        :param source: batch generator for the first stage
+        :return: None
+        """
+        self.thread = threading.Thread(target=self.run, args=(source,), name=self.name,
+                                       daemon=True)
+        self.thread.start()
+
+    def to_dict(self, elapsed: float) -> dict:
+        """
+        stage statistics
+        :param elapsed: wall time of the run
+        :return: dict
+        """
+        return {
+            "name": self.name,
+            "operators": [type(operator).__name__ for operator in self.operators],
+            "batches": self.batches,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_time": self.busy_time,
+            "utilization": self.busy_time / elapsed if elapsed > 0 else 0.0,
+            "queue_depth": None if self.outbox is None else self.outbox.qsize(),
+            "queue_depth_avg": self.depth_total / self.batches if self.batches > 0 else 0.0,
+            "queue_depth_max": self.depth_max,
+        }
+
+
+class StagedPipeline(Pipeline):
+    """
+    pipeline with the seeder and groups of operators running in their own threads
+
+    stages is a list of operator counts, one stage per count, operators not in any group
+    run in one stage each. By default the operators before the first one not
+    parallel_safe form one stage and each writer after gets its own stage.
+    Batches of batch_size items are passed through queues of queue_size batches.
+    Checkpoints are not supported as items in queues are not written yet.
+    """
+    supports_checkpoint = False
+
+    def __init__(self):
+        super().__init__()
+        self.stages = None
+        self.queue_size = 8
+        self.elapsed = 0.0
+        self._started = None
+        self._stages = []
+
+    def load_data(self, cfg: dict):
+        """
+        load pipeline and stage options from dict data
+        :param cfg: pipeline config
+        :return: None
+        """
+        super().load_data(cfg)
+        self.stages = cfg.get('stages', self.stages)
+        self.queue_size = cfg.get('queue_size', self.queue_size)
+
+    @staticmethod
+    def from_dict(cfg: Dict):
+        """
+        create StagedPipeline object from dict data
+        :param cfg: pipeline config
+        :return: a new StagedPipeline object
+        """
+        pipeline = StagedPipeline()
+        pipeline.load_data(cfg)
+        return pipeline
+
+    def group_operators(self) -> List[list]:
+        """
+        split operators into stage groups
+        :return: list of operator lists
+        """
+        sizes = self.stages
+        if sizes is None:
+            split = len(self.operators)
+            for index, operator in enumerate(self.operators):
+                if not getattr(operator, 'parallel_safe', True):
+                    split = index
+                    break
+            sizes = [split] if split > 0 else []
+        groups = []
+        start = 0
+        for size in sizes:
+            if size > 0:
+                groups.append(self.operators[start:start + size])
+            start += size
+        groups += [[operator] for operator in self.operators[start:]]
+        return groups
+
+    def handle_batches(self):
+        """
+        run stages in threads until all batches are handled
+        :return:
+        """
+        stop = threading.Event()
+        groups = self.group_operators()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in groups]
+        size = self.batch_size or 1000
+        seeder_stage = Stage("seeder", [], stop)
+        stages = [seeder_stage] + [Stage(f"stage{index}", group, stop, size)
+                                   for index, group in enumerate(groups)]
+        for stage, inbox, outbox in zip(stages, [None] + queues, queues + [None]):
+            stage.inbox, stage.outbox = inbox, outbox
+        self._stages = stages
+        self.elapsed = 0.0
+        self._started = start = time.perf_counter()
+        for stage in stages[1:]:
+            stage.start()
+        seeder_stage.start(self.seeder.iter_batch(size))
+        try:
+            for stage in stages:
+                stage.thread.join()
+        finally:
+            stop.set()
+            self.elapsed = time.perf_counter() - start
+        for stage in stages:
+            if stage.error is not None:
+                raise stage.error
+
+    def handle(self):
+        self.handle_batches()
+
+    def stage_stats(self) -> List[dict]:
+        """
+        statistics of stages of the last or current run, queue_depth is the depth
+        of the queue after the stage at the moment
+        :return: list of dict
+        """
+        elapsed = self.elapsed
+        if elapsed == 0 and self._started is not None:
+            elapsed = time.perf_counter() - self._started
+        return [stage.to_dict(elapsed) for stage in self._stages]
@@ -19,3 +19,14 @@ def import_class(class_path: str):
     mod = import_module(components[0])
     mod = getattr(mod, components[1])
     return mod
+
+
+def overrides(obj, cls: type, name: str) -> bool:
+    """
+    check if the class of obj overrides a method of cls
+    :param obj: object to check
+    :param cls: base class
+    :param name: method name
+    :return: True if type(obj).name is not cls.name
+    """
+    return getattr(type(obj), name) is not getattr(cls, name)
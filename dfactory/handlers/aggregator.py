@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+
+"""
+Aggregator groups items by key fields and reduces fields of each group
+
+groups are kept in a dict of key to a list of reducer states, updated by a function
+generated for the configured aggregates. When there are more than max_groups groups,
+they are spilled to partition files by the hash of the key, and at the end of input
+each partition is loaded and merged on its own, so memory is bounded by
+max_groups and the size of a partition.
+"""
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+from dfactory.core import Handler
+from dfactory.core.utils import import_class, overrides
+
+
+class Reducer:
+    """
+    reducer of the values of a field in a group, field None for the whole item
+
+    create returns the state of an empty group, update adds a value to a state,
+    merge combines states of the same group spilled at different times
+    and result gets the aggregated value. States shall be picklable.
+    inline is a statement doing update on value v and state S for the generated
+    update function, None to call update.
+    """
+
+    def __init__(self, field: str = None):
+        self.field = field
+
+    def create(self):
+        """
+        state of an empty group
+        :return: state
+        """
+        return None
+
+    def update(self, state, value):
+        """
+        add value to state
+        :param state: state
+        :param value: value of field or the item if field is None
+        :return: new state
+        """
+        raise NotImplementedError('virtual function called')
+
+    def merge(self, state, other):
+        """
+        combine two states of a group, other is from later items
+        :param state: state
+        :param other: state
+        :return: combined state
+        """
+        raise NotImplementedError('virtual function called')
+
+    def result(self, state):
+        """
+        aggregated value of state
+        :param state: state
+        :return: value
+        """
+        return state
+
+    def inline(self) -> Optional[str]:
+        """
+        statement doing update on value v and state S
+        :return: statement or None
+        """
+        return None
+
+
+class Count(Reducer):
+    """number of items, items with field not None if field is set"""
+
+    def create(self):
+        return 0
+
+    def update(self, state, value):
+        return state + 1 if self.field is None or value is not None else state
+
+    def merge(self, state, other):
+        return state + other
+
+    def inline(self) -> Optional[str]:
+        return "S += 1" if self.field is None else "if v is not None: S += 1"
+
+
+class Sum(Reducer):
+    """sum of values not None"""
+
+    def create(self):
+        return 0
+
+    def update(self, state, value):
+        return state if value is None else state + value
+
+    def merge(self, state, other):
+        return state + other
+
+    def inline(self) -> Optional[str]:
+        return "if v is not None: S += v"
+
+
+class Min(Reducer):
+    """min of values not None"""
+
+    def update(self, state, value):
+        return value if value is not None and (state is None or value < state) else state
+
+    def merge(self, state, other):
+        return self.update(state, other)
+
+    def inline(self) -> Optional[str]:
+        return "if v is not None and (S is None or v < S): S = v"
+
+
+class Max(Reducer):
+    """max of values not None"""
+
+    def update(self, state, value):
+        return value if value is not None and (state is None or value > state) else state
+
+    def merge(self, state, other):
+        return self.update(state, other)
+
+    def inline(self) -> Optional[str]:
+        return "if v is not None and (S is None or v > S): S = v"
+
+
+class Avg(Reducer):
+    """average of values not None, state is [sum, count]"""
+
+    def create(self):
+        return [0, 0]
+
+    def update(self, state, value):
+        if value is not None:
+            state[0] += value
+            state[1] += 1
+        return state
+
+    def merge(self, state, other):
+        return [state[0] + other[0], state[1] + other[1]]
+
+    def result(self, state):
+        return state[0] / state[1] if state[1] else None
+
+    def inline(self) -> Optional[str]:
+        return "if v is not None: S[0] += v; S[1] += 1"
+
+
+class First(Reducer):
+    """first value not None"""
+
+    def update(self, state, value):
+        return value if state is None else state
+
+    def merge(self, state, other):
+        return other if state is None else state
+
+    def inline(self) -> Optional[str]:
+        return "if S is None: S = v"
+
+
+class Last(Reducer):
+    """last value not None"""
+
+    def update(self, state, value):
+        return state if value is None else value
+
+    def merge(self, state, other):
+        return state if other is None else other
+
+    def inline(self) -> Optional[str]:
+        return "if v is not None: S = v"
+
+
+REDUCERS = {"count": Count, "sum": Sum, "min": Min, "max": Max, "avg": Avg,
+            "first": First, "last": Last}
+
+
+def create_reducer(cfg) -> Reducer:
+    """
+    create a reducer from config
+    :param cfg: {"op": name or reducer class path, "field": field}, or [op, field]
+    :return: Reducer
+    """
+    if isinstance(cfg, (list, tuple)):
+        cfg = {"op": cfg[0], "field": cfg[1] if len(cfg) > 1 else None}
+    op = cfg["op"]
+    reducer_class = REDUCERS[op] if op in REDUCERS else import_class(op)
+    return reducer_class(cfg.get("field"))
+
+
+class Aggregator(Handler):  # pylint: disable=too-many-instance-attributes
+    """
+    Aggregator
+    group items by keys and emit one item per group at the end of input with the key
+    fields and the aggregates, items are dropped while they are aggregated.
+
+    aggregates maps output field to a reducer config, {"op": "sum", "field": "amount"}
+    or ["sum", "amount"], op is count, sum, min, max, avg, first, last or the class path
+    of a Reducer. None values are skipped by reducers of a field.
+    If there are more than max_groups groups they are spilled to partitions files
+    in spill_dir. Groups are emitted in insertion order if nothing was spilled.
+    Groups are not saved by checkpoint, so pipelines with checkpoint refuse Aggregator.
+    """
+    parallel_safe = False
+    resumable = False
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.keys = kwargs.get("keys", [])
+        self.aggregates = kwargs.get("aggregates", {})
+        self.max_groups = kwargs.get("max_groups", 1000000)
+        self.partitions = kwargs.get("partitions", 16)
+        self.spill_dir = kwargs.get("spill_dir")
+        self.spills = 0
+        self._reducers = []
+        self._groups = {}
+        self._update = None
+        self._tmpdir = None
+        self._files = None
+
+    def load_data(self, cfg: dict):
+        """
+        load data
+        :param cfg: config data
+        :return: None
+        """
+        self.keys = cfg.get("keys", self.keys)
+        self.aggregates = cfg.get("aggregates", self.aggregates)
+        self.max_groups = cfg.get("max_groups", self.max_groups)
+        self.partitions = cfg.get("partitions", self.partitions)
+        self.spill_dir = cfg.get("spill_dir", self.spill_dir)
+
+    def on_create(self):
+        """create reducers and the update function"""
+        self._reducers = [create_reducer(cfg) for cfg in self.aggregates.values()]
+        self._groups = {}
+        self._update = self.generate_update()
+        self.spills = 0
+
+    def on_destroy(self):
+        """remove spilled partitions"""
+        self.close_spill()
+        self._groups = {}
+        self._update = None
+
+    def generate_update(self):
+        """
+        generate function(item) adding item to its group
+        :return: function
+        """
+        env = {"groups": self._groups}
+        if len(self.keys) == 1:
+            env["K0"] = self.keys[0]
+            key = "item.get(K0)"
+        else:
+            for index, name in enumerate(self.keys):
+                env[f"K{index}"] = name
+            key = "(" + "".join(f"item.get(K{index}), " for index in range(len(self.keys))) + ")"
+        states = ", ".join(f"R{index}.create()" for index in range(len(self._reducers)))
+        lines = ["def update(item):",
+                 f"    key = {key}",
+                 "    s = groups.get(key)",
+                 "    if s is None:",
+                 f"        s = groups[key] = [{states}]"]
+        for index, reducer in enumerate(self._reducers):
+            env[f"R{index}"] = reducer
+            env[f"F{index}"] = reducer.field
+            value = "item" if reducer.field is None else f"item.get(F{index})"
+            statement = reducer.inline()
+            if statement is None:
+                lines.append(f"    s[{index}] = R{index}.update(s[{index}], {value})")
+            else:
+                lines.append(f"    v = {value}")
+                lines.append("    " + re.sub(r"\bS\b", f"s[{index}]", statement))
+        code = compile("\n".join(lines), "<dfactory aggregator>", "exec")
+        exec(code, env)  # pylint: disable=exec-used
+        return env["update"]
+
+    def handle(self, item: dict) -> Optional[dict]:
+        """add item to its group, the item is dropped"""
+        self._update(item)
+        if len(self._groups) > self.max_groups:
+            self.spill()
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        if overrides(self, Aggregator, 'handle'):
+            return super().handle_batch(items)
+        update, groups = self._update, self._groups
+        for item in items:
+            update(item)
+        if len(groups) > self.max_groups:
+            self.spill()
+        return []
+
+    def spill(self):
+        """
+        append groups in memory to partition files by the hash of keys
+        :return: None
+        """
+        if not self._groups:
+            return
+        if self._files is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="dfactory-agg-", dir=self.spill_dir)
+            paths = [os.path.join(self._tmpdir, f"part{index}.pkl")
+                     for index in range(self.partitions)]
+            # partition files stay open for appending until finish or close_spill
+            # pylint: disable-next=consider-using-with
+            self._files = [open(path, "wb") for path in paths]
+        parts = [[] for _ in self._files]
+        for key, states in self._groups.items():
+            parts[hash(key) % len(parts)].append((key, states))
+        for file, part in zip(self._files, parts):
+            if part:
+                pickle.dump(part, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._groups.clear()
+        self.spills += 1
+
+    def close_spill(self):
+        """close and remove partition files"""
+        for file in self._files or ():
+            file.close()
+        self._files = None
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    def load_partition(self, path: str) -> Dict[object, list]:
+        """
+        merge the groups spilled to a partition file
+        :param path: partition file
+        :return: dict of key to states
+        """
+        reducers = self._reducers
+        groups = {}
+        with open(path, "rb") as fin:
+            while True:
+                try:
+                    part = pickle.load(fin)
+                except EOFError:
+                    return groups
+                for key, states in part:
+                    merged = groups.get(key)
+                    if merged is None:
+                        groups[key] = states
+                    else:
+                        groups[key] = [reducer.merge(state, other) for reducer, state, other
+                                       in zip(reducers, merged, states)]
+
+    def results(self, groups: Dict[object, list]) -> Iterable[dict]:
+        """
+        items of groups
+        :param groups: dict of key to states
+        :return: generator of items
+        """
+        keys, names, reducers = self.keys, list(self.aggregates), self._reducers
+        for key, states in groups.items():
+            if len(keys) == 1:
+                item = {keys[0]: key}
+            else:
+                item = dict(zip(keys, key))
+            for name, reducer, state in zip(names, reducers, states):
+                item[name] = reducer.result(state)
+            yield item
+
+    def finish(self) -> Iterable[dict]:
+        """
+        items of all groups, spilled partitions are merged one at a time
+        :return: generator of items
+        """
+        if self._files is None:
+            yield from self.results(self._groups)
+            self._groups.clear()
+            return
+        self.spill()
+        paths = [file.name for file in self._files]
+        for file in self._files:
+            file.close()
+        for path in paths:
+            yield from self.results(self.load_partition(path))
+            os.remove(path)
+        self.close_spill()
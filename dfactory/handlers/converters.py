@@ -4,12 +4,17 @@
 Converters are item modifiers
 """
 
-from typing import List
+from typing import Callable, List, Optional
 
 from dfactory.core import CondHandler
+from dfactory.core.columns import ColumnBatch, map_column, to_list
+from dfactory.core.utils import overrides
 from dfactory.handlers.matches import Match
 from dfactory.handlers.updaters import Updater
-from dfactory.utils.jsonutils import read_json
+from dfactory.utils.mapperstore import load_mapper
+
+
+_KEEP = object()
 
 
 class Converter(CondHandler):
@@ -41,6 +46,47 @@ class Converter(CondHandler):
             item = updater.handle(item)
         return item
 
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        convert the matched items of a batch, updaters run once per batch
+        :param items: items to be handled
+        :return: handled items
+        """
+        if overrides(self, Converter, 'handle') or overrides(self, Converter, 'check') or \
+                overrides(self, Converter, 'operate'):
+            return super().handle_batch(items)
+        match = self.match.match
+        selected = [i for i, item in enumerate(items) if match(item) is not None]
+        if len(selected) == 0:
+            return items
+        converted = [items[i] for i in selected]
+        for updater in self.updaters:
+            converted = updater.handle_batch(converted)
+        result = list(items)
+        for i, item in zip(selected, converted):
+            result[i] = item
+        return result
+
+    def compile_check(self) -> Optional[Callable[[dict], bool]]:
+        if overrides(self, Converter, 'check'):
+            return self.check
+        match = self.match.compile()
+        return lambda item: match(item) is not None
+
+    def compile_operate(self) -> Callable[[dict], dict]:
+        if overrides(self, Converter, 'operate'):
+            return self.operate
+        updaters = tuple(updater.compile() for updater in self.updaters)
+        if len(updaters) == 1:
+            return updaters[0]
+
+        def operate(item: dict) -> dict:
+            for updater in updaters:
+                item = updater(item)
+            return item
+
+        return operate
+
     def load_data(self, cfg: dict):
         """
         construct new Converter from config
@@ -61,8 +107,9 @@ class Converter(CondHandler):
 
 class DictConverter(CondHandler):
     """
-    convert one field of data with dict
+    convert one field of data with dict, a ColumnBatch is converted column-wise
     """
+    columnar = True
 
     def __init__(self, **kwargs):
         """
@@ -70,7 +117,7 @@ class DictConverter(CondHandler):
         :param key: source key
         :param dst: target key leave empty to update item[@param key]
         :param mapper: data map, dict or string, if mapper is a string
-                        then it will be regard as json file
+                        then it will be regard as json file or compiled mapper store
         :param default: default type, describe how to set value if item[@param key]
                 not in @param mapper.
                 If default is None, use item[@param dst] if @param dst
@@ -97,7 +144,7 @@ class DictConverter(CondHandler):
         """
         mapper = cfg.get("mapper")
         if isinstance(mapper, str):
-            mapper = read_json(mapper)
+            mapper = load_mapper(mapper)
         self.mapper = mapper
         self.key = cfg['key']
         self.dst = cfg.get("dst", self.key)
@@ -128,9 +175,97 @@ class DictConverter(CondHandler):
             item[self.dst] = self.mapper[item[self.key]]
         return item
 
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        convert a batch of items with dict mapper
+        :param items: items to be handled
+        :return: handled items
+        """
+        if isinstance(items, ColumnBatch):
+            if self.convert_columns(items):
+                return items
+            items = items.to_rows()
+        if isinstance(self.key, list) or self.overridden():
+            return super().handle_batch(items)
+        mapper = self.mapper
+        key = self.key
+        dst = self.dst
+        default = self.default
+        match = None if self.cond is None else self.cond.match
+        for item in items:
+            if match is not None and not match(item):
+                continue
+            value = item[key]
+            if value in mapper:
+                item[dst] = mapper[value]
+            elif default is not None:
+                item[dst] = default
+            elif dst not in item:
+                item[dst] = value
+        return items
+
+    def convert_columns(self, batch: ColumnBatch) -> bool:
+        """
+        convert a ColumnBatch in place, the mapper is looked up once per distinct value
+        :param batch: items by column
+        :return: False if batch can only be converted by rows
+        """
+        if isinstance(self.key, list) or self.overridden():
+            return False
+        mask = None if self.cond is None else to_list(self.cond.match_columns(batch))
+        if mask is not None and self.dst not in batch:
+            return False
+        mapper = self.mapper
+        default = _KEEP if self.default is None else self.default
+        values = batch[self.key]
+        converted = map_column(values, lambda value: mapper[value] if value in mapper else default)
+        old = to_list(batch[self.dst] if self.dst in batch else values)
+        if mask is None:
+            batch[self.dst] = [value if new is _KEEP else new for new, value in zip(converted, old)]
+        else:
+            batch[self.dst] = [new if matched and new is not _KEEP else value
+                               for new, value, matched in zip(converted, old, mask)]
+        return True
+
+    def overridden(self) -> bool:
+        """
+        check if a subclass overrides handle, check or operate, batches are then
+        handled item by item
+        :return: True if overridden
+        """
+        return overrides(self, DictConverter, 'handle') or \
+            overrides(self, DictConverter, 'check') or overrides(self, DictConverter, 'operate')
+
     def check(self, item: dict) -> bool:
         return True if self.cond is None else self.cond.match(item)
 
+    def compile_check(self) -> Optional[Callable[[dict], bool]]:
+        if overrides(self, DictConverter, 'check'):
+            return self.check
+        return None if self.cond is None else self.cond.compile()
+
+    def compile_operate(self) -> Callable[[dict], dict]:
+        if overrides(self, DictConverter, 'operate') or isinstance(self.key, list):
+            return self.operate
+        mapper = self.mapper
+        key = self.key
+        dst = self.dst
+        default = self.default
+        if default is not None:
+            def operate(item: dict) -> dict:
+                value = item[key]
+                item[dst] = mapper[value] if value in mapper else default
+                return item
+        else:
+            def operate(item: dict) -> dict:
+                value = item[key]
+                if value in mapper:
+                    item[dst] = mapper[value]
+                elif dst not in item:
+                    item[dst] = value
+                return item
+        return operate
+
 
 class KeysPicker(CondHandler):
     """
@@ -160,6 +295,27 @@ class KeysPicker(CondHandler):
                 break
         return item
 
+    def compile_check(self) -> Optional[Callable[[dict], bool]]:
+        if overrides(self, KeysPicker, 'check'):
+            return self.check
+        return None if self.cond is None else self.cond.compile()
+
+    def compile_operate(self) -> Callable[[dict], dict]:
+        if overrides(self, KeysPicker, 'operate'):
+            return self.operate
+        keys = tuple(self.keys)
+        dst = self.dst
+
+        def operate(item: dict) -> dict:
+            for key in keys:
+                value = item.get(key)
+                if value is not None:
+                    item[dst] = value
+                    break
+            return item
+
+        return operate
+
     def load_data(self, cfg: dict):
         self.keys = cfg["keys"]
         self.dst = cfg['dst']
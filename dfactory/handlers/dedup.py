@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+
+"""
+Dedup drops items whose key fields were seen before
+
+keys of items are hashed into fixed size blake2b digests. In exact mode digests are kept
+in a set until the memory budget is reached, then the set is written to a sorted run file
+and searched by binary search on its mmap. In bloom mode digests set bits of a bloom filter
+of the configured false positive rate, so memory is fixed but a new item may be dropped
+as a duplicate with that probability.
+"""
+import math
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from bisect import bisect_right
+from hashlib import blake2b
+from heapq import merge
+from itertools import islice
+from typing import List, Optional
+
+from dfactory.core import Handler
+
+
+def _same(value):
+    return value
+
+
+def _sorted_pairs(value: dict) -> tuple:
+    return "dict", tuple(sorted((repr(canonical(key)), canonical(val))
+                                for key, val in value.items()))
+
+
+_CANONICAL = {
+    str: _same, bytes: _same, type(None): _same, int: int, bool: int,
+    float: lambda value: int(value) if value.is_integer() else value,
+    dict: _sorted_pairs,
+    list: lambda value: ("list", tuple(map(canonical, value))),
+    tuple: lambda value: ("tuple", tuple(map(canonical, value))),
+    set: lambda value: ("set", tuple(sorted(repr(canonical(val)) for val in value))),
+}
+_CANONICAL[frozenset] = _CANONICAL[set]
+
+
+def canonical(value):
+    """
+    value normalized so that values comparing equal have the same repr, numbers equal
+    to an int become that int, dicts and sets become sorted tuples tagged by type
+    :param value: value
+    :return: normalized value
+    """
+    convert = _CANONICAL.get(type(value))
+    if convert is None:
+        convert = next((convert for kind, convert in _CANONICAL.items()
+                        if isinstance(value, kind)), _same)
+    return convert(value)
+
+
+class DigestRun:
+    """
+    a file of sorted digests, every FENCE-th digest is kept in memory to find the block
+    of a digest before searching it in the mmap
+    """
+    FENCE = 256
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.count = os.path.getsize(path) // size
+        # the file backs the mmap until close
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        step = self.FENCE * size
+        self.fences = [self._mm[offset:offset + size]
+                       for offset in range(0, self.count * size, step)]
+
+    def __contains__(self, digest: bytes) -> bool:
+        block = bisect_right(self.fences, digest) - 1
+        if block < 0:
+            return False
+        low = block * self.FENCE
+        high = min(low + self.FENCE, self.count)
+        mm, size = self._mm, self.size
+        while low < high:
+            mid = (low + high) // 2
+            value = mm[mid * size:mid * size + size]
+            if value < digest:
+                low = mid + 1
+            elif value > digest:
+                high = mid
+            else:
+                return True
+        return False
+
+    def __iter__(self):
+        mm, size = self._mm, self.size
+        return (mm[offset:offset + size] for offset in range(0, self.count * size, size))
+
+    def memory_usage(self) -> int:
+        """bytes of the fences"""
+        return sys.getsizeof(self.fences) + len(self.fences) * sys.getsizeof(bytes(self.size))
+
+    def close(self):
+        """close and delete the file"""
+        self._mm.close()
+        self._file.close()
+        os.remove(self.path)
+
+
+class DigestSet:  # pylint: disable=too-many-instance-attributes
+    """
+    set of digests in memory up to memory bytes, spilled to sorted DigestRun files
+    in a temporary directory, runs are merged into one if there are more than max_runs
+    """
+
+    def __init__(self, size: int, memory: int, directory: str = None, max_runs: int = 16):
+        """
+        :param size: bytes of a digest
+        :param memory: memory budget of the in-memory set in bytes
+        :param directory: parent directory of spilled runs, the system temporary one by default
+        :param max_runs: runs to keep before merging them
+        """
+        self.size = size
+        self.directory = directory
+        self.max_runs = max_runs
+        # a set entry costs the bytes object and about 48 bytes of hash table
+        self.limit = max(memory // (sys.getsizeof(bytes(size)) + 48), 1)
+        self.runs = []
+        self._set = set()
+        self._tmpdir = None
+        self._serial = 0
+
+    def __len__(self):
+        return len(self._set) + sum(run.count for run in self.runs)
+
+    def add(self, digest: bytes) -> bool:
+        """
+        add digest
+        :param digest: digest
+        :return: True if the digest was already in the set
+        """
+        if digest in self._set:
+            return True
+        for run in self.runs:
+            if digest in run:
+                return True
+        self._set.add(digest)
+        if len(self._set) >= self.limit:
+            self.spill()
+        return False
+
+    def _new_path(self) -> str:
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="dfactory-dedup-", dir=self.directory)
+        self._serial += 1
+        return os.path.join(self._tmpdir, f"run{self._serial}.bin")
+
+    def _write_run(self, digests) -> DigestRun:
+        path = self._new_path()
+        with open(path, "wb") as fout:
+            while True:
+                chunk = b"".join(islice(digests, 65536))
+                if not chunk:
+                    break
+                fout.write(chunk)
+        return DigestRun(path, self.size)
+
+    def spill(self):
+        """
+        write the in-memory digests to a sorted run
+        :return: None
+        """
+        if not self._set:
+            return
+        self.runs.append(self._write_run(iter(sorted(self._set))))
+        self._set = set()
+        if len(self.runs) > self.max_runs:
+            runs = self.runs
+            self.runs = [self._write_run(merge(*runs))]
+            for run in runs:
+                run.close()
+
+    def memory_usage(self) -> int:
+        """estimated bytes in memory"""
+        return (sys.getsizeof(self._set) + len(self._set) * sys.getsizeof(bytes(self.size))
+                + sum(run.memory_usage() for run in self.runs))
+
+    def disk_usage(self) -> int:
+        """bytes of spilled runs"""
+        return sum(run.count * run.size for run in self.runs)
+
+    def close(self):
+        """release memory and delete spilled runs"""
+        for run in self.runs:
+            run.close()
+        self.runs = []
+        self._set = set()
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+
+class BloomFilter:
+    """
+    bloom filter of digests sized for capacity items at error_rate false positives,
+    bit positions are derived from the first 16 bytes of a digest by double hashing
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.bits = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.bits / capacity * math.log(2))), 1)
+        self.count = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def add(self, digest: bytes) -> bool:
+        """
+        add digest
+        :param digest: digest of at least 16 bytes
+        :return: True if the digest may have been added before
+        """
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:16], "little") | 1
+        array, bits = self._array, self.bits
+        found = True
+        for index in range(self.hashes):
+            position = (first + index * second) % bits
+            mask = 1 << (position & 7)
+            if not array[position >> 3] & mask:
+                found = False
+                array[position >> 3] |= mask
+        if not found:
+            self.count += 1
+        return found
+
+    def error_rate(self) -> float:
+        """false positive rate at the current number of items"""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def memory_usage(self) -> int:
+        """bytes in memory"""
+        return sys.getsizeof(self._array)
+
+    @staticmethod
+    def disk_usage() -> int:
+        """nothing is on disk"""
+        return 0
+
+    def close(self):
+        """release the bit array"""
+        self._array = bytearray()
+
+
+class Dedup(Handler):  # pylint: disable=too-many-instance-attributes
+    """
+    Dedup
+    drop items whose values of keys were seen before, all fields if keys is empty
+
+    mode is exact or bloom. exact mode keeps digests of digest_size bytes in memory
+    up to memory bytes and spills them to sorted runs in spill_dir.
+    bloom mode uses a bloom filter sized for capacity items at error_rate false positives.
+    stats() reports items, duplicates, hit rate and memory use, also after exit.
+    Seen digests are not saved by checkpoint, so pipelines with checkpoint refuse Dedup.
+    """
+    parallel_safe = False
+    resumable = False
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.keys = kwargs.get("keys", [])
+        self.mode = kwargs.get("mode", "exact")
+        self.memory = kwargs.get("memory", 64 << 20)
+        self.digest_size = kwargs.get("digest_size", 16)
+        self.spill_dir = kwargs.get("spill_dir")
+        self.capacity = kwargs.get("capacity", 10000000)
+        self.error_rate = kwargs.get("error_rate", 0.001)
+        self.seen = None
+        self.items = 0
+        self.duplicates = 0
+        self._last_stats = None
+        self._size = self.digest_size
+
+    def load_data(self, cfg: dict):
+        """
+        load data
+        :param cfg: config data
+        :return: None
+        """
+        self.keys = cfg.get("keys", self.keys)
+        self.mode = cfg.get("mode", self.mode)
+        self.memory = cfg.get("memory", self.memory)
+        self.digest_size = cfg.get("digest_size", self.digest_size)
+        self.spill_dir = cfg.get("spill_dir", self.spill_dir)
+        self.capacity = cfg.get("capacity", self.capacity)
+        self.error_rate = cfg.get("error_rate", self.error_rate)
+
+    def on_create(self):
+        """create the digest set or bloom filter"""
+        if self.mode == "exact":
+            self.seen = DigestSet(self.digest_size, self.memory, self.spill_dir)
+        elif self.mode == "bloom":
+            self.seen = BloomFilter(self.capacity, self.error_rate)
+        else:
+            raise ValueError(f"unknown dedup mode: {self.mode}")
+        # bloom bit positions take 16 bytes of the digest
+        self._size = max(self.digest_size, 16) if self.mode == "bloom" else self.digest_size
+        self.items = 0
+        self.duplicates = 0
+        self._last_stats = None
+
+    def on_destroy(self):
+        """keep the statistics and release the seen digests"""
+        if self.seen is not None:
+            self._last_stats = self.stats()
+            self.seen.close()
+        self.seen = None
+
+    def digest(self, item: dict) -> bytes:
+        """
+        digest of the key values of item, equal values have the same digest
+        :param item: item
+        :return: digest
+        """
+        keys = self.keys
+        values = tuple(map(canonical, map(item.get, keys))) if keys else canonical(item)
+        data = repr(values).encode("utf-8", "backslashreplace")
+        return blake2b(data, digest_size=self._size).digest()
+
+    def handle(self, item: dict) -> Optional[dict]:
+        self.items += 1
+        if self.seen.add(self.digest(item)):
+            self.duplicates += 1
+            return None
+        return item
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        add, digest = self.seen.add, self.digest
+        result = [item for item in items if not add(digest(item))]
+        self.items += len(items)
+        self.duplicates += len(items) - len(result)
+        return result
+
+    def stats(self) -> dict:
+        """
+        statistics of the handled items
+        :return: dict of mode, items, duplicates, hit_rate, memory and disk bytes,
+                 and the current false positive rate in bloom mode
+        """
+        if self.seen is None:
+            return dict(self._last_stats or {})
+        stats = {
+            "mode": self.mode,
+            "items": self.items,
+            "duplicates": self.duplicates,
+            "hit_rate": self.duplicates / self.items if self.items else 0.0,
+            "memory": self.seen.memory_usage(),
+            "disk": self.seen.disk_usage(),
+        }
+        if self.mode == "bloom":
+            stats["false_positive_rate"] = self.seen.error_rate()
+        return stats
@@ -2,15 +2,20 @@
 filters are class that filter some items base on some rules
 """
 
+from typing import Callable, List
+
 from dfactory.core import Handler
+from dfactory.core.columns import ColumnBatch, mask_not
+from dfactory.core.utils import overrides
 from dfactory.handlers.matches import Match
 
 
 class Filter(Handler):
     """
     Filter filter some type of item base with a matcher,
-    the one that match are skipped
+    the one that match are skipped, a ColumnBatch is filtered by the mask of the matcher
     """
+    columnar = True
 
     def __init__(self):
         super().__init__()
@@ -23,3 +28,18 @@ class Filter(Handler):
         if self.matcher.match(item):
             return None
         return item
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        if overrides(self, Filter, 'handle'):
+            rows = items.to_rows() if isinstance(items, ColumnBatch) else items
+            return super().handle_batch(rows)
+        if isinstance(items, ColumnBatch):
+            return items.select(mask_not(self.matcher.match_columns(items)))
+        match = self.matcher.match
+        return [item for item in items if not match(item)]
+
+    def compile(self) -> Callable[[dict], dict]:
+        if overrides(self, Filter, 'handle'):
+            return self.handle
+        match = self.matcher.compile()
+        return lambda item: None if match(item) else item
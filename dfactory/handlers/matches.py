@@ -8,9 +8,12 @@ describe rules if item match
 
 import abc
 import re
+from typing import Callable, Sequence
 
 from dfactory.core import LoaderMixin
-from dfactory.core.utils import import_class
+from dfactory.core.columns import ColumnBatch, column_equals, column_isin, full_mask, \
+    mask_and, mask_not, mask_or, to_mask
+from dfactory.core.utils import import_class, overrides
 
 
 class Match(LoaderMixin):
@@ -43,6 +46,21 @@ class Match(LoaderMixin):
         """
         raise NotImplementedError('virtual function called')
 
+    def compile(self) -> Callable[[dict], bool]:
+        """
+        get a function doing the same as match, subclasses may return a specialized one
+        :return: function(item) -> bool
+        """
+        return self.match
+
+    def match_columns(self, batch: ColumnBatch) -> Sequence:
+        """
+        match every item of a ColumnBatch, subclasses may work on whole columns
+        :param batch: items by column
+        :return: boolean mask
+        """
+        return to_mask(list(map(self.match, batch.to_rows())))
+
 
 class KeyMatch(Match):
     """
@@ -59,6 +77,25 @@ class KeyMatch(Match):
             return item.get(self.key) in self.value
         return item.get(self.key) == self.value
 
+    def compile(self) -> Callable[[dict], bool]:
+        if overrides(self, KeyMatch, 'match'):
+            return self.match
+        key = self.key
+        value = self.value
+        if isinstance(value, list):
+            return lambda item: item.get(key) in value
+        return lambda item: item.get(key) == value
+
+    def match_columns(self, batch: ColumnBatch) -> Sequence:
+        if overrides(self, KeyMatch, 'match'):
+            return super().match_columns(batch)
+        column = batch.get(self.key)
+        if column is None:
+            column = [None] * len(batch)
+        if isinstance(self.value, list):
+            return column_isin(column, self.value)
+        return column_equals(column, self.value)
+
     def load_data(self, cfg: dict):
         """
         load data from config
@@ -85,6 +122,32 @@ class DictMatch(Match):
                 return False
         return True
 
+    def compile(self) -> Callable[[dict], bool]:
+        if overrides(self, DictMatch, 'match'):
+            return self.match
+        pairs = tuple(self.data.items())
+        if len(pairs) == 1:
+            (key, value), = pairs
+            return lambda item: key in item and value == item[key]
+
+        def match(item: dict):
+            for key, value in pairs:
+                if key not in item or value != item[key]:
+                    return False
+            return True
+
+        return match
+
+    def match_columns(self, batch: ColumnBatch) -> Sequence:
+        if overrides(self, DictMatch, 'match'):
+            return super().match_columns(batch)
+        mask = full_mask(len(batch), True)
+        for key, value in self.data.items():
+            if key not in batch:
+                return full_mask(len(batch), False)
+            mask = mask_and(mask, column_equals(batch[key], value))
+        return mask
+
     def load_data(self, cfg: dict):
         """
         load data from config
@@ -107,6 +170,16 @@ class TrueMatch(Match):
         """
         return True
 
+    def compile(self) -> Callable[[dict], bool]:
+        if overrides(self, TrueMatch, 'match'):
+            return self.match
+        return lambda item: True
+
+    def match_columns(self, batch: ColumnBatch) -> Sequence:
+        if overrides(self, TrueMatch, 'match'):
+            return super().match_columns(batch)
+        return full_mask(len(batch), True)
+
 
 class RegexMatch(Match):
     """
@@ -134,6 +207,21 @@ class RegexMatch(Match):
     def match(self, item: dict):
         return self.pattern.match(item.get(self.key))
 
+    def compile(self) -> Callable[[dict], bool]:
+        if overrides(self, RegexMatch, 'match'):
+            return self.match
+        key = self.key
+        pattern_match = self.pattern.match
+        return lambda item: pattern_match(item.get(key))
+
+    def match_columns(self, batch: ColumnBatch) -> Sequence:
+        if overrides(self, RegexMatch, 'match'):
+            return super().match_columns(batch)
+        column = batch.get(self.key)
+        if column is None:
+            column = [None] * len(batch)
+        return to_mask(list(map(self.pattern.match, column)))
+
     def load_data(self, cfg: dict):
         """
         load key, and patten from config
@@ -154,6 +242,18 @@ class AndMatch(Match):
     def match(self, item: dict):
         return self.match_a.match(item) and self.match_b.match(item)
 
+    def compile(self) -> Callable[[dict], bool]:
+        if overrides(self, AndMatch, 'match'):
+            return self.match
+        match_a = self.match_a.compile()
+        match_b = self.match_b.compile()
+        return lambda item: match_a(item) and match_b(item)
+
+    def match_columns(self, batch: ColumnBatch) -> Sequence:
+        if overrides(self, AndMatch, 'match'):
+            return super().match_columns(batch)
+        return mask_and(self.match_a.match_columns(batch), self.match_b.match_columns(batch))
+
     def load_data(self, cfg: dict):
         """load data from config"""
         self.match_a = self.from_dict(cfg["a"])
@@ -175,6 +275,18 @@ class OrMatch(Match):
     def match(self, item: dict):
         return self.match_a.match(item) or self.match_b.match(item)
 
+    def compile(self) -> Callable[[dict], bool]:
+        if overrides(self, OrMatch, 'match'):
+            return self.match
+        match_a = self.match_a.compile()
+        match_b = self.match_b.compile()
+        return lambda item: match_a(item) or match_b(item)
+
+    def match_columns(self, batch: ColumnBatch) -> Sequence:
+        if overrides(self, OrMatch, 'match'):
+            return super().match_columns(batch)
+        return mask_or(self.match_a.match_columns(batch), self.match_b.match_columns(batch))
+
     def load_data(self, cfg: dict):
         """ load OrMatch from config"""
         self.match_a = self.from_dict(cfg["a"])
@@ -190,6 +302,17 @@ class NotMatch(Match):
     def match(self, item: dict):
         return not self.match_obj.match(item)
 
+    def compile(self) -> Callable[[dict], bool]:
+        if overrides(self, NotMatch, 'match'):
+            return self.match
+        match = self.match_obj.compile()
+        return lambda item: not match(item)
+
+    def match_columns(self, batch: ColumnBatch) -> Sequence:
+        if overrides(self, NotMatch, 'match'):
+            return super().match_columns(batch)
+        return mask_not(self.match_obj.match_columns(batch))
+
     def load_data(self, cfg: dict):
         """load NotMatch from config"""
         self.match_obj = self.from_dict(cfg["a"])
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""
+Router sends items into named branches of handlers,
+so one seeder scan feeds several transform and output chains
+"""
+from copy import deepcopy
+from typing import Callable, Iterable, List, Optional
+
+from dfactory.core import Handler
+from dfactory.core.columns import handle_batch
+from dfactory.core.compiler import compile_operators
+from dfactory.core.pipeline import iter_finished
+from dfactory.handlers.matches import Match
+
+
+class Branch:
+    """
+    a named chain of handlers with the Match to select items
+    """
+
+    def __init__(self, name: str = None, match: Match = None, operators: list = None,
+                 mutates: bool = True):
+        """
+        :param name: branch name
+        :param match: items matched are sent to the branch, None to match every item
+        :param operators: handlers of the branch
+        :param mutates: False if the handlers of the branch never change items,
+                        so items are shared with other branches without copying
+        """
+        self.name = name
+        self.match = match
+        self.operators = operators if operators is not None else []
+        self.mutates = mutates
+
+    @staticmethod
+    def from_dict(cfg: dict, name: str = None):
+        """
+        create a Branch from config
+        :param cfg: branch config with keys name, match, handlers and mutates
+        :param name: default name
+        :return: new Branch
+        """
+        operators = [Handler.from_dict(handler) for handler in cfg.get("handlers", [])]
+        return Branch(cfg.get("name", name), Match.from_dict(cfg.get("match")),
+                      [operator for operator in operators if operator is not None],
+                      cfg.get("mutates", True))
+
+    def handle(self, item: dict) -> Optional[dict]:
+        """
+        run item over handlers of the branch
+        :param item: item
+        :return: item after the last handler or None if dropped
+        """
+        for operator in self.operators:
+            item = operator.handle(item)
+            if item is None:
+                break
+        return item
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        run a batch over handlers of the branch
+        :param items: items
+        :return: items left after the last handler
+        """
+        for operator in self.operators:
+            items = handle_batch(operator, items)
+            if not items:
+                break
+        return items
+
+    def finish(self):
+        """
+        handle the items handlers of the branch hold until the end of input
+        :return: None
+        """
+        for _ in iter_finished(self.operators):
+            pass
+
+
+class Router(Handler):
+    """
+    route items into branches
+
+    mode "first" sends an item to the first branch matched,
+    mode "all" sends it to every branch matched (fan-out).
+    Items matching no branch go to the default branch if configured.
+    An item shared by several branches is copied for each branch which mutates items,
+    copy is "shallow" (top level fields) or "deep".
+    The router drops items unless passthrough is True, then the origin item goes on.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.routes = []
+        self.default = None
+        self.mode = "first"
+        self.copy = "shallow"
+        self.passthrough = False
+
+    def load_data(self, cfg: dict):
+        self.routes = [Branch.from_dict(route, f"route{index}")
+                       for index, route in enumerate(cfg["routes"])]
+        default = cfg.get("default")
+        if isinstance(default, list):
+            default = {"handlers": default}
+        self.default = None if default is None else Branch.from_dict(default, "default")
+        self.mode = cfg.get("mode", self.mode)
+        self.copy = cfg.get("copy", self.copy)
+        self.passthrough = cfg.get("passthrough", self.passthrough)
+        if self.mode not in ("first", "all"):
+            raise ValueError(f"invalid router mode: {self.mode}")
+
+    @property
+    def branches(self) -> List[Branch]:
+        """routes and default branch"""
+        return self.routes + ([self.default] if self.default is not None else [])
+
+    @property
+    def operators(self) -> list:
+        """handlers of all branches"""
+        return [operator for branch in self.branches for operator in branch.operators]
+
+    @property
+    def parallel_safe(self):
+        """router is parallel safe only if all the handlers of branches are"""
+        return all(getattr(operator, 'parallel_safe', True) for operator in self.operators)
+
+    @property
+    def resumable(self):
+        """router is resumable only if all the handlers of branches are"""
+        return all(getattr(operator, 'resumable', True) for operator in self.operators)
+
+    def __enter__(self):
+        for operator in self.operators:
+            if hasattr(operator, '__enter__'):
+                operator.__enter__()
+        self.on_create()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for operator in self.operators:
+            if hasattr(operator, '__exit__'):
+                operator.__exit__(exc_type, exc_val, exc_tb)
+        self.on_destroy()
+
+    def finish(self) -> Iterable[dict]:
+        """finish branches, their items end in the branches"""
+        for branch in self.branches:
+            branch.finish()
+        return ()
+
+    def checkpoint(self) -> Optional[dict]:
+        states = [operator.checkpoint() if hasattr(operator, 'checkpoint') else None
+                  for operator in self.operators]
+        return {"operators": states} if any(state is not None for state in states) else None
+
+    def restore(self, state: dict):
+        for operator, operator_state in zip(self.operators, state["operators"]):
+            if operator_state is not None:
+                operator.restore(operator_state)
+
+    def get_branches(self, item: dict) -> List[Branch]:
+        """
+        branches an item is sent to
+        :param item: item
+        :return: list of branches
+        """
+        targets = []
+        for branch in self.routes:
+            if branch.match is None or branch.match.match(item):
+                targets.append(branch)
+                if self.mode == "first":
+                    break
+        if not targets and self.default is not None:
+            targets.append(self.default)
+        return targets
+
+    def copy_item(self, item: dict) -> dict:
+        """
+        copy item for a mutating branch
+        :param item: item
+        :return: copy of item
+        """
+        return deepcopy(item) if self.copy == "deep" else dict(item)
+
+    def handle(self, item: dict) -> Optional[dict]:
+        targets = self.get_branches(item)
+        shared = self.passthrough or len(targets) > 1
+        for branch in targets:
+            branch.handle(self.copy_item(item) if shared and branch.mutates else item)
+        return item if self.passthrough else None
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        selected = {id(branch): [] for branch in self.branches}
+        shared = {id(branch): [] for branch in self.branches}
+        for item in items:
+            targets = self.get_branches(item)
+            copy = self.passthrough or len(targets) > 1
+            for branch in targets:
+                selected[id(branch)].append(item)
+                shared[id(branch)].append(copy)
+        for branch in self.branches:
+            batch = selected[id(branch)]
+            if not batch:
+                continue
+            if branch.mutates:
+                batch = [self.copy_item(item) if copy else item
+                         for item, copy in zip(batch, shared[id(branch)])]
+            branch.handle_batch(batch)
+        return items if self.passthrough else []
+
+    def compile(self) -> Callable[[dict], dict]:
+        routes = [(None if branch.match is None else branch.match.compile(),
+                   compile_operators(branch.operators), branch.mutates)
+                  for branch in self.routes]
+        default = None if self.default is None else \
+            (None, compile_operators(self.default.operators), self.default.mutates)
+        first = self.mode == "first"
+        passthrough = self.passthrough
+        copy_item = self.copy_item
+
+        def handle(item: dict) -> Optional[dict]:
+            targets = []
+            for route in routes:
+                if route[0] is None or route[0](item):
+                    targets.append(route)
+                    if first:
+                        break
+            if not targets and default is not None:
+                targets.append(default)
+            shared = passthrough or len(targets) > 1
+            for _, fused, mutates in targets:
+                fused(copy_item(item) if shared and mutates else item)
+            return item if passthrough else None
+
+        return handle
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+"""
+Sorter sorts all items by key fields with bounded memory
+
+items are buffered up to buffer_size, then a buffer is sorted and written as a run,
+a record file of marshal or pickle frames, by the main process or a pool of worker
+processes. At the end of input the runs are merged by heapq.merge, in passes of
+at most merge_width runs, and the sorted items go to the handlers after the sorter.
+"""
+import heapq
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import total_ordering
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from dfactory.core import Handler
+from dfactory.core.utils import overrides
+from dfactory.utils.records import MAGIC, encode_records, encode_schema, iter_frames
+
+RUN_FRAME_SIZE = 4096
+
+
+@total_ordering
+class Descending:
+    """
+    wrapper of a sort key value reversing its order
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+def parse_sort_keys(keys: list) -> List[Tuple[str, bool]]:
+    """
+    parse sort keys config
+    :param keys: list of field or [field, "asc" or "desc"]
+    :return: list of (field, descending)
+    """
+    parsed = []
+    for key in keys:
+        if isinstance(key, str):
+            parsed.append((key, False))
+            continue
+        field, order = key
+        if order not in ("asc", "desc"):
+            raise ValueError(f"invalid sort order: {order}")
+        parsed.append((field, order == "desc"))
+    return parsed
+
+
+def sort_key(keys: List[Tuple[str, bool]]) -> Tuple[Callable[[dict], tuple], bool]:
+    """
+    key function of sort keys, None sorts after other values in ascending order,
+    if all keys have the same order the key is not wrapped and reverse is used
+    :param keys: list of (field, descending)
+    :return: (key function, reverse)
+    """
+    fields = [field for field, _ in keys]
+    reverse = all(descending for _, descending in keys)
+    if reverse or not any(descending for _, descending in keys):
+        if len(fields) == 1:
+            field = fields[0]
+
+            def single(item):
+                value = item.get(field)
+                return value is None, value
+
+            return single, reverse
+
+        def plain(item):
+            # keys are made per item, tuple of a list is faster than of a generator
+            # pylint: disable-next=consider-using-generator
+            return tuple([(value is None, value) for value in map(item.get, fields)])
+
+        return plain, reverse
+    orders = [descending for _, descending in keys]
+
+    def mixed(item):
+        # pylint: disable-next=consider-using-generator
+        return tuple([Descending((value is None, value)) if descending else (value is None, value)
+                      for value, descending in zip(map(item.get, fields), orders)])
+
+    return mixed, False
+
+
+def sort_items(items: List[dict], keys: List[Tuple[str, bool]]):
+    """
+    sort items in place, keys of different orders are sorted by stable passes
+    from the last key to the first one instead of wrapping descending values
+    :param items: items
+    :param keys: list of (field, descending)
+    :return: None
+    """
+    if len({descending for _, descending in keys}) <= 1:
+        key, reverse = sort_key(keys)
+        items.sort(key=key, reverse=reverse)
+        return
+    for field, descending in reversed(keys):
+        key, _ = sort_key([(field, descending)])
+        items.sort(key=key, reverse=descending)
+
+
+def write_run(items: List[dict], path: str, keys: List[Tuple[str, bool]],
+              codec: str = "marshal") -> str:
+    """
+    sort items and write them as a record file, run by worker processes
+    :param items: items
+    :param path: run file
+    :param keys: list of (field, descending)
+    :param codec: record codec
+    :return: path
+    """
+    sort_items(items, keys)
+    write_records(items, path, codec)
+    return path
+
+
+def write_records(items: Iterable[dict], path: str, codec: str = "marshal"):
+    """
+    write items as a record file with the keys of the first item as schema
+    :param items: items
+    :param path: record file
+    :param codec: record codec
+    :return: None
+    """
+    items = iter(items)
+    with open(path, "wb") as fout:
+        fout.write(MAGIC)
+        schema = None
+        while True:
+            frame = [item for _, item in zip(range(RUN_FRAME_SIZE), items)]
+            if not frame:
+                return
+            if schema is None:
+                schema = tuple(frame[0])
+                fout.write(encode_schema(schema))
+            fout.write(encode_records(frame, schema, codec))
+
+
+def read_records(path: str) -> Iterable[dict]:
+    """
+    read items of a record file
+    :param path: record file
+    :return: generator of items
+    """
+    for _, items in iter_frames(path):
+        yield from items
+
+
+class Sorter(Handler):  # pylint: disable=too-many-instance-attributes
+    """
+    Sorter
+    sort all items by keys and pass them on at the end of input, items are dropped
+    while they are buffered
+
+    keys are fields in ascending order or [field, "asc" or "desc"], None values sort after
+    other values in ascending order and the sort is stable. buffer_size items are sorted
+    in memory, larger inputs are sorted in runs written to spill_dir with codec marshal
+    or pickle, by workers processes if workers is greater than 1.
+    Buffered items and runs are not saved by checkpoint, so pipelines with checkpoint
+    refuse Sorter.
+    """
+    parallel_safe = False
+    resumable = False
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.keys = kwargs.get("keys", [])
+        self.buffer_size = kwargs.get("buffer_size", 100000)
+        self.workers = kwargs.get("workers", 1)
+        self.codec = kwargs.get("codec", "marshal")
+        self.merge_width = kwargs.get("merge_width", 64)
+        self.spill_dir = kwargs.get("spill_dir")
+        self._keys = []
+        self._buffer = []
+        self._runs = []
+        self._pending = []
+        self._executor = None
+        self._tmpdir = None
+        self._serial = 0
+
+    def load_data(self, cfg: dict):
+        """
+        load data
+        :param cfg: config data
+        :return: None
+        """
+        self.keys = cfg.get("keys", self.keys)
+        self.buffer_size = cfg.get("buffer_size", self.buffer_size)
+        self.workers = cfg.get("workers", self.workers)
+        self.codec = cfg.get("codec", self.codec)
+        self.merge_width = cfg.get("merge_width", self.merge_width)
+        self.spill_dir = cfg.get("spill_dir", self.spill_dir)
+
+    def on_create(self):
+        """parse keys"""
+        self._keys = parse_sort_keys(self.keys)
+        self._buffer = []
+        self._runs = []
+        self._pending = []
+
+    def on_destroy(self):
+        """stop workers and remove runs"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._buffer = []
+        self._runs = []
+        self._pending = []
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    def handle(self, item: dict) -> Optional[dict]:
+        """buffer item, the item is dropped"""
+        self._buffer.append(item)
+        if len(self._buffer) >= self.buffer_size:
+            self.spill()
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        if overrides(self, Sorter, 'handle'):
+            return super().handle_batch(items)
+        self._buffer.extend(items)
+        if len(self._buffer) >= self.buffer_size:
+            self.spill()
+        return []
+
+    def new_run_path(self) -> str:
+        """
+        path of a new run in the temporary directory
+        :return: path
+        """
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="dfactory-sort-", dir=self.spill_dir)
+        self._serial += 1
+        return os.path.join(self._tmpdir, f"run{self._serial}.rec")
+
+    def spill(self):
+        """
+        sort buffered items into a run, by a worker process if workers is greater than 1,
+        at most workers runs are in progress
+        :return: None
+        """
+        if not self._buffer:
+            return
+        items, self._buffer = self._buffer, []
+        path = self.new_run_path()
+        if self.workers <= 1:
+            self._runs.append(write_run(items, path, self._keys, self.codec))
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        while len(self._pending) >= self.workers:
+            self._runs.append(self._pending.pop(0).result())
+        self._pending.append(self._executor.submit(write_run, items, path, self._keys,
+                                                  self.codec))
+
+    def merge_runs(self, paths: List[str]) -> Iterable[dict]:
+        """
+        merge sorted runs
+        :param paths: run files
+        :return: generator of sorted items
+        """
+        key, reverse = sort_key(self._keys)
+        return heapq.merge(*[read_records(path) for path in paths], key=key, reverse=reverse)
+
+    def finish(self) -> Iterable[dict]:
+        """
+        sorted items, merged from runs if the items did not fit in the buffer
+        :return: generator of items
+        """
+        if not self._runs and not self._pending:
+            items, self._buffer = self._buffer, []
+            sort_items(items, self._keys)
+            yield from items
+            return
+        self.spill()
+        runs = self._runs + [future.result() for future in self._pending]
+        self._runs, self._pending = [], []
+        while len(runs) > self.merge_width:
+            merged = []
+            for start in range(0, len(runs), self.merge_width):
+                group = runs[start:start + self.merge_width]
+                path = self.new_run_path()
+                write_records(self.merge_runs(group), path, self.codec)
+                for run in group:
+                    os.remove(run)
+                merged.append(path)
+            runs = merged
+        yield from self.merge_runs(runs)
+        for run in runs:
+            os.remove(run)
@@ -8,6 +8,9 @@ import re
 from typing import Dict, Tuple, List
 
 from dfactory.core import Handler
+from dfactory.core.columns import ColumnBatch, to_list
+from dfactory.core.utils import overrides
+from dfactory.utils.mapperstore import load_mapper
 from .keymatcher import KeyMatcher
 
 
@@ -68,6 +71,31 @@ class Updater(Handler):
             item_copy[key] = value
         return item_copy
 
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        update a batch of items, static update keys are resolved once per batch
+        :param items: items to be updated
+        :return: updated items
+        """
+        if overrides(self, Updater, 'handle'):
+            return super().handle_batch(items)
+        get_new_value = self.get_new_value
+        static_keys = None
+        if isinstance(self.key_matcher, dict) and not overrides(self, Updater, 'iter_update_keys'):
+            static_keys = list(self.iter_update_keys({}))
+        result = []
+        for item in items:
+            item_copy = item.copy()
+            keys = static_keys if static_keys is not None else self.iter_update_keys(item)
+            for key, opt in keys:
+                value = get_new_value(item, key, opt)
+                if value is None:
+                    self.log_empty_value(item, key)
+                    continue
+                item_copy[key] = value
+            result.append(item_copy)
+        return result
+
     def load_data(self, cfg: dict):
         self.key_matcher = KeyMatcher.from_dict(cfg)
 
@@ -131,7 +159,11 @@ class CombineUpdater(Updater):
 
 
 class FormatUpdater(Updater):
-    """format updater, update field with new format"""
+    """
+    format updater, update field with new format,
+    a ColumnBatch is updated column-wise if the update keys are static
+    """
+    columnar = True
 
     def __init__(self, key_matcher, pattern: str, keys: List[str] = None):
         Updater.__init__(self, key_matcher)
@@ -141,6 +173,24 @@ class FormatUpdater(Updater):
     def get_new_value(self, item: Dict, key: str, options: Dict) -> object:
         return self.pattern.format_map({k: item[k] for k in self.keys})
 
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        if not isinstance(items, ColumnBatch):
+            return super().handle_batch(items)
+        if not isinstance(self.key_matcher, dict) or overrides(self, FormatUpdater, 'handle') \
+                or overrides(self, FormatUpdater, 'get_new_value'):
+            return super().handle_batch(items.to_rows())
+        keys = tuple(self.keys)
+        format_map = self.pattern.format_map
+        columns = [to_list(items[k]) for k in keys]
+        if columns:
+            values = [format_map(dict(zip(keys, row))) for row in zip(*columns)]
+        else:
+            values = [format_map({})] * len(items)
+        result = items.copy()
+        for key in self.key_matcher:
+            result[key] = list(values)
+        return result
+
     def load_data(self, cfg: dict):
         super().load_data(cfg)
         self.pattern = cfg['pattern']
@@ -165,7 +215,7 @@ class MapperUpdater(Updater):
 
         :param key_matcher: key matcher, describe what keys to update or add
         :param key_dependence: describe how to get value from value_maps
-        :param value_maps: value maps
+        :param value_maps: value maps, a map may be a json file or compiled mapper store
         """
         Updater.__init__(self, key_matcher)
         self.key_depends = key_dependence
@@ -204,4 +254,5 @@ class MapperUpdater(Updater):
     def load_data(self, cfg: dict):
         super().load_data(cfg)
         self.key_depends = cfg['dependence']
-        self.value_maps = cfg['value_maps']
+        self.value_maps = {key: load_mapper(value) if isinstance(value, str) else value
+                           for key, value in cfg['value_maps'].items()}
@@ -3,6 +3,11 @@ Seeders are classes to feed Pipeline
 """
 
 from .csvseeder import CsvSeeder
+from .fastcsvseeder import FastCsvSeeder
 from .jsonseeder import JsonSeeder
+from .multifileseeder import MultiFileSeeder
+from .recordseeder import RecordSeeder
+from .sqliteseeder import SqliteSeeder
 
-__all__ = ["CsvSeeder", "JsonSeeder"]
+__all__ = ["CsvSeeder", "FastCsvSeeder", "JsonSeeder", "MultiFileSeeder", "RecordSeeder",
+           "SqliteSeeder"]
@@ -4,6 +4,8 @@
 csv seeder
 """
 from dfactory.core import Seeder
+from dfactory.utils.compression import detect_compression, open_file
+from dfactory.utils.fileutils import split_file, read_lines
 
 
 class CsvSeeder(Seeder):
@@ -16,20 +18,47 @@ class CsvSeeder(Seeder):
         self._reader = None
         self.sep = kwargs.get("separator", ",")
         self.keys = kwargs.get("keys", [])
+        self.compression = kwargs.get("compression", "auto")
+        self._start = 0
+        self._offset = 0
 
     def iter(self):
         with self:
+            self._reader.seek(self._start)
+            offset = self._start
             for line in self._reader:
-                item = self.line2item(line.strip())
+                offset += len(line)
+                self._offset = offset
+                item = self.line2item(line.decode("utf-8").strip())
                 if item is None:
                     continue
                 yield item
 
+    def tell(self):
+        return self._offset
+
+    def seek(self, position):
+        self._start = self._offset = position
+
+    def shards(self, count: int):
+        if detect_compression(self.src_fn, self.compression) is not None:
+            return None
+        return split_file(self.src_fn, count)
+
+    def iter_shard(self, shard):
+        start, end = shard
+        for line in read_lines(self.src_fn, start, end, self.compression):
+            item = self.line2item(line.strip())
+            if item is None:
+                continue
+            yield item
+
     def load_data(self, cfg: dict):
         self.close()
         self.src_fn = cfg["path"]
         self.sep = cfg.get("separator", self.sep)
         self.keys = cfg["keys"]
+        self.compression = cfg.get("compression", self.compression)
 
     def line2item(self, line: str):
         """
@@ -53,7 +82,7 @@ class CsvSeeder(Seeder):
 
     def __enter__(self):
         if self._reader is None:
-            self._reader = open(self.src_fn, encoding="utf-8")
+            self._reader = open_file(self.src_fn, "rb", self.compression)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""
+fast csv seeder
+"""
+import csv
+import io
+from itertools import islice, repeat
+from operator import length_hint
+from typing import List
+
+from dfactory.core import ColumnBatch, Seeder
+from dfactory.core.columns import typed_column
+from dfactory.utils.compression import detect_compression, open_file
+from dfactory.utils.fileutils import split_file
+
+
+def _to_bool(value: str):
+    return value.strip().lower() in ("1", "true", "yes", "y", "t")
+
+
+def _tolerant(convert):
+    def convert_value(value: str):
+        if value == "":
+            return None
+        try:
+            return convert(value)
+        except ValueError:
+            return None
+
+    return convert_value
+
+
+CONVERTERS = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": _to_bool,
+}
+
+
+class FastCsvSeeder(Seeder):  # pylint: disable=too-many-instance-attributes
+    """
+    a seeder that reads csv file in large blocks and parses them with the csv module
+
+    fields quoted with quotechar may contain separators, quotes and newlines (RFC 4180),
+    columns in types are converted to int, float or bool column by column,
+    empty or invalid values of typed columns become None.
+    Rows whose field count differs from keys are skipped like CsvSeeder.
+    Shards are split on newlines, so they require no newline in quoted fields.
+    If columnar is True, iter_batch generates ColumnBatch instead of lists of dicts.
+    """
+
+    def __init__(self, **kwargs):
+        self.src_fn = kwargs.get("path")
+        self.sep = kwargs.get("separator", ",")
+        self.keys = kwargs.get("keys", [])
+        self.quotechar = kwargs.get("quotechar", '"')
+        self.types = kwargs.get("types", {})
+        self.block_size = kwargs.get("block_size", 1 << 16)
+        self.compression = kwargs.get("compression", "auto")
+        self.columnar = kwargs.get("columnar", False)
+        self._start = [0, 0]
+        self._block = 0
+        self._rows = []
+        self._remaining = iter(())
+
+    def load_data(self, cfg: dict):
+        self.src_fn = cfg["path"]
+        self.sep = cfg.get("separator", self.sep)
+        self.keys = cfg["keys"]
+        self.quotechar = cfg.get("quotechar", self.quotechar)
+        self.types = cfg.get("types", self.types)
+        self.block_size = cfg.get("block_size", self.block_size)
+        self.compression = cfg.get("compression", self.compression)
+        self.columnar = cfg.get("columnar", self.columnar)
+
+    @staticmethod
+    def from_dict(cfg: dict):
+        """create a FastCsvSeeder from configure"""
+        return FastCsvSeeder(**cfg)
+
+    def iter_blocks(self, start: int = 0, end: int = None):
+        """
+        read file in blocks ending on a newline outside of quoted fields
+        :param start: start offset, must be at the beginning of a row
+        :param end: end offset, None to read to the end of file
+        :return: generator of (block offset, block bytes)
+        """
+        quote = self.quotechar.encode("utf-8")
+        with open_file(self.src_fn, "rb", self.compression) as fin:
+            fin.seek(start)
+            offset = pos = start
+            rest = b""
+            while True:
+                size = self.block_size if end is None else min(self.block_size, end - pos)
+                data = fin.read(size) if size > 0 else b""
+                pos += len(data)
+                block = rest + data
+                if not data:
+                    if block:
+                        yield offset, block
+                    return
+                cut = block.rfind(b"\n") + 1
+                while cut > 0 and block.count(quote, 0, cut) % 2 == 1:
+                    cut = block.rfind(b"\n", 0, cut - 1) + 1
+                if cut == 0:
+                    rest = block
+                    continue
+                yield offset, block[:cut]
+                offset += cut
+                rest = block[cut:]
+
+    def split_rows(self, block: bytes) -> List[List[str]]:
+        """
+        split a block into rows of fields, blocks without quotechar are split
+        with str.split, others are parsed with the csv module
+        :param block: csv data of whole rows
+        :return: rows with the same field count as keys
+        """
+        text = block.decode("utf-8")
+        count = len(self.keys)
+        if self.quotechar not in text:
+            if "\r" in text:
+                text = text.replace("\r\n", "\n")
+            lines = text.split("\n")
+            if lines[-1] == "":
+                lines.pop()
+            rows = list(map(str.split, lines, repeat(self.sep)))
+        else:
+            rows = list(csv.reader(io.StringIO(text, newline=""), delimiter=self.sep,
+                                   quotechar=self.quotechar))
+        if any(length != count for length in set(map(len, rows))):
+            rows = [row for row in rows if len(row) == count]
+        return rows
+
+    def parse(self, block: bytes) -> List[list]:
+        """
+        parse a block into rows with typed columns converted
+        :param block: csv data of whole rows
+        :return: list of rows
+        """
+        rows = self.split_rows(block)
+        if not rows or not self.types:
+            return rows
+        columns = list(zip(*rows))
+        for index, key in enumerate(self.keys):
+            type_name = self.types.get(key, "str")
+            if type_name != "str":
+                columns[index] = self.convert(columns[index], type_name)
+        return list(zip(*columns))
+
+    @staticmethod
+    def convert(column, type_name: str) -> list:
+        """
+        convert a column
+        :param column: column values
+        :param type_name: int, float, bool or str
+        :return: converted values
+        """
+        convert = CONVERTERS[type_name]
+        try:
+            return list(map(convert, column))
+        except ValueError:
+            return list(map(_tolerant(convert), column))
+
+    def iter_row_blocks(self, start: int = 0, end: int = None, skip: int = 0):
+        """
+        parsed rows block by block
+        :param start: start offset
+        :param end: end offset
+        :param skip: number of rows to skip from start
+        :return: generator of (block offset, number of rows skipped in block, rows),
+                 position [block offset, n] means the rows after the first n from block offset
+        """
+        for offset, block in self.iter_blocks(start, end):
+            rows = self.parse(block)
+            skipped = min(skip, len(rows))
+            skip -= skipped
+            if skipped < len(rows):
+                yield offset, skipped, rows
+
+    def iter(self):
+        keys = self.keys
+        offset, skip = self._start
+        for block_offset, skipped, rows in self.iter_row_blocks(offset, None, skip):
+            self._block = block_offset
+            self._rows = rows
+            self._remaining = iter(rows[skipped:])
+            yield from map(dict, map(zip, repeat(keys), self._remaining))
+
+    def iter_batch(self, size: int):
+        keys = self.keys
+        offset, skip = self._start
+        for block_offset, skipped, rows in self.iter_row_blocks(offset, None, skip):
+            self._block = block_offset
+            self._rows = rows
+            self._remaining = iter(rows[skipped:])
+            for _ in range(skipped, len(rows), size):
+                if self.columnar:
+                    yield self.to_columns(list(islice(self._remaining, size)))
+                else:
+                    yield list(map(dict, map(zip, repeat(keys), islice(self._remaining, size))))
+
+    def to_columns(self, rows: List[list]) -> ColumnBatch:
+        """
+        convert parsed rows into a ColumnBatch, typed columns are numpy arrays
+        if numpy is installed and they have no invalid value
+        :param rows: parsed rows
+        :return: ColumnBatch
+        """
+        columns = list(zip(*rows)) if rows else [()] * len(self.keys)
+        return ColumnBatch({key: typed_column(column, self.types.get(key, "str"))
+                            for key, column in zip(self.keys, columns)}, len(rows))
+
+    def tell(self):
+        return [self._block, len(self._rows) - length_hint(self._remaining)]
+
+    def seek(self, position):
+        self._start = list(position)
+        self._block, skip = position
+        self._rows = [None] * skip
+        self._remaining = iter(())
+
+    def shards(self, count: int):
+        if detect_compression(self.src_fn, self.compression) is not None:
+            return None
+        return split_file(self.src_fn, count)
+
+    def iter_shard(self, shard):
+        start, end = shard
+        keys = self.keys
+        for _, _, rows in self.iter_row_blocks(start, end):
+            yield from map(dict, map(zip, repeat(keys), rows))
@@ -1,36 +1,75 @@
 """
 JsonSeeder which generate item from json file
 """
-from copy import deepcopy
+from operator import length_hint
 
 from dfactory.core import Seeder
-from dfactory.utils.jsonutils import read_json, read_json_by_line
+from dfactory.utils.compression import detect_compression
+from dfactory.utils.fileutils import split_file, iter_line_blocks
+from dfactory.utils.jsoncodec import get_codec
+from dfactory.utils.jsonutils import iter_json_object, read_json_by_line
 
 
-class JsonSeeder(Seeder):
+class JsonSeeder(Seeder):  # pylint: disable=too-many-instance-attributes
     """
     JsonSeeder generate items from json file
+    codec is the name of json codec, json by default as other codecs reject
+    some input the json module accepts (NaN or integers over 64 bits with orjson)
     """
     KEY_NAME = "__KEY__"
 
-    def __init__(self, path: str = None, key: str = None, is_list: bool = False):
+    def __init__(self, path: str = None, key: str = None, is_list: bool = False,
+                 codec: str = "json", compression: str = "auto"):
         super().__init__()
         self.path = path
         self.__key = self.KEY_NAME if key is None else key
         self.__is_list = is_list
+        self.codec = codec
+        self.compression = compression
+        self._start = 0
+        self._block = (0, [])
+        self._remaining = iter(())
 
     def iter(self) -> dict:
         if self.__is_list:
-            yield from read_json_by_line(self.path)
+            loads_lines = get_codec(self.codec).loads_lines
+            for offset, lines in iter_line_blocks(self.path, self._start,
+                                                  compression=self.compression):
+                self._block = (offset, lines)
+                self._remaining = iter(loads_lines(lines))
+                yield from self._remaining
         else:
-            data = read_json(self.path)
-            for key, values in data.items():
-                item = deepcopy(values)
+            for key, item in iter_json_object(self.path, compression=self.compression):
                 if self.__key not in item:
                     item[self.__key] = key
                 yield item
 
+    def tell(self):
+        if not self.__is_list:
+            return None
+        offset, lines = self._block
+        consumed = len(lines) - length_hint(self._remaining)
+        return offset + len("".join(lines[:consumed]).encode("utf-8")) + consumed
+
+    def seek(self, position):
+        if not self.__is_list:
+            raise NotImplementedError('seek only supported in list mode')
+        self._start = position
+        self._block = (position, [])
+        self._remaining = iter(())
+
+    def shards(self, count: int):
+        if not self.__is_list or detect_compression(self.path, self.compression) is not None:
+            return None
+        return split_file(self.path, count)
+
+    def iter_shard(self, shard):
+        start, end = shard
+        yield from read_json_by_line(self.path, start, end, self.codec, self.compression)
+
     def load_data(self, cfg: dict):
         self.path = cfg['path']
         self.__key = cfg.get('key', self.KEY_NAME)
         self.__is_list = cfg.get('is_list', False)
+        self.codec = cfg.get('codec', self.codec)
+        self.compression = cfg.get('compression', self.compression)
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+"""
+seeder over many files
+"""
+import glob
+import os
+import queue
+import threading
+from collections import deque
+from operator import length_hint
+from typing import List
+
+from dfactory.core import ColumnBatch, Seeder
+
+_END = object()
+
+
+def _tag_batches(batches, path: str, source_key: str = None):
+    """
+    tag items of batches with their file path
+    :param batches: batches of a file
+    :param path: file path
+    :param source_key: key of the path, None to keep items as they are
+    :return: generator of batches
+    """
+    if source_key is None:
+        yield from batches
+        return
+    for batch in batches:
+        if isinstance(batch, ColumnBatch):
+            batch[source_key] = [path] * len(batch)
+            yield batch
+            continue
+        for item in batch:
+            item[source_key] = path
+        yield batch
+
+
+class _FileReader:
+    """
+    batches of one file, read by a background thread if queue_size is set
+    """
+
+    def __init__(self, path: str, batches, queue_size: int = None):
+        self.path = path
+        self._batches = batches
+        self._queue = None
+        self._stop = threading.Event()
+        if queue_size is not None:
+            self._queue = queue.Queue(maxsize=queue_size)
+            threading.Thread(target=self._run, name=f"prefetch:{path}", daemon=True).start()
+
+    def _put(self, obj) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(obj, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            for batch in self._batches:
+                if not self._put(batch):
+                    return
+            self._put(_END)
+        except Exception as ex:  # pylint: disable=broad-except
+            self._put(ex)
+
+    def next_batch(self):
+        """
+        next batch of the file
+        :return: list of items or None at the end of file
+        """
+        if self._queue is None:
+            return next(self._batches, None)
+        batch = self._queue.get()
+        if batch is _END:
+            return None
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+    def close(self):
+        """
+        stop background reading
+        :return: None
+        """
+        self._stop.set()
+
+
+class MultiFileSeeder(Seeder):  # pylint: disable=too-many-instance-attributes
+    """
+    a seeder reading items from many files with a seeder per file
+
+    paths is a list of files, glob patterns and directories (files in directories
+    matching pattern), files are read in sorted order. seeder is the config of
+    the seeder for every file without path. prefetch files after the ones being
+    read are read ahead by background threads, interleave files are read at once
+    taking turns by batch. If source_key is set, items are tagged with their file path.
+    Every file is a shard for ProcessPipeline.
+    """
+
+    def __init__(self, **kwargs):
+        self.paths = kwargs.get("paths", [])
+        self.pattern = kwargs.get("pattern", "*")
+        self.seeder = kwargs.get("seeder", {})
+        self.prefetch = kwargs.get("prefetch", 0)
+        self.interleave = kwargs.get("interleave", 1)
+        self.source_key = kwargs.get("source_key")
+        self.batch_size = kwargs.get("batch_size", 1000)
+        self.queue_size = kwargs.get("queue_size", 4)
+        self._start = [0, 0]
+        self._position = [0, 0]
+        self._batch = iter(())
+
+    def load_data(self, cfg: dict):
+        paths = cfg["paths"]
+        self.paths = [paths] if isinstance(paths, str) else paths
+        self.pattern = cfg.get("pattern", self.pattern)
+        self.seeder = cfg["seeder"]
+        self.prefetch = cfg.get("prefetch", self.prefetch)
+        self.interleave = cfg.get("interleave", self.interleave)
+        self.source_key = cfg.get("source_key", self.source_key)
+        self.batch_size = cfg.get("batch_size", self.batch_size)
+        self.queue_size = cfg.get("queue_size", self.queue_size)
+
+    @staticmethod
+    def from_dict(cfg: dict):
+        """create a MultiFileSeeder from configure"""
+        seeder = MultiFileSeeder()
+        seeder.load_data(cfg)
+        return seeder
+
+    def files(self) -> List[str]:
+        """
+        files to read
+        :return: sorted list of file paths without duplicates
+        """
+        files = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                matched = glob.glob(os.path.join(path, self.pattern))
+            else:
+                matched = glob.glob(path)
+            files.extend(sorted(name for name in matched if os.path.isfile(name)))
+        return list(dict.fromkeys(files))
+
+    def create_seeder(self, path: str) -> Seeder:
+        """
+        create the seeder of a file
+        :param path: file path
+        :return: seeder
+        """
+        return Seeder.from_dict(dict(self.seeder, path=path))
+
+    def _reader(self, path: str, size: int, threaded: bool) -> _FileReader:
+        batches = _tag_batches(self.create_seeder(path).iter_batch(size), path, self.source_key)
+        return _FileReader(path, batches, self.queue_size if threaded else None)
+
+    def _iter_file_batches(self, size: int):
+        """
+        batches of all files from the start position
+        :param size: batch size
+        :return: generator of (file index, batch)
+        """
+        files = self.files()
+        start, skip = self._start
+        pending = deque(range(start, len(files)))
+        threaded = self.prefetch > 0 or self.interleave > 1
+        active = deque()
+        ahead = deque()
+        try:
+            while True:
+                while pending and len(active) + len(ahead) < self.interleave + self.prefetch:
+                    index = pending.popleft()
+                    ahead.append((index, self._reader(files[index], size, threaded)))
+                while ahead and len(active) < self.interleave:
+                    active.append(ahead.popleft())
+                if not active:
+                    return
+                index, reader = active.popleft()
+                batch = reader.next_batch()
+                if batch is None:
+                    continue
+                active.append((index, reader))
+                if skip > 0 and index == start:
+                    dropped = min(skip, len(batch))
+                    skip -= dropped
+                    batch = batch.slice(dropped) if isinstance(batch, ColumnBatch) \
+                        else batch[dropped:]
+                if batch:
+                    yield index, batch
+        finally:
+            for _, reader in list(active) + list(ahead):
+                reader.close()
+
+    def iter(self):
+        for index, batch in self._iter_file_batches(self.batch_size):
+            if index != self._position[0]:
+                self._position = [index, 0]
+            self._position[1] += len(batch)
+            self._batch = iter(batch)
+            yield from self._batch
+
+    def iter_batch(self, size: int):
+        for index, batch in self._iter_file_batches(size):
+            if index != self._position[0]:
+                self._position = [index, 0]
+            self._position[1] += len(batch)
+            yield batch
+
+    def tell(self):
+        """
+        position is [file index, items generated of the file],
+        only if one file is read at once
+        """
+        if self.interleave > 1:
+            return None
+        index, count = self._position
+        return [index, count - length_hint(self._batch)]
+
+    def seek(self, position):
+        if self.interleave > 1:
+            raise NotImplementedError('seek not supported with interleave')
+        self._start = list(position)
+        self._position = list(position)
+        self._batch = iter(())
+
+    def shards(self, count: int):
+        return self.files()
+
+    def iter_shard(self, shard):
+        reader = self._reader(shard, self.batch_size, False)
+        for batch in iter(reader.next_batch, None):
+            yield from batch
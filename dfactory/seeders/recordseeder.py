@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+record seeder
+"""
+from itertools import islice
+from operator import length_hint
+
+from dfactory.core import Seeder
+from dfactory.utils.records import iter_frames, frame_offsets
+
+
+class RecordSeeder(Seeder):
+    """
+    a seeder that reads items from a binary record file written by RecordWriter,
+    items are decoded a frame at a time. Shards are ranges of frames.
+    """
+
+    def __init__(self, **kwargs):
+        self.path = kwargs.get("path")
+        self._start = [0, 0]
+        self._frame = 0
+        self._items = []
+        self._remaining = iter(())
+
+    def load_data(self, cfg: dict):
+        self.path = cfg["path"]
+
+    @staticmethod
+    def from_dict(cfg: dict):
+        """create a RecordSeeder from configure"""
+        return RecordSeeder(**cfg)
+
+    def _iter_frames(self):
+        offset, skip = self._start
+        for frame, items in iter_frames(self.path, offset):
+            self._frame = frame
+            self._items = items
+            self._remaining = iter(items[skip:] if skip else items)
+            skip = 0
+            yield
+
+    def iter(self):
+        for _ in self._iter_frames():
+            yield from self._remaining
+
+    def iter_batch(self, size: int):
+        for _ in self._iter_frames():
+            while length_hint(self._remaining):
+                yield list(islice(self._remaining, size))
+
+    def tell(self):
+        """position is [frame offset, items generated of the frame]"""
+        return [self._frame, len(self._items) - length_hint(self._remaining)]
+
+    def seek(self, position):
+        self._start = list(position)
+        self._frame, skip = position
+        self._items = [None] * skip
+        self._remaining = iter(())
+
+    def shards(self, count: int):
+        offsets = frame_offsets(self.path)
+        if not offsets:
+            return []
+        step = -(-len(offsets) // count)
+        bounds = offsets[::step] + [None]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def iter_shard(self, shard):
+        start, end = shard
+        for _, items in iter_frames(self.path, start, end):
+            yield from items
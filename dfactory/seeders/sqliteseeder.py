@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+sqlite seeder
+"""
+import os
+import sqlite3
+from itertools import repeat
+from operator import length_hint
+from urllib.request import pathname2url
+
+from dfactory.core import Seeder
+
+
+class SqliteSeeder(Seeder):  # pylint: disable=too-many-instance-attributes
+    """
+    a seeder that generates items from rows of a sqlite query, fetched batch_size rows
+    at a time from the cursor, keys of items are the column names of the query
+
+    query is run as is, or all rows of table are read if query is not set.
+    Position is the number of rows generated, so resuming requires a query
+    with a stable order. Tables are sharded by rowid ranges for ProcessPipeline.
+    """
+
+    def __init__(self, **kwargs):
+        self.path = kwargs.get("path")
+        self.table = kwargs.get("table")
+        self.query = kwargs.get("query")
+        self.params = kwargs.get("params", ())
+        self.batch_size = kwargs.get("batch_size", 1000)
+        self.pragmas = kwargs.get("pragmas", {})
+        self._start = 0
+        self._count = 0
+        self._rows = iter(())
+
+    def load_data(self, cfg: dict):
+        self.path = cfg["path"]
+        self.table = cfg.get("table", self.table)
+        self.query = cfg.get("query", self.query)
+        self.params = cfg.get("params", self.params)
+        self.batch_size = cfg.get("batch_size", self.batch_size)
+        self.pragmas = cfg.get("pragmas", self.pragmas)
+
+    @staticmethod
+    def from_dict(cfg: dict):
+        """create a SqliteSeeder from configure"""
+        seeder = SqliteSeeder()
+        seeder.load_data(cfg)
+        return seeder
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        open the database read only and set pragmas, the path is quoted in the uri
+        so characters like ? # % in it are not taken as uri syntax
+        :return: connection
+        """
+        uri = f"file:{pathname2url(os.path.abspath(self.path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def sql(self) -> str:
+        """
+        query to run
+        :return: sql text
+        """
+        if self.query is not None:
+            return self.query
+        if self.table is None:
+            raise ValueError("SqliteSeeder requires query or table")
+        return f'SELECT * FROM "{self.table}"'
+
+    def iter_rows(self, sql: str, params, size: int):
+        """
+        run a query and fetch rows in batches
+        :param sql: query
+        :param params: query parameters
+        :param size: rows of a fetch
+        :return: generator of (keys, rows)
+        """
+        conn = self.connect()
+        try:
+            cursor = conn.execute(sql, params)
+            keys = [column[0] for column in cursor.description or ()]
+            for rows in iter(lambda: cursor.fetchmany(size), []):
+                yield keys, rows
+        finally:
+            conn.close()
+
+    def _iter_from_start(self, size: int):
+        sql, params = self.sql(), self.params
+        if self._start > 0:
+            sql = f"SELECT * FROM ({sql}) LIMIT -1 OFFSET {int(self._start)}"
+        self._count = self._start
+        for keys, rows in self.iter_rows(sql, params, size):
+            self._count += len(rows)
+            self._rows = iter(rows)
+            yield keys
+
+    def iter(self):
+        for keys in self._iter_from_start(self.batch_size):
+            yield from map(dict, map(zip, repeat(keys), self._rows))
+
+    def iter_batch(self, size: int):
+        for keys in self._iter_from_start(size):
+            yield list(map(dict, map(zip, repeat(keys), self._rows)))
+
+    def tell(self):
+        """position is the number of rows generated"""
+        return self._count - length_hint(self._rows)
+
+    def seek(self, position):
+        self._start = self._count = position
+        self._rows = iter(())
+
+    def shards(self, count: int):
+        """rowid ranges of table, None if a query is set"""
+        if self.query is not None or self.table is None:
+            return None
+        conn = self.connect()
+        try:
+            sql = f'SELECT min(rowid), max(rowid) FROM "{self.table}"'
+            low, high = conn.execute(sql).fetchone()
+        finally:
+            conn.close()
+        if low is None:
+            return []
+        step = max((high - low + count) // count, 1)
+        return [[start, min(start + step - 1, high)] for start in range(low, high + 1, step)]
+
+    def iter_shard(self, shard):
+        sql = f'SELECT * FROM "{self.table}" WHERE rowid BETWEEN ? AND ? ORDER BY rowid'
+        for keys, rows in self.iter_rows(sql, tuple(shard), self.batch_size):
+            yield from map(dict, map(zip, repeat(keys), rows))
@@ -1,11 +1,16 @@
 """
 string cutter handler
 """
+from typing import Callable, List
+
 from dfactory.core import Handler
+from dfactory.core.columns import ColumnBatch, to_list
+from dfactory.core.utils import overrides
 
 
 class StringCutter(Handler):
     """cut string field with specify size"""
+    columnar = True
 
     def __init__(self):
         super().__init__()
@@ -33,3 +38,33 @@ class StringCutter(Handler):
         for key, data in self.keys.items():
             item[key] = self.cut(item[key], data.get('start', 0), data['end'], data.get("append"))
         return item
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        if not isinstance(items, ColumnBatch):
+            return super().handle_batch(items)
+        if overrides(self, StringCutter, 'handle') or overrides(self, StringCutter, 'cut'):
+            return super().handle_batch(items.to_rows())
+        for key, data in self.keys.items():
+            start, end, append = data.get('start', 0), data['end'], data.get("append")
+            items[key] = [src if src is None or src == "" else
+                          src[start:end] if append is None or len(src) <= end else
+                          src[start:end] + append
+                          for src in to_list(items[key])]
+        return items
+
+    def compile(self) -> Callable[[dict], dict]:
+        if overrides(self, StringCutter, 'handle') or overrides(self, StringCutter, 'cut'):
+            return self.handle
+        specs = tuple((key, data.get('start', 0), data['end'], data.get("append"))
+                      for key, data in self.keys.items())
+
+        def handle(item: dict) -> dict:
+            for key, start, end, append in specs:
+                src = item[key]
+                if src is None or src == "":
+                    continue
+                dst = src[start:end]
+                item[key] = dst if append is None or len(src) <= end else dst + append
+            return item
+
+        return handle
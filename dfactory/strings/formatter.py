@@ -2,13 +2,18 @@
 String formatter Handler
 """
 
+from typing import Callable, List
+
 from dfactory.core import Handler
+from dfactory.core.columns import ColumnBatch, to_list
+from dfactory.core.utils import overrides
 
 
 class StringFormatter(Handler):
     """
     form a string field with specified keys
     """
+    columnar = True
 
     def __init__(self):
         super().__init__()
@@ -20,6 +25,33 @@ class StringFormatter(Handler):
         item[self.dst] = self.format.format_map({k: item.get(k, "") for k in self.keys})
         return item
 
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        if not isinstance(items, ColumnBatch):
+            return super().handle_batch(items)
+        if overrides(self, StringFormatter, 'handle'):
+            return super().handle_batch(items.to_rows())
+        keys = tuple(self.keys)
+        format_map = self.format.format_map
+        columns = [to_list(items[k]) if k in items else [""] * len(items) for k in keys]
+        if columns:
+            items[self.dst] = [format_map(dict(zip(keys, values))) for values in zip(*columns)]
+        else:
+            items[self.dst] = [format_map({})] * len(items)
+        return items
+
+    def compile(self) -> Callable[[dict], dict]:
+        if overrides(self, StringFormatter, 'handle'):
+            return self.handle
+        keys = tuple(self.keys)
+        dst = self.dst
+        format_map = self.format.format_map
+
+        def handle(item: dict) -> dict:
+            item[dst] = format_map({k: item.get(k, "") for k in keys})
+            return item
+
+        return handle
+
     def load_data(self, cfg: dict):
         self.keys = cfg["keys"]
         self.dst = cfg["dst"]
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+compressed files
+
+gzip, bz2 and xz files are detected by extension or set by name.
+Compressed output is written in blocks compressed by a thread pool as
+independent members (streams) of the file, which decompressors read as one.
+"""
+import bz2
+import gzip
+import lzma
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .outputs import OutputWrapper
+
+EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+}
+
+OPENERS = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+
+COMPRESSORS = {
+    "gzip": lambda data, level: gzip.compress(data, 6 if level is None else level),
+    "bz2": lambda data, level: bz2.compress(data, 9 if level is None else level),
+    "xz": lambda data, level: lzma.compress(data, preset=level),
+}
+
+BLOCK_SIZE = 1 << 20
+
+
+def detect_compression(filename, compression: str = "auto"):
+    """
+    compression of file
+    :param filename: file name
+    :param compression: auto to detect by extension, none, gzip, bz2 or xz
+    :return: gzip, bz2, xz or None for plain file
+    """
+    if compression == "auto":
+        return EXTENSIONS.get(os.path.splitext(str(filename))[1].lower())
+    if compression is None or compression == "none":
+        return None
+    if compression not in OPENERS:
+        raise ValueError(f"unknown compression: {compression}")
+    return compression
+
+
+def open_file(filename, mode: str = "rb", compression: str = "auto"):
+    """
+    open plain or compressed file, text is utf-8
+    :param filename: file to open
+    :param mode: file mode, rb or rt for compressed file
+    :param compression: auto to detect by extension, none, gzip, bz2 or xz
+    :return: file object
+    """
+    compression = detect_compression(filename, compression)
+    encoding = None if "b" in mode else "utf-8"
+    if compression is None:
+        return open(filename, mode, encoding=encoding)
+    return OPENERS[compression](filename, mode, encoding=encoding)
+
+
+class CompressedWriter(OutputWrapper):  # pylint: disable=too-many-instance-attributes
+    """
+    text file writing compressed blocks in the background
+
+    text is buffered until block_size bytes, then the block is compressed by
+    a thread pool into a member of the output. Members are written in order,
+    at most two per worker are pending. flush writes the buffer as a member,
+    so the file position after flush is at a member boundary.
+    """
+
+    def __init__(self, file, compression: str, level: int = None,
+                 block_size: int = BLOCK_SIZE, workers: int = None):
+        """
+        :param file: binary file to write
+        :param compression: gzip, bz2 or xz
+        :param level: compression level, None for the default of the compression
+        :param block_size: bytes of text compressed as one member
+        :param workers: compress threads, None for cpu count
+        """
+        super().__init__(file)
+        self.compression = compression
+        self.level = level
+        self.block_size = block_size
+        self.workers = workers or os.cpu_count() or 1
+        self._compress = COMPRESSORS[compression]
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending = deque()
+        self._buffer = []
+        self._size = 0
+
+    def write(self, text: str) -> int:
+        """
+        write text
+        :param text: text
+        :return: length of text
+        """
+        data = text.encode("utf-8")
+        self._buffer.append(data)
+        self._size += len(data)
+        if self._size >= self.block_size:
+            self._submit()
+        return len(text)
+
+    def writelines(self, lines):
+        """
+        write strings
+        :param lines: strings
+        :return: None
+        """
+        self.write("".join(lines))
+
+    def _submit(self):
+        if self._buffer:
+            block = b"".join(self._buffer)
+            self._buffer = []
+            self._size = 0
+            self._pending.append(self._executor.submit(self._compress, block, self.level))
+        while len(self._pending) > self.workers * 2:
+            self.file.write(self._pending.popleft().result())
+
+    def flush(self):
+        """
+        compress buffered text and write all pending members
+        :return: None
+        """
+        self._submit()
+        while self._pending:
+            self.file.write(self._pending.popleft().result())
+        self.file.flush()
+
+    def tell(self) -> int:
+        """position of compressed output"""
+        return self.file.tell()
+
+    def release(self):
+        """
+        stop compress threads
+        :return: None
+        """
+        self._executor.shutdown()
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+"""
+file utils
+"""
+import mmap
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import List, Tuple
+
+from .compression import CompressedWriter, detect_compression, open_file
+from .outputs import OutputWrapper
+
+
+BLOCK_SIZE = 1 << 16
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+@contextmanager
+def map_file(filename):
+    """
+    memory map a file to read
+    :param filename: file to map
+    :return: context manager of the mmap, None for an empty file
+    """
+    with open(filename, "rb") as fin:
+        if os.fstat(fin.fileno()).st_size == 0:
+            yield None
+            return
+        mapped = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield mapped
+    finally:
+        mapped.close()
+
+
+def line_end(mapped, pos: int) -> int:
+    """
+    end offset of the line containing the byte before pos
+    :param mapped: mapped file
+    :param pos: byte offset
+    :return: pos if it is at the beginning of a line, otherwise offset after the next newline
+    """
+    if pos <= 0:
+        return 0
+    newline = mapped.find(b"\n", pos - 1)
+    return len(mapped) if newline < 0 else newline + 1
+
+
+def split_file(filename, count: int) -> List[Tuple[int, int]]:
+    """
+    split a line based file into byte ranges which start and end on line boundaries,
+    only the line at every split point is read
+    :param filename: file to split
+    :param count: number of ranges wanted
+    :return: list of (start, end) byte ranges, less than count if the file is small
+    """
+    with map_file(filename) as mapped:
+        if mapped is None:
+            return []
+        size = len(mapped)
+        bounds = [0]
+        for i in range(1, count):
+            pos = line_end(mapped, size * i // count)
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_text_blocks(filename, start: int = 0, end: int = None, block_size: int = BLOCK_SIZE,
+                     compression: str = "auto"):
+    """
+    read a byte range of file in text blocks of whole lines, every block is decoded
+    straight from a memoryview slice of the mapped file without copying,
+    compressed files are read through decompression with offsets of decompressed data
+    :param filename: file to read
+    :param start: start offset, must be at the beginning of a line
+    :param end: end offset, None to read to the end of file, a line starting before end
+                is read to its end
+    :param block_size: bytes of a block, a block is larger only if a line is
+    :param compression: auto to detect by extension, none, gzip, bz2 or xz
+    :return: generator of (block offset, text)
+    """
+    if detect_compression(filename, compression) is not None:
+        yield from _iter_stream_blocks(filename, start, end, block_size, compression)
+        return
+    with map_file(filename) as mapped:
+        if mapped is None:
+            return
+        end = len(mapped) if end is None else line_end(mapped, min(end, len(mapped)))
+        with memoryview(mapped) as view:
+            pos = start
+            while pos < end:
+                stop = pos + block_size
+                if stop < end:
+                    newline = mapped.rfind(b"\n", pos, stop)
+                    stop = line_end(mapped, stop) if newline < 0 else newline + 1
+                else:
+                    stop = end
+                yield pos, str(view[pos:stop], "utf-8")
+                pos = stop
+
+
+def _iter_stream_blocks(filename, start: int, end: int, block_size: int, compression: str):
+    """
+    read text blocks of whole lines from a compressed file
+    :return: generator of (block offset, text)
+    """
+    with open_file(filename, "rb", compression) as fin:
+        fin.seek(start)
+        pos = start
+        rest = b""
+        while end is None or pos < end:
+            data = fin.read(block_size)
+            block = rest + data
+            if not data:
+                if block:
+                    yield pos, block.decode("utf-8")
+                return
+            stop = block.rfind(b"\n") + 1
+            if end is not None and pos + stop >= end:
+                stop = block.find(b"\n", max(end - pos - 1, 0)) + 1
+            if stop == 0:
+                rest = block
+                continue
+            yield pos, block[:stop].decode("utf-8")
+            pos += stop
+            rest = block[stop:]
+
+
+def iter_lines(filename, start: int = 0, end: int = None, compression: str = "auto"):
+    """
+    read text lines in a byte range of file with the offset after every line
+    :param filename: file to read
+    :param start: start offset, must be at the beginning of a line
+    :param end: end offset, None to read to the end of file
+    :param compression: auto to detect by extension, none, gzip, bz2 or xz
+    :return: generator of (offset after line, line without newline)
+    """
+    for offset, text in iter_text_blocks(filename, start, end, compression=compression):
+        lines = text.split("\n")
+        tail = lines.pop()
+        if text.isascii():
+            for line in lines:
+                offset += len(line) + 1
+                yield offset, line
+        else:
+            for line in lines:
+                offset += len(line.encode("utf-8")) + 1
+                yield offset, line
+        if tail:
+            yield offset + len(tail.encode("utf-8")), tail
+
+
+def iter_line_blocks(filename, start: int = 0, end: int = None, compression: str = "auto"):
+    """
+    read text lines in a byte range of file block by block
+    :param filename: file to read
+    :param start: start offset, must be at the beginning of a line
+    :param end: end offset, None to read to the end of file
+    :param compression: auto to detect by extension, none, gzip, bz2 or xz
+    :return: generator of (block offset, lines without newline)
+    """
+    for offset, text in iter_text_blocks(filename, start, end, compression=compression):
+        lines = text.split("\n")
+        if not lines[-1]:
+            lines.pop()
+        yield offset, lines
+
+
+def read_lines(filename, start: int = 0, end: int = None, compression: str = "auto"):
+    """
+    read text lines in a byte range of file
+    :param filename: file to read
+    :param start: start offset, must be at the beginning of a line
+    :param end: end offset, None to read to the end of file
+    :param compression: auto to detect by extension, none, gzip, bz2 or xz
+    :return: generator of lines without newline
+    """
+    for _, lines in iter_line_blocks(filename, start, end, compression):
+        yield from lines
+
+
+class BufferedOutput(OutputWrapper):
+    """
+    text output collecting written strings until buffer_size characters,
+    then passing them to writelines of file at once
+
+    if background is True, writelines runs in a writer thread fed by a queue of at most
+    queue_size chunks, so writing only blocks when the queue is full.
+    An error of the writer thread is raised by the next write, flush or close.
+    flush and close return after all the text written is passed to file.
+    """
+
+    def __init__(self, file, buffer_size: int = WRITE_BUFFER_SIZE, background: bool = False,
+                 queue_size: int = 8):
+        """
+        :param file: text file
+        :param buffer_size: characters collected before writing to file
+        :param background: write to file in a thread
+        :param queue_size: max chunks waiting for the writer thread
+        """
+        super().__init__(file)
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._size = 0
+        self._error = None
+        self._queue = None
+        self._thread = None
+        if background:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._thread = threading.Thread(target=self._run, name="writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            try:
+                if chunk is None:
+                    return
+                if self._error is None:
+                    self.file.writelines(chunk)
+            except Exception as ex:  # pylint: disable=broad-except
+                self._error = ex
+            finally:
+                self._queue.task_done()
+
+    def _check(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _emit(self):
+        chunk, self._buffer, self._size = self._buffer, [], 0
+        if self._queue is None:
+            self.file.writelines(chunk)
+        else:
+            self._check()
+            self._queue.put(chunk)
+
+    def write(self, text: str) -> int:
+        """
+        write text
+        :param text: text
+        :return: length of text
+        """
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self._emit()
+        return len(text)
+
+    def writelines(self, lines):
+        """
+        write strings
+        :param lines: strings
+        :return: None
+        """
+        if not isinstance(lines, list):
+            lines = list(lines)
+        self._buffer.extend(lines)
+        self._size += sum(map(len, lines))
+        if self._size >= self.buffer_size:
+            self._emit()
+
+    def flush(self):
+        """
+        pass all the text written to file and flush file
+        :return: None
+        """
+        if self._buffer:
+            self._emit()
+        if self._queue is not None:
+            self._queue.join()
+            self._check()
+        self.file.flush()
+
+    def release(self):
+        """
+        stop writer thread
+        :return: None
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+def open_output(filename, position: int = None, compression: str = "auto", **options):
+    """
+    open text file to write
+    :param filename: file to open
+    :param position: None to create a new file, otherwise truncate file to the byte position
+                     and append to it
+    :param compression: auto to detect by extension, none, gzip, bz2 or xz
+    :param options: level, block_size and workers of CompressedWriter
+    :return: file object
+    """
+    compression = detect_compression(filename, compression)
+    if position is not None:
+        with open(filename, "r+b") as fout:
+            fout.truncate(position)
+    if compression is not None:
+        return CompressedWriter(open(filename, "wb" if position is None else "ab"),
+                                compression, **options)
+    if position is None:
+        return open(filename, "w", encoding="utf-8")
+    return open(filename, "a", encoding="utf-8")
+
+
+def buffered_output(file, buffer_size: int = WRITE_BUFFER_SIZE, background: bool = False):
+    """
+    wrap a text output with BufferedOutput
+    :param file: text file
+    :param buffer_size: characters collected before writing to file, 0 to write directly
+                        or WRITE_BUFFER_SIZE in background
+    :param background: write to file in a thread
+    :return: BufferedOutput or file itself if neither buffering nor background is wanted
+    """
+    if buffer_size <= 0:
+        if not background:
+            return file
+        buffer_size = WRITE_BUFFER_SIZE
+    return BufferedOutput(file, buffer_size, background)
+
+
+def sync_file(file) -> int:
+    """
+    flush file to disk
+    :param file: file object
+    :return: byte position of file
+    """
+    file.flush()
+    os.fsync(file.fileno())
+    return file.tell()
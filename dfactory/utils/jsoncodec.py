@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+"""
+json codecs
+
+a codec encodes objects to json text and decodes json text, many lines at a time.
+orjson or ujson is used by codec "auto" when installed, the json module otherwise.
+numpy scalars and arrays are encoded natively if numpy is installed.
+"""
+import json
+from typing import List
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+_CODECS = {}
+
+
+def encode_default(obj):
+    """
+    convert objects not supported by json encoders
+    :param obj: object
+    :return: json compatible object
+    """
+    if numpy is not None:
+        if isinstance(obj, numpy.ndarray):
+            return obj.tolist()
+        if isinstance(obj, numpy.generic):
+            return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JsonCodec:
+    """
+    codec with the json module of standard library
+    """
+    name = "json"
+
+    def __init__(self):
+        self._encode = json.JSONEncoder(ensure_ascii=False, default=encode_default).encode
+        decoder = json.JSONDecoder()
+        self._decode = decoder.decode
+        self._scan = decoder.scan_once
+
+    def dumps(self, obj) -> str:
+        """
+        encode object
+        :param obj: object
+        :return: json text
+        """
+        return self._encode(obj)
+
+    def loads(self, text: str):
+        """
+        decode json text
+        :param text: json text
+        :return: object
+        """
+        return self._decode(text)
+
+    def dumps_lines(self, objs: list) -> str:
+        """
+        encode objects one per line
+        :param objs: objects
+        :return: json lines ended with newline
+        """
+        if not objs:
+            return ""
+        return "\n".join(map(self.dumps, objs)) + "\n"
+
+    def loads_lines(self, lines: List[str]) -> list:
+        """
+        decode json lines, a line of an object is scanned straight by the scanner of decoder
+        which skips the whitespace checks of loads, it must end at the end of the line,
+        other lines and lines failed to scan are decoded by loads so they raise as usual
+        :param lines: lines of one json value each
+        :return: list of objects
+        """
+        scan = self._scan
+        objs = []
+        for line in lines:
+            if line[:1] == "{" and line[-1:] == "}":
+                try:
+                    obj, end = scan(line, 0)
+                    if end == len(line):
+                        objs.append(obj)
+                        continue
+                except StopIteration:
+                    pass
+            objs.append(self.loads(line))
+        return objs
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    codec with orjson, numpy objects are encoded by orjson itself
+    """
+    # orjson is a compiled extension whose members pylint can not see
+    # pylint: disable=no-member
+    name = "orjson"
+
+    def __init__(self):
+        super().__init__()
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+        def dumps(obj) -> str:
+            return orjson.dumps(obj, default=encode_default, option=option).decode("utf-8")
+
+        self.dumps = dumps
+        self.loads = orjson.loads
+
+    def loads_lines(self, lines: List[str]) -> list:
+        """decode json lines, per line decoding of orjson is faster than joining lines"""
+        return list(map(orjson.loads, lines))
+
+
+class UjsonCodec(JsonCodec):
+    """
+    codec with ujson
+    """
+    name = "ujson"
+
+    def __init__(self):
+        super().__init__()
+        if ujson is None:
+            raise ImportError("ujson is not installed")
+
+        def dumps(obj) -> str:
+            return ujson.dumps(obj, ensure_ascii=False, default=encode_default)
+
+        self.dumps = dumps
+        self.loads = ujson.loads
+
+    def loads_lines(self, lines: List[str]) -> list:
+        """decode json lines one by one with ujson"""
+        return list(map(ujson.loads, lines))
+
+
+CODECS = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+}
+
+
+def available_codecs() -> List[str]:
+    """
+    names of codecs usable in this environment, fastest first
+    :return: list of names
+    """
+    names = []
+    if orjson is not None:
+        names.append(OrjsonCodec.name)
+    if ujson is not None:
+        names.append(UjsonCodec.name)
+    names.append(JsonCodec.name)
+    return names
+
+
+def get_codec(name: str = "auto") -> JsonCodec:
+    """
+    get a shared codec
+    :param name: json, orjson, ujson or auto for the fastest one installed
+    :return: codec
+    """
+    if name == "auto":
+        name = available_codecs()[0]
+    codec = _CODECS.get(name)
+    if codec is None:
+        if name not in CODECS:
+            raise ValueError(f"unknown json codec: {name}")
+        codec = _CODECS[name] = CODECS[name]()
+    return codec
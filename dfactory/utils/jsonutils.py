@@ -4,7 +4,13 @@
 json utils
 """
 import json
+import re
 from json import JSONEncoder
+from json.decoder import scanstring
+
+from .compression import open_file
+from .fileutils import iter_line_blocks
+from .jsoncodec import get_codec
 
 
 class JsonEncoder(JSONEncoder):
@@ -34,12 +40,136 @@ def read_json(filename, line_by_line=False):
         return array
 
 
-def read_json_by_line(filename):
+def read_json_by_line(filename, start: int = None, end: int = None, codec: str = "json",
+                      compression: str = "auto"):
     """
     read json file with format one json item per line
     :param filename: json file
+    :param start: start byte offset of the range to read, None to read the whole file
+    :param end: end byte offset of the range to read, None to read to the end of file
+    :param codec: name of json codec, lines are decoded a block at a time
+    :param compression: auto to detect by extension, none, gzip, bz2 or xz
     :return: generator of json item
     """
-    with open(filename, encoding="utf-8") as fin:
-        for line in fin:
-            yield json.loads(line.strip())
+    loads_lines = get_codec(codec).loads_lines
+    for _, lines in iter_line_blocks(filename, start or 0, end, compression):
+        yield from loads_lines(lines)
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_KEY = re.compile(r'[ \t\n\r]*"')
+_COLON = re.compile(r"[ \t\n\r]*:[ \t\n\r]*")
+_DELIMITER = re.compile(r"[ \t\n\r]*([,}])")
+_DECODER = json.JSONDecoder()
+
+
+class _ChunkReader:
+    """
+    text buffer over a file refilled in chunks, consumed text is dropped on refill
+    """
+
+    def __init__(self, file, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int) -> bool:
+        """
+        read more text to buffer
+        :param size: characters to read
+        :return: False at the end of file
+        """
+        if self.eof:
+            return False
+        data = self.file.read(size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        skip whitespace
+        :return: next character, empty at the end of file
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self.fill(self.chunk_size):
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        """
+        consume next character
+        :param chars: characters expected
+        :return: character consumed
+        """
+        char = self.peek()
+        if char == "" or char not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+    def entry(self):
+        """
+        parse next key and value of an object, reads are doubled until the entry is complete
+        :return: (key, value, True if the entry is the last one)
+        """
+        size = self.chunk_size
+        while True:
+            entry = _scan_entry(self.buffer, self.pos)
+            if entry is not None:
+                key, value, last, self.pos = entry
+                return key, value, last
+            if not self.fill(size):
+                raise json.JSONDecodeError("Invalid object entry", self.buffer, self.pos)
+            size *= 2
+
+
+def _scan_entry(buffer: str, pos: int):
+    """
+    scan an object entry of key, colon, value and the delimiter after
+    :param buffer: text
+    :param pos: start position
+    :return: (key, value, True if delimiter is '}', end position) or None if not complete
+    """
+    match = _KEY.match(buffer, pos)
+    if match is None:
+        return None
+    try:
+        key, end = scanstring(buffer, match.end())
+        match = _COLON.match(buffer, end)
+        if match is None:
+            return None
+        value, end = _DECODER.scan_once(buffer, match.end())
+    except (StopIteration, json.JSONDecodeError):
+        return None
+    # a number cut by the end of buffer is scanned without error,
+    # so the entry is complete only when a delimiter follows
+    match = _DELIMITER.match(buffer, end)
+    if match is None:
+        return None
+    return key, value, match.group(1) == "}", match.end()
+
+
+def iter_json_object(filename, chunk_size: int = 1 << 16, compression: str = "auto"):
+    """
+    parse the top level object of json file incrementally,
+    memory is bounded by the largest value instead of the file size
+    :param filename: json file with an object at top level
+    :param chunk_size: characters read at a time
+    :param compression: auto to detect by extension, none, gzip, bz2 or xz
+    :return: generator of (key, value) in file order
+    """
+    with open_file(filename, "rt", compression) as fin:
+        reader = _ChunkReader(fin, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        last = False
+        while not last:
+            key, value, last = reader.entry()
+            yield key, value
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+"""
+compiled mapper store
+
+a read only dict like mapper in a memory mapped file with a hash index,
+so big mappers are not parsed on startup and are shared through the page cache
+by every handler and process using the same file
+
+file layout:
+    header: magic, version, count, table size, data offset
+    table: table size slots of (crc32 of key, offset of record), offset 0 for empty slot
+    data: records of (key length, value length, utf-8 key, json value)
+
+build one with
+    python -m dfactory.utils.mapperstore mapper.json mapper.dfm
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from collections.abc import Mapping
+from functools import lru_cache
+
+from .jsonutils import read_json
+
+MAGIC = b"DFMAPPER"
+VERSION = 1
+HEADER = struct.Struct("<8sIQQQ")
+SLOT = struct.Struct("<IQ")
+RECORD = struct.Struct("<II")
+
+_MAPPERS = {}
+
+# marker of missing key returned by lookups, None is a valid value
+_MISSING = object()
+
+
+class MapperStore(Mapping):
+    """
+    read only mapping over a compiled mapper file
+    """
+
+    def __init__(self, filename: str, cache_size: int = 65536):
+        self.filename = filename
+        with open(filename, "rb") as fin:
+            self._mm = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count, self._table_size, self._data_offset = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{filename} is not a mapper store")
+        self._mask = self._table_size - 1
+        self._lookup = lru_cache(maxsize=cache_size)(self._find) if cache_size else self._find
+
+    def _find_record(self, key: str):
+        """
+        find record of key
+        :param key: key
+        :return: (value offset, value length) or None
+        """
+        if not isinstance(key, str):
+            return None
+        data = key.encode("utf-8")
+        key_hash = zlib.crc32(data)
+        slot = key_hash & self._mask
+        mm = self._mm
+        while True:
+            slot_hash, offset = SLOT.unpack_from(mm, HEADER.size + slot * SLOT.size)
+            if offset == 0:
+                return None
+            if slot_hash == key_hash:
+                key_len, value_len = RECORD.unpack_from(mm, offset)
+                start = offset + RECORD.size
+                if key_len == len(data) and mm[start:start + key_len] == data:
+                    return start + key_len, value_len
+            slot = (slot + 1) & self._mask
+
+    def _find(self, key):
+        record = self._find_record(key)
+        if record is None:
+            return _MISSING
+        start, length = record
+        return json.loads(self._mm[start:start + length])
+
+    def __getitem__(self, key):
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key):
+        return self._lookup(key) is not _MISSING
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        mm = self._mm
+        offset = self._data_offset
+        for _ in range(self._count):
+            key_len, value_len = RECORD.unpack_from(mm, offset)
+            start = offset + RECORD.size
+            yield mm[start:start + key_len].decode("utf-8")
+            offset = start + key_len + value_len
+
+    def __reduce__(self):
+        return load_mapper, (self.filename,)
+
+    def close(self):
+        """
+        close memory map
+        :return: None
+        """
+        self._mm.close()
+
+
+def is_mapper_store(filename: str) -> bool:
+    """
+    check if file is a compiled mapper store
+    :param filename: file to check
+    :return: True if the file starts with the store magic
+    """
+    with open(filename, "rb") as fin:
+        return fin.read(len(MAGIC)) == MAGIC
+
+
+def load_mapper(filename: str):
+    """
+    load mapper file, a compiled mapper store or a json file,
+    every file is loaded once per process and shared by the handlers using it
+    :param filename: mapper file
+    :return: MapperStore or dict
+    """
+    path = os.path.realpath(filename)
+    mtime = os.path.getmtime(path)
+    cached = _MAPPERS.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    mapper = MapperStore(path) if is_mapper_store(path) else read_json(path)
+    _MAPPERS[path] = (mtime, mapper)
+    return mapper
+
+
+def build_mapper_store(mapper, filename: str, load_factor: float = 0.5):
+    """
+    build a compiled mapper store
+    :param mapper: dict with str keys or json file of it
+    :param filename: output store file
+    :param load_factor: max ratio of used slots in hash table
+    :return: None
+    """
+    if isinstance(mapper, str):
+        mapper = read_json(mapper)
+    table_size = 1
+    while table_size * load_factor < max(len(mapper), 1):
+        table_size *= 2
+    mask = table_size - 1
+    table = bytearray(table_size * SLOT.size)
+    data_offset = HEADER.size + len(table)
+    with open(filename, "wb") as fout:
+        fout.seek(data_offset)
+        offset = data_offset
+        for key, value in mapper.items():
+            key_data = str(key).encode("utf-8")
+            value_data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+            key_hash = zlib.crc32(key_data)
+            slot = key_hash & mask
+            while SLOT.unpack_from(table, slot * SLOT.size)[1] != 0:
+                slot = (slot + 1) & mask
+            SLOT.pack_into(table, slot * SLOT.size, key_hash, offset)
+            fout.write(RECORD.pack(len(key_data), len(value_data)))
+            fout.write(key_data)
+            fout.write(value_data)
+            offset += RECORD.size + len(key_data) + len(value_data)
+        fout.seek(0)
+        fout.write(HEADER.pack(MAGIC, VERSION, len(mapper), table_size, data_offset))
+        fout.write(table)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m dfactory.utils.mapperstore <mapper.json> <store file>")
+        sys.exit(1)
+    build_mapper_store(sys.argv[1], sys.argv[2])
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""
+text outputs writing to a file through a buffer
+"""
+
+
+class OutputWrapper:
+    """
+    base of text outputs wrapping a file, subclasses buffer written text
+    and pass it to file in flush
+    """
+
+    def __init__(self, file):
+        """
+        :param file: file to write
+        """
+        self.file = file
+
+    @property
+    def closed(self) -> bool:
+        """True if file is closed"""
+        return self.file.closed
+
+    def flush(self):
+        """
+        write buffered text to file and flush file
+        :return: None
+        """
+        self.file.flush()
+
+    def fileno(self) -> int:
+        """file descriptor of output"""
+        return self.file.fileno()
+
+    def tell(self) -> int:
+        """position of file, text not flushed is not counted"""
+        return self.file.tell()
+
+    def release(self):
+        """
+        release resources other than file, called by close after flush
+        :return: None
+        """
+
+    def close(self):
+        """
+        flush, release resources and close file
+        :return: None
+        """
+        if self.file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.release()
+            self.file.close()
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+binary record files
+
+a record file starts with MAGIC followed by frames. A frame is a one byte type,
+the payload length as 4 bytes little endian and the payload.
+A schema frame holds the keys of the field dictionary of the file, a records frame
+holds a batch of items encoded by marshal or pickle: items with exactly the keys
+of the schema are stored as tuples of values, other items as dicts.
+Pickle frames keep large buffers (numpy arrays for example) out of band after the
+pickle data, so they are written and read without copying into the pickle stream,
+with pickle protocol 5 (Python 3.8 and later).
+"""
+import marshal
+import pickle
+import struct
+from itertools import repeat
+from typing import List, Optional, Tuple
+
+MAGIC = b"DFR\x01"
+SCHEMA = b"S"
+RECORDS = b"R"
+
+CODECS = ("marshal", "pickle")
+
+# layouts of records in a frame
+TUPLES = b"t"
+DICTS = b"d"
+MIXED = b"x"
+
+_HEADER = struct.Struct("<cI")
+_COUNT = struct.Struct("<I")
+_LENGTH = struct.Struct("<Q")
+
+# out of band buffers need pickle protocol 5
+_OUT_OF_BAND = pickle.HIGHEST_PROTOCOL >= 5
+
+
+def _dump_pickle(obj) -> bytes:
+    buffers = []
+    if _OUT_OF_BAND:
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL,
+                            buffer_callback=buffers.append)
+    else:
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    raws = [buffer.raw() for buffer in buffers]
+    lengths = b"".join(_LENGTH.pack(raw.nbytes) for raw in raws)
+    return b"".join([_COUNT.pack(len(raws)), lengths, _LENGTH.pack(len(data)), data] + raws)
+
+
+def _load_pickle(payload: memoryview):
+    count, = _COUNT.unpack_from(payload)
+    pos = _COUNT.size
+    lengths = [_LENGTH.unpack_from(payload, pos + i * _LENGTH.size)[0] for i in range(count)]
+    pos += count * _LENGTH.size
+    size, = _LENGTH.unpack_from(payload, pos)
+    pos += _LENGTH.size
+    data = payload[pos:pos + size]
+    pos += size
+    buffers = []
+    for length in lengths:
+        buffers.append(payload[pos:pos + length])
+        pos += length
+    if not buffers:
+        return pickle.loads(data)
+    return pickle.loads(data, buffers=buffers)
+
+
+def encode_records(items: List[dict], schema: Optional[tuple], codec: str = "marshal") -> bytes:
+    """
+    encode items as a records frame
+    :param items: items
+    :param schema: keys of the field dictionary, None to store dicts
+    :param codec: marshal or pickle, marshal supports only builtin types
+    :return: frame
+    """
+    if schema is None:
+        layout, rows = DICTS, items
+    else:
+        rows = [tuple(item.values()) if tuple(item) == schema else item for item in items]
+        tuples = sum(1 for row in rows if isinstance(row, tuple))
+        layout = TUPLES if tuples == len(rows) else MIXED if tuples else DICTS
+    if codec not in CODECS:
+        raise ValueError(f"unknown record codec: {codec}")
+    data = marshal.dumps(rows) if codec == "marshal" else _dump_pickle(rows)
+    payload = codec[:1].encode() + layout + data
+    return _HEADER.pack(RECORDS, len(payload)) + payload
+
+
+def encode_schema(keys) -> bytes:
+    """
+    encode keys as a schema frame
+    :param keys: keys of the field dictionary
+    :return: frame
+    """
+    payload = marshal.dumps(tuple(keys))
+    return _HEADER.pack(SCHEMA, len(payload)) + payload
+
+
+def decode_records(payload: bytes, schema: Optional[tuple]) -> List[dict]:
+    """
+    decode the payload of a records frame
+    :param payload: payload
+    :param schema: keys of the field dictionary
+    :return: items
+    """
+    view = memoryview(payload)
+    codec, layout = payload[:1], payload[1:2]
+    rows = marshal.loads(view[2:]) if codec == b"m" else _load_pickle(view[2:])
+    if layout == DICTS:
+        return rows
+    if layout == TUPLES:
+        return list(map(dict, map(zip, repeat(schema), rows)))
+    return [dict(zip(schema, row)) if isinstance(row, tuple) else row for row in rows]
+
+
+def read_frame(fin) -> Tuple[Optional[bytes], bytes]:
+    """
+    read the next frame of file
+    :param fin: binary file
+    :return: (frame type, payload), frame type is None at the end of file
+    """
+    header = fin.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None, b""
+    kind, length = _HEADER.unpack(header)
+    payload = fin.read(length)
+    if len(payload) < length:
+        raise ValueError("truncated record frame")
+    return kind, payload
+
+
+def check_magic(fin):
+    """
+    check the file starts with MAGIC
+    :param fin: binary file at offset 0
+    :return: None
+    """
+    if fin.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{getattr(fin, 'name', 'file')} is not a record file")
+
+
+def read_schema(filename) -> Optional[tuple]:
+    """
+    keys of the field dictionary of file
+    :param filename: record file
+    :return: keys, None if the file has no schema
+    """
+    with open(filename, "rb") as fin:
+        check_magic(fin)
+        kind, payload = read_frame(fin)
+    return marshal.loads(payload) if kind == SCHEMA else None
+
+
+def iter_frames(filename, start: int = 0, end: int = None):
+    """
+    read records frames of file
+    :param filename: record file
+    :param start: offset of a frame, 0 for the first one
+    :param end: offset to stop before, None to read to the end of file
+    :return: generator of (frame offset, items)
+    """
+    schema = read_schema(filename) if start > len(MAGIC) else None
+    with open(filename, "rb") as fin:
+        if start <= len(MAGIC):
+            check_magic(fin)
+            start = len(MAGIC)
+        fin.seek(start)
+        offset = start
+        while end is None or offset < end:
+            kind, payload = read_frame(fin)
+            if kind is None:
+                return
+            if kind == SCHEMA:
+                schema = marshal.loads(payload)
+            elif kind == RECORDS:
+                yield offset, decode_records(payload, schema)
+            offset += _HEADER.size + len(payload)
+
+
+def frame_offsets(filename) -> List[int]:
+    """
+    offsets of records frames, only frame headers are read
+    :param filename: record file
+    :return: list of offsets
+    """
+    offsets = []
+    with open(filename, "rb") as fin:
+        check_magic(fin)
+        offset = len(MAGIC)
+        while True:
+            header = fin.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return offsets
+            kind, length = _HEADER.unpack(header)
+            if kind == RECORDS:
+                offsets.append(offset)
+            offset += _HEADER.size + length
+            fin.seek(offset)
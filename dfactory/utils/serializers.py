@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+generated serializers of fixed-schema output
+
+a serializer is generated once for a list of keys as one f-string of pre-encoded
+key fragments and per-type value formatters. Values of the declared type are
+formatted directly, other values fall back to the generic formatter,
+so the output is the same as the generic one for every value.
+"""
+import json
+from json.encoder import encode_basestring
+from typing import Callable, Dict, List
+
+_FLOAT_REPR = float.__repr__
+_INT_REPR = int.__repr__
+
+
+def _generate(name: str, keys: List[str], body: str, env: dict) -> Callable:
+    """
+    generate function name(item) binding item[key] of keys to v0, v1... and returning body
+    """
+    lines = [f"def {name}(item):"]
+    for index, key in enumerate(keys):
+        env[f"K{index}"] = key
+        lines.append(f"    v{index} = item[K{index}]")
+    lines.append(f"    return {body}")
+    code = compile("\n".join(lines), f"<dfactory {name}>", "exec")
+    exec(code, env)  # pylint: disable=exec-used
+    return env[name]
+
+
+def csv_escape(sep: str = ",", quotechar: str = '"') -> Callable[[str], str]:
+    """
+    function quoting strings containing sep, quotechar or newlines, quotechar is doubled
+    """
+    specials = (sep, quotechar, "\n", "\r")
+    doubled = quotechar * 2
+
+    def escape(value: str) -> str:
+        for special in specials:
+            if special in value:
+                return quotechar + value.replace(quotechar, doubled) + quotechar
+        return value
+
+    return escape
+
+
+def csv_serializer(keys: List[str], sep: str = ",", types: Dict[str, str] = None,
+                   escape: bool = False, quotechar: str = '"') -> Callable[[dict], str]:
+    """
+    generate a function formatting item[key] of keys as a csv line the same as
+    sep.join([str(item[k]) for k in keys])
+    :param keys: keys of fields
+    :param sep: separator
+    :param types: key to int, float, bool or str, values of int and str fields
+                  are formatted without str()
+    :param escape: quote values of str fields containing sep, quotechar or newlines
+    :param quotechar: quote character of escaped values
+    :return: function(item) -> line without newline
+    """
+    types = types or {}
+    env = {"SEP": sep, "ESCAPE": csv_escape(sep, quotechar)}
+    parts = []
+    for index, key in enumerate(keys):
+        type_name = types.get(key)
+        if escape and type_name in (None, "str"):
+            parts.append(f"{{ESCAPE(str(v{index}))}}")
+        elif type_name in ("str", "int"):
+            parts.append(f"{{v{index}}}")
+        else:
+            parts.append(f"{{v{index}!s}}")
+    if not parts:
+        return lambda item: ""
+    return _generate("csv_line", keys, 'f"' + "{SEP}".join(parts) + '"', env)
+
+
+def _json_value(value: str, type_name: str) -> str:
+    if type_name == "int":
+        return f"INT({value}) if type({value}) is int else DUMPS({value})"
+    if type_name == "float":
+        return f"FLOAT({value}) if type({value}) is float and {value} - {value} == 0 " \
+               f"else DUMPS({value})"
+    if type_name == "bool":
+        return f"('true' if {value} else 'false') if type({value}) is bool else DUMPS({value})"
+    if type_name == "str":
+        return f"ENCODE({value}) if type({value}) is str else DUMPS({value})"
+    return f"ENCODE({value}) if type({value}) is str else " \
+           f"INT({value}) if type({value}) is int else DUMPS({value})"
+
+
+def json_serializer(keys: List[str], types: Dict[str, str] = None,
+                    dumps: Callable = None) -> Callable[[dict], str]:
+    """
+    generate a function encoding {k: item[k] for k in keys} as json the same as
+    json.dumps with ensure_ascii False and default separators
+    :param keys: keys of fields, strings
+    :param types: key to int, float, bool or str, values not of the type are encoded by dumps
+    :param dumps: encoder of other values
+    :return: function(item) -> json text
+    """
+    types = types or {}
+    env = {
+        "INT": _INT_REPR,
+        "FLOAT": _FLOAT_REPR,
+        "ENCODE": encode_basestring,
+        "DUMPS": dumps or json.JSONEncoder(ensure_ascii=False).encode,
+    }
+    parts = []
+    for index, key in enumerate(keys):
+        env[f"F{index}"] = ("{" if index == 0 else ", ") + encode_basestring(key) + ": "
+        parts.append(f"{{F{index}}}{{{_json_value(f'v{index}', types.get(key))}}}")
+    if not parts:
+        return lambda item: "{}"
+    return _generate("json_object", keys, 'f"' + "".join(parts) + '}}"', env)
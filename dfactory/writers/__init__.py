@@ -6,5 +6,8 @@ writer
 
 from .csvwriter import CsvWriter
 from .jsonwriter import JsonWriter
+from .partitionedwriter import PartitionedWriter
+from .recordwriter import RecordWriter
+from .sqlitewriter import SqliteWriter
 
-__all__ = ["CsvWriter", "JsonWriter"]
+__all__ = ["CsvWriter", "JsonWriter", "PartitionedWriter", "RecordWriter", "SqliteWriter"]
@@ -4,46 +4,57 @@
 csv writer
 """
 
+from typing import List
+
 from dfactory.core import Handler
+from dfactory.core.utils import overrides
+from dfactory.utils.serializers import csv_escape, csv_serializer
+from .textoutput import TextOutputMixin
 
 
-class CsvWriter(Handler):
+class CsvWriter(TextOutputMixin, Handler):
     """
     csv output
+    if buffer_size is set, written lines are collected until buffer_size characters
+    and written at once, by a background thread if background is True.
+    Lines are formatted by a serializer generated from headers and types, string
+    values containing separator, quotes or newlines are quoted if escape is True
     """
+    parallel_safe = False
 
     def __init__(self, **kwargs):
+        super().__init__()
         self.filename = kwargs.get("path", "")
-        self.file = None
         self.sep = kwargs.get('separator', ",")
         self.headers = kwargs.get('headers')
         self.format = None
-
-    def is_created(self) -> bool:
-        """check if writer ready to write"""
-        return self.file is not None
+        self.types = kwargs.get('types', {})
+        self.escape = kwargs.get('escape', False)
+        self.load_output(kwargs)
 
     def __enter__(self):
         """prepare data"""
-        self.file = open(self.filename, "w", encoding="utf-8")
+        resume = self.open_file()
         self.prepare_format_fun()
-        if self.headers is not None:
+        if self.headers is not None and resume is None:
             self.file.write(self.sep.join(self.headers) + "\n")
 
     def prepare_format_fun(self):
         """ prepare output format"""
+        sep = self.sep
         if self.headers is not None:
-            self.format = lambda a: self.sep.join([str(a[k]) for k in self.headers])
+            self.format = csv_serializer(self.headers, sep, self.types, self.escape)
+        elif self.escape:
+            escape = csv_escape(sep)
+            self.format = lambda a: sep.join([escape(str(value)) for value in a.values()])
         else:
-            self.format = lambda a: self.sep.join([str(a[k]) for k in a])
+            self.format = lambda a: sep.join(map(str, a.values()))
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
         close file if necessary
         """
-        if self.file is not None:
-            self.file.close()
-        self.file = None
+        self.close_file()
 
     @staticmethod
     def from_dict(cfg: dict):
@@ -64,6 +75,9 @@ class CsvWriter(Handler):
         self.filename = cfg.get("path")
         self.headers = cfg.get("headers")
         self.sep = cfg.get('separator', ",")
+        self.types = cfg.get('types', self.types)
+        self.escape = cfg.get('escape', self.escape)
+        self.load_output(cfg)
 
     def handle(self, item: dict):
         """
@@ -72,8 +86,21 @@ class CsvWriter(Handler):
         :return: the same item
         """
         try:
-            self.file.write(self.format(item))
-            self.file.write("\n")
+            self.file.write(self.format(item) + "\n")
         except IOError:
             pass
         return item
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        save a batch of items to csv file with a single write
+        :param items: items to handle
+        :return: the same items
+        """
+        if overrides(self, CsvWriter, 'handle'):
+            return super().handle_batch(items)
+        try:
+            self.file.writelines([self.format(item) + "\n" for item in items])
+        except IOError:
+            pass
+        return items
@@ -1,48 +1,75 @@
 """
 JsonWriter
 """
-import json
+from typing import List
 
 from dfactory.core import CondHandler
+from dfactory.core.utils import overrides
 from dfactory.handlers.matches import Match
-from dfactory.utils.jsonutils import JsonEncoder
+from dfactory.utils.jsoncodec import get_codec
+from dfactory.utils.serializers import json_serializer
+from .textoutput import TextOutputMixin
 
 
-class JsonWriter(CondHandler):
+class JsonWriter(TextOutputMixin, CondHandler):  # pylint: disable=too-many-instance-attributes
     """
     JsonWriter
     write item to json file
     one item per line
     if save_key is specified the save item[save_key] instead of whole object
+    codec is the name of json codec, json by default to keep the output format,
+    with codec json and headers items are encoded by a serializer generated from
+    headers and types
+    if buffer_size is set, written lines are collected until buffer_size characters
+    and written at once, by a background thread if background is True
     """
+    parallel_safe = False
 
     def __init__(self, **kwargs):
         super().__init__()
         self.filename = kwargs.get("path", "")
-        self.file = None
         self.headers = kwargs.get('headers', [])
         self.save_key = None
         self.match = None
-
-    def is_created(self) -> bool:
-        """check if writer ready to write"""
-        return self.file is not None
+        self.codec = kwargs.get("codec", "json")
+        self.types = kwargs.get("types", {})
+        self._dumps = None
+        self._serialize = None
+        self.load_output(kwargs)
 
     def __enter__(self):
         """prepare data"""
-        self.file = open(self.filename, "w", encoding="utf-8")
+        self.open_file()
+        self._dumps = get_codec(self.codec).dumps
+        self._serialize = self.make_serializer()
+
+    def make_serializer(self):
+        """
+        function encoding the saved data of an item
+        :return: function(data) -> json text
+        """
+        dumps = self._dumps
+        headers = self.headers
+        if len(headers) == 0:
+            return dumps
+        if self.codec == "json" and all(isinstance(key, str) for key in headers):
+            return json_serializer(headers, self.types, dumps)
+        return lambda data: dumps({k: data[k] for k in headers})
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
         close file if necessary
         """
-        if self.file is not None:
-            self.file.close()
-        self.file = None
+        self.close_file()
 
     def check(self, item: dict) -> bool:
         return self.match is None or self.match.match(item)
 
+    def compile_check(self):
+        if overrides(self, JsonWriter, 'check'):
+            return self.check
+        return None if self.match is None else self.match.compile()
+
     @staticmethod
     def from_dict(cfg: dict):
         """
@@ -62,6 +89,9 @@ class JsonWriter(CondHandler):
         self.filename = cfg.get("path")
         self.headers = cfg.get("headers", [])
         self.save_key = cfg.get('save_key')
+        self.codec = cfg.get('codec', self.codec)
+        self.types = cfg.get('types', self.types)
+        self.load_output(cfg)
         match = cfg.get('match')
         self.match = None if match is None else Match.from_dict(match)
 
@@ -73,9 +103,27 @@ class JsonWriter(CondHandler):
         """
         try:
             data = item if self.save_key is None else item[self.save_key]
-            obj = data if len(self.headers) == 0 else {k: data[k] for k in self.headers}
-            self.file.write(json.dumps(obj, ensure_ascii=False, cls=JsonEncoder))
-            self.file.write("\n")
+            self.file.write(self._serialize(data) + "\n")
         except IOError:
             pass
         return item
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        save the matched items of a batch with a single write
+        :param items: items to handle
+        :return: the same items
+        """
+        if overrides(self, JsonWriter, 'handle') or overrides(self, JsonWriter, 'operate'):
+            return super().handle_batch(items)
+        check = self.check
+        save_key = self.save_key
+        objs = [item if save_key is None else item[save_key] for item in items if check(item)]
+        try:
+            if len(self.headers) == 0:
+                self.file.write(get_codec(self.codec).dumps_lines(objs))
+            elif objs:
+                self.file.write("\n".join(map(self._serialize, objs)) + "\n")
+        except IOError:
+            pass
+        return items
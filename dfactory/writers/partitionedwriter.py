@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+
+"""
+PartitionedWriter
+"""
+import os
+import re
+from collections import OrderedDict
+from string import Formatter
+from typing import List
+
+from dfactory.core import CondHandler
+from dfactory.core.utils import overrides
+from dfactory.handlers.matches import Match
+from dfactory.utils.compression import EXTENSIONS
+from dfactory.utils.fileutils import open_output, sync_file
+from dfactory.utils.jsoncodec import get_codec
+
+_UNSAFE = re.compile(r"[%/\\\x00]")
+
+
+def path_value(value):
+    """
+    value of a path field safe in a file path, text with path separators, % or NUL
+    has them percent encoded and the whole values . and .. are encoded,
+    so an item can not write outside the directories of path
+    :param value: field value
+    :return: numbers as they are to keep their format specs, other values as text
+    """
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value)
+    if text in (".", ".."):
+        return text.replace(".", "%2E")
+    return _UNSAFE.sub(lambda match: f"%{ord(match.group()):02X}", text)
+
+
+class PartitionedWriter(CondHandler):  # pylint: disable=too-many-instance-attributes
+    """
+    PartitionedWriter
+    write items to many files, the file of an item is path formatted with its fields,
+    for example "out/{date}/{region}.jsonl", field values are escaped by path_value
+
+    format is jsonl or csv, csv if path ends with .csv by default. csv files get
+    headers as first line, keys of the first item of the file if headers is not set.
+    Lines of a partition are buffered until buffer_lines, items of a batch are
+    serialized together by partition, at most max_open files
+    are kept open and the least recently used one is closed to open another.
+    Files are created on the first item of the run and appended after reopening.
+    """
+    parallel_safe = False
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.path = kwargs.get("path", "")
+        self.format = kwargs.get("format")
+        self.headers = kwargs.get("headers")
+        self.sep = kwargs.get("separator", ",")
+        self.codec = kwargs.get("codec", "json")
+        self.max_open = kwargs.get("max_open", 64)
+        self.buffer_lines = kwargs.get("buffer_lines", 1000)
+        self.compression = kwargs.get("compression", "auto")
+        self.compress_options = kwargs.get("compress_options", {})
+        self.match = None
+        self._fields = ()
+        self._paths = {}
+        self._files = OrderedDict()
+        self._buffers = {}
+        self._counts = {}
+        self._headers = {}
+        self._created = set()
+        self._serialize = None
+        self._csv = False
+        self._resume = None
+
+    def is_created(self) -> bool:
+        """check if writer ready to write"""
+        return self._serialize is not None
+
+    def __enter__(self):
+        """prepare path fields and serializer, restored files are truncated"""
+        self._fields = tuple(field for _, field, _, _ in Formatter().parse(self.path)
+                             if field is not None)
+        self._paths = {}
+        self._files = OrderedDict()
+        self._buffers = {}
+        self._counts = {}
+        self._headers = {}
+        self._created = set()
+        resume, self._resume = self._resume, None
+        if resume is not None:
+            for path, state in resume.items():
+                if os.path.exists(path):
+                    with open(path, "r+b") as fout:
+                        fout.truncate(state["position"])
+                    self._created.add(path)
+                    if state.get("headers") is not None:
+                        self._headers[path] = state["headers"]
+        self._csv = self.output_format() == "csv"
+        if self._csv:
+            self._serialize = self.csv_lines
+        else:
+            dumps_lines = get_codec(self.codec).dumps_lines
+            self._serialize = lambda path, items: dumps_lines(items)
+
+    def output_format(self) -> str:
+        """jsonl or csv"""
+        if self.format is not None:
+            return self.format
+        name, ext = os.path.splitext(self.path)
+        if ext.lower() not in EXTENSIONS:
+            name = self.path
+        return "csv" if name.lower().endswith(".csv") else "jsonl"
+
+    def checkpoint(self) -> dict:
+        """write all buffers and save the position of every file"""
+        self.flush()
+        state = {}
+        for path in self._created:
+            file = self._files.get(path)
+            position = sync_file(file) if file is not None else os.path.getsize(path)
+            state[path] = {"position": position, "headers": self._headers.get(path)}
+        return state
+
+    def restore(self, state: dict):
+        """truncate files to the saved positions on __enter__"""
+        self._resume = state
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        write all buffers and close files
+        """
+        try:
+            self.flush()
+        finally:
+            for file in self._files.values():
+                file.close()
+            self._files = OrderedDict()
+            self._serialize = None
+
+    def check(self, item: dict) -> bool:
+        return self.match is None or self.match.match(item)
+
+    def compile_check(self):
+        if overrides(self, PartitionedWriter, 'check'):
+            return self.check
+        return None if self.match is None else self.match.compile()
+
+    @staticmethod
+    def from_dict(cfg: dict):
+        """
+        create a PartitionedWriter from data
+        :param cfg: cfg data
+        :return: new PartitionedWriter object
+        """
+        writer = PartitionedWriter()
+        writer.load_data(cfg)
+        return writer
+
+    def load_data(self, cfg: dict):
+        """
+        load data
+        :param cfg: config data
+        :return: None
+        """
+        self.path = cfg["path"]
+        self.format = cfg.get("format", self.format)
+        self.headers = cfg.get("headers", self.headers)
+        self.sep = cfg.get("separator", self.sep)
+        self.codec = cfg.get("codec", self.codec)
+        self.max_open = cfg.get("max_open", self.max_open)
+        self.buffer_lines = cfg.get("buffer_lines", self.buffer_lines)
+        self.compression = cfg.get("compression", self.compression)
+        self.compress_options = cfg.get("compress_options", self.compress_options)
+        match = cfg.get('match')
+        self.match = None if match is None else Match.from_dict(match)
+
+    def partition(self, item: dict) -> str:
+        """
+        file path of item, paths are cached by the values of path fields
+        :param item: item
+        :return: file path
+        """
+        fields = self._fields
+        if len(fields) == 1:
+            values = item.get(fields[0])
+        else:
+            values = tuple(item.get(field) for field in fields)
+        path = self._paths.get(values)
+        if path is None:
+            if len(fields) == 1:
+                mapping = {fields[0]: path_value(values)}
+            else:
+                mapping = dict(zip(fields, map(path_value, values)))
+            path = self._paths[values] = self.path.format_map(mapping)
+        return path
+
+    def csv_lines(self, path: str, items: List[dict]) -> str:
+        """
+        csv lines of items in file path
+        :param path: file path
+        :param items: items
+        :return: lines ended with newline
+        """
+        headers = self._headers.get(path)
+        if headers is None:
+            headers = self._headers[path] = list(self.headers or items[0])
+        sep = self.sep
+        return "".join([sep.join([str(item[k]) for k in headers]) + "\n" for item in items])
+
+    def open(self, path: str):
+        """
+        get the open file of path, the least recently used file is closed
+        if max_open files are open
+        :param path: file path
+        :return: text file
+        """
+        file = self._files.get(path)
+        if file is not None:
+            self._files.move_to_end(path)
+            return file
+        while len(self._files) >= max(self.max_open, 1):
+            _, oldest = self._files.popitem(last=False)
+            oldest.close()
+        if path in self._created:
+            file = open_output(path, os.path.getsize(path), self.compression,
+                               **self.compress_options)
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            file = open_output(path, None, self.compression, **self.compress_options)
+            self._created.add(path)
+            if self._csv and path in self._headers:
+                file.write(self.sep.join(self._headers[path]) + "\n")
+        self._files[path] = file
+        return file
+
+    def write_partition(self, path: str):
+        """
+        write the buffered lines of a partition
+        :param path: file path
+        :return: None
+        """
+        chunks = self._buffers.pop(path, None)
+        self._counts.pop(path, None)
+        if chunks:
+            self.open(path).writelines(chunks)
+
+    def flush(self):
+        """
+        write all buffered lines
+        :return: None
+        """
+        for path in list(self._buffers):
+            self.write_partition(path)
+
+    def buffer(self, path: str, items: List[dict]):
+        """
+        serialize items of a partition into its buffer, the buffer is written
+        if it has buffer_lines lines
+        :param path: file path
+        :param items: items of the partition
+        :return: None
+        """
+        chunk = self._serialize(path, items)
+        chunks = self._buffers.get(path)
+        if chunks is None:
+            self._buffers[path] = [chunk]
+            count = self._counts[path] = len(items)
+        else:
+            chunks.append(chunk)
+            count = self._counts[path] = self._counts[path] + len(items)
+        if count >= self.buffer_lines:
+            self.write_partition(path)
+
+    def operate(self, item: dict):
+        """
+        buffer item in its partition
+        :param item: item to handle
+        :return: the same item
+        """
+        self.buffer(self.partition(item), [item])
+        return item
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        buffer the matched items of a batch in their partitions
+        :param items: items to handle
+        :return: the same items
+        """
+        if overrides(self, PartitionedWriter, 'handle') or \
+                overrides(self, PartitionedWriter, 'operate'):
+            return super().handle_batch(items)
+        check = self.check
+        partition = self.partition
+        groups = {}
+        for item in items:
+            if not check(item):
+                continue
+            path = partition(item)
+            group = groups.get(path)
+            if group is None:
+                groups[path] = [item]
+            else:
+                group.append(item)
+        for path, group in groups.items():
+            self.buffer(path, group)
+        return items
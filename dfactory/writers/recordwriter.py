@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+"""
+RecordWriter
+"""
+import os
+from typing import List
+
+from dfactory.core import CondHandler
+from dfactory.core.utils import overrides
+from dfactory.handlers.matches import Match
+from dfactory.utils.records import MAGIC, encode_records, encode_schema
+
+
+class RecordWriter(CondHandler):  # pylint: disable=too-many-instance-attributes
+    """
+    RecordWriter
+    write items to a binary record file read by RecordSeeder
+
+    items are encoded batch_size at a time into a frame by codec marshal or pickle,
+    marshal is faster but supports only builtin types.
+    If schema is True, keys of the first item are written once as the field dictionary
+    of the file and items with the same keys are stored as tuples of values,
+    which makes the file smaller but encoding and decoding a bit slower.
+    Buffered items are shallow copies, so later handlers changing fields of an item
+    do not change what is written.
+    """
+    parallel_safe = False
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.filename = kwargs.get("path", "")
+        self.codec = kwargs.get("codec", "marshal")
+        self.schema = kwargs.get("schema", False)
+        self.batch_size = kwargs.get("batch_size", 1000)
+        self.match = None
+        self.file = None
+        self._keys = None
+        self._buffer = []
+        self._resume = None
+
+    def is_created(self) -> bool:
+        """check if writer ready to write"""
+        return self.file is not None
+
+    def __enter__(self):
+        """open file, a restored file is truncated to the checkpoint and appended"""
+        resume, self._resume = self._resume, None
+        self._buffer = []
+        self._keys = None
+        if resume is None:
+            self.file = open(self.filename, "wb")
+            self.file.write(MAGIC)
+            return
+        with open(self.filename, "r+b") as fout:
+            fout.truncate(resume["position"])
+        self._keys = None if resume["keys"] is None else tuple(resume["keys"])
+        self.file = open(self.filename, "ab")
+
+    def checkpoint(self) -> dict:
+        """write buffered items and save file position"""
+        self.flush()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {"position": self.file.tell(),
+                "keys": None if self._keys is None else list(self._keys)}
+
+    def restore(self, state: dict):
+        """truncate file to the saved position and append to it on __enter__"""
+        self._resume = state
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        write buffered items and close file
+        """
+        if self.file is not None:
+            try:
+                self.flush()
+            finally:
+                self.file.close()
+        self.file = None
+
+    def check(self, item: dict) -> bool:
+        return self.match is None or self.match.match(item)
+
+    def compile_check(self):
+        if overrides(self, RecordWriter, 'check'):
+            return self.check
+        return None if self.match is None else self.match.compile()
+
+    @staticmethod
+    def from_dict(cfg: dict):
+        """
+        create a RecordWriter from data
+        :param cfg: cfg data
+        :return: new RecordWriter object
+        """
+        writer = RecordWriter()
+        writer.load_data(cfg)
+        return writer
+
+    def load_data(self, cfg: dict):
+        """
+        load data
+        :param cfg: config data
+        :return: None
+        """
+        self.file = None
+        self.filename = cfg["path"]
+        self.codec = cfg.get("codec", self.codec)
+        self.schema = cfg.get("schema", self.schema)
+        self.batch_size = cfg.get("batch_size", self.batch_size)
+        match = cfg.get('match')
+        self.match = None if match is None else Match.from_dict(match)
+
+    def flush(self):
+        """
+        write buffered items as a frame
+        :return: None
+        """
+        if not self._buffer:
+            return
+        if self.schema and self._keys is None:
+            self._keys = tuple(self._buffer[0])
+            self.file.write(encode_schema(self._keys))
+        self.file.write(encode_records(self._buffer, self._keys, self.codec))
+        self._buffer = []
+
+    def operate(self, item: dict):
+        """
+        buffer item
+        :param item: item to handle
+        :return: the same item
+        """
+        self._buffer.append(dict(item))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        return item
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        buffer the matched items of a batch
+        :param items: items to handle
+        :return: the same items
+        """
+        if overrides(self, RecordWriter, 'handle') or overrides(self, RecordWriter, 'operate'):
+            return super().handle_batch(items)
+        check = self.check
+        self._buffer.extend(dict(item) for item in items if check(item))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        return items
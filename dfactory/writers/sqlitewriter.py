@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+"""
+SqliteWriter
+"""
+import sqlite3
+from typing import List
+
+from dfactory.core import CondHandler
+from dfactory.core.utils import overrides
+from dfactory.handlers.matches import Match
+
+
+class SqliteWriter(CondHandler):  # pylint: disable=too-many-instance-attributes
+    """
+    SqliteWriter
+    write items as rows of a sqlite table
+
+    items are buffered and inserted batch_size rows at a time with executemany,
+    a transaction is committed every commit_size rows, at checkpoints and on exit.
+    keys are the columns, keys of the first item by default, missing values are NULL.
+    The table is created if it does not exist, rows are appended to an existing table.
+    If upsert lists key columns, rows with the same keys are updated instead of inserted.
+    The journal is in WAL mode if wal is True, pragmas are set on connect.
+    """
+    parallel_safe = False
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.path = kwargs.get("path", "")
+        self.table = kwargs.get("table", "")
+        self.keys = kwargs.get("keys", [])
+        self.batch_size = kwargs.get("batch_size", 10000)
+        self.commit_size = kwargs.get("commit_size", 100000)
+        self.wal = kwargs.get("wal", True)
+        self.pragmas = kwargs.get("pragmas", {})
+        self.upsert = kwargs.get("upsert", [])
+        self.match = None
+        self.conn = None
+        self._sql = None
+        self._buffer = []
+        self._uncommitted = 0
+        self._resume = None
+
+    def is_created(self) -> bool:
+        """check if writer ready to write"""
+        return self.conn is not None
+
+    def __enter__(self):
+        """open database, rows after the restored checkpoint are deleted"""
+        self.conn = sqlite3.connect(self.path, isolation_level=None)
+        if self.wal:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        for name, value in self.pragmas.items():
+            self.conn.execute(f"PRAGMA {name}={value}")
+        self._sql = None
+        self._buffer = []
+        self._uncommitted = 0
+        if self.keys:
+            self.prepare(self.keys)
+        resume, self._resume = self._resume, None
+        if resume is not None and self.table_exists():
+            self.conn.execute(f'DELETE FROM "{self.table}" WHERE rowid > ?', (resume,))
+
+    def checkpoint(self) -> dict:
+        """commit buffered rows and save the last rowid"""
+        self.flush(commit=True)
+        if not self.table_exists():
+            return {"rowid": 0}
+        rowid, = self.conn.execute(f'SELECT max(rowid) FROM "{self.table}"').fetchone()
+        return {"rowid": rowid or 0}
+
+    def restore(self, state: dict):
+        """delete rows inserted after the saved rowid on __enter__"""
+        self._resume = state["rowid"]
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        commit and close database
+        """
+        if self.conn is not None:
+            try:
+                self.flush(commit=True)
+            finally:
+                self.conn.close()
+        self.conn = None
+
+    def check(self, item: dict) -> bool:
+        return self.match is None or self.match.match(item)
+
+    def compile_check(self):
+        if overrides(self, SqliteWriter, 'check'):
+            return self.check
+        return None if self.match is None else self.match.compile()
+
+    @staticmethod
+    def from_dict(cfg: dict):
+        """
+        create a SqliteWriter from data
+        :param cfg: cfg data
+        :return: new SqliteWriter object
+        """
+        writer = SqliteWriter()
+        writer.load_data(cfg)
+        return writer
+
+    def load_data(self, cfg: dict):
+        """
+        load data
+        :param cfg: config data
+        :return: None
+        """
+        self.conn = None
+        self.path = cfg["path"]
+        self.table = cfg["table"]
+        self.keys = cfg.get("keys", self.keys)
+        self.batch_size = cfg.get("batch_size", self.batch_size)
+        self.commit_size = cfg.get("commit_size", self.commit_size)
+        self.wal = cfg.get("wal", self.wal)
+        self.pragmas = cfg.get("pragmas", self.pragmas)
+        self.upsert = cfg.get("upsert", self.upsert)
+        match = cfg.get('match')
+        self.match = None if match is None else Match.from_dict(match)
+
+    def prepare(self, keys: List[str]):
+        """
+        create table if not exists and build the insert statement
+        :param keys: columns
+        :return: None
+        """
+        self.keys = list(keys)
+        columns = ", ".join(f'"{key}"' for key in self.keys)
+        unique = f', UNIQUE ({", ".join(self.upsert_columns())})' if self.upsert else ""
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({columns}{unique})')
+        values = ", ".join("?" * len(self.keys))
+        self._sql = f'INSERT INTO "{self.table}" ({columns}) VALUES ({values})'
+        if self.upsert:
+            updates = ", ".join(f'"{key}"=excluded."{key}"' for key in self.keys
+                                if key not in self.upsert)
+            action = f"UPDATE SET {updates}" if updates else "NOTHING"
+            self._sql += f' ON CONFLICT ({", ".join(self.upsert_columns())}) DO {action}'
+
+    def table_exists(self) -> bool:
+        """check if table is in the database"""
+        return self.conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                                 (self.table,)).fetchone() is not None
+
+    def upsert_columns(self) -> List[str]:
+        """quoted upsert key columns"""
+        return [f'"{key}"' for key in self.upsert]
+
+    def flush(self, commit: bool = False):
+        """
+        insert buffered rows
+        :param commit: commit the transaction
+        :return: None
+        """
+        if self._buffer:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            self.conn.executemany(self._sql, self._buffer)
+            self._uncommitted += len(self._buffer)
+            self._buffer = []
+        if self.conn.in_transaction and (commit or self._uncommitted >= self.commit_size):
+            self.conn.execute("COMMIT")
+            self._uncommitted = 0
+
+    def operate(self, item: dict):
+        """
+        buffer item as a row
+        :param item: item to handle
+        :return: the same item
+        """
+        if self._sql is None:
+            self.prepare(self.keys or list(item))
+        self._buffer.append(tuple(item.get(key) for key in self.keys))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        return item
+
+    def handle_batch(self, items: List[dict]) -> List[dict]:
+        """
+        buffer the matched items of a batch
+        :param items: items to handle
+        :return: the same items
+        """
+        if overrides(self, SqliteWriter, 'handle') or overrides(self, SqliteWriter, 'operate'):
+            return super().handle_batch(items)
+        selected = [item for item in items if self.check(item)]
+        if not selected:
+            return items
+        if self._sql is None:
+            self.prepare(self.keys or list(selected[0]))
+        keys = self.keys
+        self._buffer.extend(tuple(item.get(key) for key in keys) for item in selected)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        return items
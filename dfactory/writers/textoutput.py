@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""
+text file output of writers
+"""
+from dfactory.utils.fileutils import buffered_output, open_output, sync_file
+
+
+class TextOutputMixin:
+    """
+    output of writers writing text to file, which may be compressed by compression
+    with compress_options and buffered by buffer_size and background.
+    A restored file is truncated to the checkpoint position and appended on open.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.filename = ""
+        self.file = None
+        self.compression = "auto"
+        self.compress_options = {}
+        self.buffer_size = 0
+        self.background = False
+        self._resume = None
+
+    def load_output(self, cfg: dict):
+        """
+        load output options, options not in cfg are kept
+        :param cfg: config data
+        :return: None
+        """
+        self.compression = cfg.get("compression", self.compression)
+        self.compress_options = cfg.get("compress_options", self.compress_options)
+        self.buffer_size = cfg.get("buffer_size", self.buffer_size)
+        self.background = cfg.get("background", self.background)
+
+    def is_created(self) -> bool:
+        """check if writer ready to write"""
+        return self.file is not None
+
+    def open_file(self):
+        """
+        open file to write
+        :return: the restored position appended to, None for a new file
+        """
+        resume, self._resume = self._resume, None
+        self.file = buffered_output(
+            open_output(self.filename, resume, self.compression, **self.compress_options),
+            self.buffer_size, self.background)
+        return resume
+
+    def close_file(self):
+        """
+        close file if necessary
+        :return: None
+        """
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+
+    def checkpoint(self) -> dict:
+        """flush file and save its position"""
+        return {"position": sync_file(self.file)}
+
+    def restore(self, state: dict):
+        """truncate file to the saved position and append to it on open"""
+        self._resume = state["position"]
@@ -10,7 +10,7 @@ from os.path import join, dirname
 from setuptools import setup, find_packages
 
 setup(
-    packages=find_packages(exclude=('tests', 'tests.*')),
+    packages=find_packages(exclude=('tests', 'tests.*', 'benchmarks', 'benchmarks.*')),
     include_package_data=True,
     zip_safe=False,
 )
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+seeders, handlers and runners shared by tests
+"""
+from copy import deepcopy
+from typing import List
+
+from dfactory.core import Handler, Pipeline, Seeder
+
+
+class ListSeeder(Seeder):
+    """
+    seeder of deep copies of a list of items, the position is the index of the next item
+    """
+
+    def __init__(self, items: List[dict] = None):
+        self.items = list(items or [])
+        self.position = 0
+
+    def iter(self):
+        while self.position < len(self.items):
+            self.position += 1
+            yield deepcopy(self.items[self.position - 1])
+
+    def tell(self):
+        return self.position
+
+    def seek(self, position):
+        self.position = position
+
+
+class Collect(Handler):
+    """keep the handled items"""
+    parallel_safe = False
+
+    def __init__(self):
+        super().__init__()
+        self.items = []
+
+    def handle(self, item: dict) -> dict:
+        self.items.append(item)
+        return item
+
+
+def run_pipeline(source, operators: list, pipeline_class=Pipeline, **options):
+    """
+    run operators over items
+    :param source: seeder or list of items
+    :param operators: operators
+    :param pipeline_class: pipeline class
+    :param options: pipeline attributes, batch_size for example
+    :return: items left after the last operator
+    """
+    collect = Collect()
+    pipeline = pipeline_class()
+    pipeline.seeder = source if isinstance(source, Seeder) else ListSeeder(source)
+    pipeline.operators = list(operators) + [collect]
+    for name, value in options.items():
+        setattr(pipeline, name, value)
+    pipeline.execute()
+    return collect.items
+
+
+def run_handler(handler, items: List[dict], batch_size: int = 0) -> List[dict]:
+    """
+    run a handler over items the way a pipeline does
+    :param handler: handler
+    :param items: items
+    :param batch_size: 0 to call handle otherwise handle_batch with batches of batch_size
+    :return: items returned by handle or handle_batch followed by the items of finish
+    """
+    result = []
+    with handler:
+        if batch_size:
+            for start in range(0, len(items), batch_size):
+                result.extend(handler.handle_batch(items[start:start + batch_size]))
+        else:
+            for item in items:
+                out = handler.handle(item)
+                if out is not None:
+                    result.append(out)
+        result.extend(handler.finish())
+    return result
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of Aggregator, groups are the same with and without spilling to disk
+"""
+import os
+import random
+
+import pytest
+
+from dfactory.handlers.aggregator import Aggregator
+from tests.helpers import run_handler, run_pipeline
+
+AGGREGATES = {"n": ["count"], "n_amount": ["count", "amount"], "total": ["sum", "amount"],
+              "low": ["min", "amount"], "high": ["max", "amount"], "mean": ["avg", "amount"],
+              "first": ["first", "name"], "last": ["last", "name"]}
+
+
+class Evens(Aggregator):
+    """a subclass aggregating items of even id only"""
+
+    def handle(self, item: dict):
+        if item["id"] % 2 == 0:
+            super().handle(item)
+
+
+def make_items(count: int = 3000, seed: int = 7):
+    rnd = random.Random(seed)
+    return [{"id": index, "group": rnd.randrange(200), "kind": rnd.choice("abc"),
+             "amount": rnd.choice([None, rnd.randrange(1000)]),
+             "name": rnd.choice([None, "x", "y", "z"])}
+            for index in range(count)]
+
+
+def aggregate(items, keys):
+    groups = {}
+    for item in items:
+        groups.setdefault(tuple(item[k] for k in keys), []).append(item)
+    result = {}
+    for key, members in groups.items():
+        amounts = [item["amount"] for item in members if item["amount"] is not None]
+        names = [item["name"] for item in members if item["name"] is not None]
+        result[key] = {"n": len(members), "n_amount": len(amounts), "total": sum(amounts),
+                       "low": min(amounts, default=None), "high": max(amounts, default=None),
+                       "mean": sum(amounts) / len(amounts) if amounts else None,
+                       "first": names[0] if names else None,
+                       "last": names[-1] if names else None}
+    return result
+
+
+def check_groups(result, items, keys):
+    expected = aggregate(items, keys)
+    assert len(result) == len(expected)
+    for item in result:
+        key = tuple(item[k] for k in keys)
+        assert {name: item[name] for name in AGGREGATES} == pytest.approx(expected[key])
+
+
+@pytest.mark.parametrize("keys", [["group"], ["group", "kind"]])
+@pytest.mark.parametrize("max_groups,batch_size", [(1000000, 0), (50, 0), (50, 64), (1, 0)])
+def test_spill(tmp_path, keys, max_groups, batch_size):
+    items = make_items()
+    handler = Aggregator(keys=keys, aggregates=AGGREGATES, max_groups=max_groups,
+                         partitions=4, spill_dir=str(tmp_path))
+    result = run_handler(handler, items, batch_size)
+    assert (handler.spills > 0) == (max_groups < 200)
+    check_groups(result, items, keys)
+    assert not os.listdir(tmp_path)
+
+
+@pytest.mark.parametrize("options", [{}, {"batch_size": 64}, {"compiled": True}])
+def test_pipeline(options):
+    items = make_items()
+    result = run_pipeline(items, [Aggregator(keys=["kind"], aggregates=AGGREGATES)], **options)
+    assert [item["kind"] for item in result] == list(dict.fromkeys(
+        item["kind"] for item in items))
+    check_groups(result, items, ["kind"])
+
+
+def test_in_memory_order():
+    items = make_items(100)
+    result = run_handler(Aggregator(keys=["group"], aggregates={"n": ["count"]}), items)
+    assert [item["group"] for item in result] == list(dict.fromkeys(
+        item["group"] for item in items))
+
+
+@pytest.mark.parametrize("batch_size", [0, 16])
+def test_subclass_handle(batch_size):
+    items = make_items(500)
+    result = run_handler(Evens(keys=["kind"], aggregates=AGGREGATES), items, batch_size)
+    check_groups(result, [item for item in items if item["id"] % 2 == 0], ["kind"])
+
+
+def test_config():
+    handler = Aggregator()
+    handler.load_data({"keys": ["a"], "aggregates": {"n": {"op": "count"}}, "max_groups": 5})
+    assert (handler.keys, handler.max_groups, handler.partitions) == (["a"], 5, 16)
+    items = [{"a": 1}, {"a": 2}, {"a": 1}]
+    assert run_handler(handler, items) == [{"a": 1, "n": 2}, {"a": 2, "n": 1}]
+
+
+def test_checkpoint_refused(tmp_path):
+    with pytest.raises(ValueError, match="Aggregator"):
+        run_pipeline(make_items(10), [Aggregator(keys=["kind"], aggregates=AGGREGATES)],
+                     checkpoint_path=str(tmp_path / "job.ckpt"))
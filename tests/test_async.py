@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of AsyncPipeline, AsyncHandler and ThreadPoolHandler
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from dfactory.core import AsyncHandler, AsyncPipeline, Handler, Pipeline, ThreadPoolHandler
+from dfactory.handlers.sorter import Sorter
+from tests.helpers import ListSeeder, run_pipeline
+
+ITEMS = [{"id": index} for index in range(60)]
+
+
+class Square(Handler):
+    """sync handler, drops multiples of 7"""
+
+    def handle(self, item: dict) -> dict:
+        if item["id"] % 7 == 0:
+            return None
+        time.sleep(0.001 * (item["id"] % 3))
+        item["square"] = item["id"] ** 2
+        return item
+
+
+class AsyncSquare(AsyncHandler):
+    """the same as Square as a coroutine, counting items in flight"""
+
+    def __init__(self):
+        super().__init__()
+        self.flight = 0
+        self.max_flight = 0
+
+    async def handle_async(self, item: dict) -> dict:
+        self.flight += 1
+        self.max_flight = max(self.max_flight, self.flight)
+        await asyncio.sleep(0.001 * (item["id"] % 3))
+        self.flight -= 1
+        return Square().handle(item)
+
+
+EXPECTED = run_pipeline(ITEMS, [Square()])
+
+
+@pytest.mark.parametrize("batch_size", [0, 8])
+def test_async_handler_ordered(batch_size):
+    handler = AsyncSquare()
+    result = run_pipeline(ITEMS, [handler], AsyncPipeline, concurrency=5, batch_size=batch_size)
+    assert result == EXPECTED
+    assert 1 < handler.max_flight <= 5
+
+
+def test_async_handler_unordered():
+    result = run_pipeline(ITEMS, [AsyncSquare()], AsyncPipeline, ordered=False)
+    assert sorted(result, key=lambda item: item["id"]) == EXPECTED
+
+
+@pytest.mark.parametrize("pipeline_class,options", [
+    (AsyncPipeline, {}),
+    (Pipeline, {}),
+    (Pipeline, {"batch_size": 16}),
+    (Pipeline, {"compiled": True}),
+])
+def test_thread_pool_handler(pipeline_class, options):
+    threads = set()
+
+    class Record(Square):
+        def handle(self, item: dict) -> dict:
+            threads.add(threading.get_ident())
+            return super().handle(item)
+
+    handler = ThreadPoolHandler(Record(), workers=4)
+    assert run_pipeline(ITEMS, [handler], pipeline_class, **options) == EXPECTED
+    if pipeline_class is AsyncPipeline or options.get("batch_size"):
+        assert threading.get_ident() not in threads
+
+
+def test_finished_items_after_async_handler():
+    result = run_pipeline(ITEMS, [AsyncSquare(), Sorter(keys=[["id", "desc"]])], AsyncPipeline)
+    assert result == EXPECTED[::-1]
+
+
+@pytest.mark.parametrize("options", [{}, {"batch_size": 8}, {"compiled": True}])
+def test_async_handler_outside_async_pipeline(options):
+    with pytest.raises(RuntimeError, match="AsyncPipeline"):
+        run_pipeline(ITEMS, [AsyncSquare()], **options)
+
+
+def test_profile_async_pipeline():
+    pipeline = AsyncPipeline()
+    pipeline.seeder = ListSeeder(ITEMS)
+    pipeline.operators = [AsyncSquare(), ThreadPoolHandler(Square(), workers=2)]
+    stats = pipeline.run(profile=True)
+    assert [operator.items_in for operator in stats.operators] == [60, 51]
+    assert [operator.items_out for operator in stats.operators] == [51, 51]
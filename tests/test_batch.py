@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of batch mode, batches give the same items as one item at a time
+"""
+import pytest
+
+from dfactory.core import CondHandler
+from dfactory.handlers.converters import Converter, DictConverter, KeysPicker
+from dfactory.handlers.filters import Filter
+from dfactory.handlers.matches import KeyMatch
+from dfactory.handlers.updaters import FormatUpdater, Updater
+from dfactory.writers import CsvWriter, JsonWriter
+from tests.helpers import run_pipeline
+
+ITEMS = [{"id": index, "kind": "abcd"[index % 4], "name": None if index % 3 else f"n{index}"}
+         for index in range(50)]
+MODES = [{"batch_size": 1}, {"batch_size": 7}, {"batch_size": 100}, {"compiled": True}]
+
+
+def make_filter(filter_class=Filter):
+    handler = filter_class()
+    handler.matcher = KeyMatch("kind", "c")
+    return handler
+
+
+def make_dict_converter(converter_class=DictConverter):
+    return converter_class(key="kind", dst="label", mapper={"a": "A", "b": "B"})
+
+
+def make_converter(converter_class=Converter):
+    updater = FormatUpdater({"text": None}, "{id}-{kind}", ["id", "kind"])
+    return converter_class(KeyMatch("kind", ["a", "d"]), [updater])
+
+
+def make_operators():
+    return [make_filter(), make_dict_converter(), make_converter(),
+            KeysPicker(["name", "kind"], "pick")]
+
+
+@pytest.mark.parametrize("options", MODES)
+def test_batch_matches_items(options):
+    expected = run_pipeline(ITEMS, make_operators())
+    assert len(expected) < len(ITEMS)
+    assert run_pipeline(ITEMS, make_operators(), **options) == expected
+
+
+class OddFilter(Filter):
+    def handle(self, item: dict) -> dict:
+        return item if item["id"] % 2 else None
+
+
+class UpperConverter(DictConverter):
+    def operate(self, item: dict) -> dict:
+        item[self.dst] = item[self.key].upper()
+        return item
+
+
+class EvenConverter(Converter):
+    def check(self, item: dict) -> bool:
+        return item["id"] % 2 == 0
+
+
+class StarUpdater(Updater):
+    def get_new_value(self, item, key, options):
+        return "*"
+
+    def handle(self, item: dict) -> dict:
+        return dict(item, star=item["id"])
+
+
+class Skip(CondHandler):
+    def check(self, item: dict) -> bool:
+        return True
+
+    def operate(self, item: dict) -> dict:
+        return None
+
+    def handle(self, item: dict) -> dict:
+        return None if item["id"] % 5 == 0 else item
+
+
+@pytest.mark.parametrize("make", [
+    lambda: make_filter(OddFilter),
+    lambda: make_dict_converter(UpperConverter),
+    lambda: make_converter(EvenConverter),
+    lambda: StarUpdater({"star": None}),
+    Skip,
+])
+@pytest.mark.parametrize("options", MODES)
+def test_batch_uses_overrides(make, options):
+    expected = run_pipeline(ITEMS, [make()])
+    assert expected != ITEMS
+    assert run_pipeline(ITEMS, [make()], **options) == expected
+
+
+class TagCsvWriter(CsvWriter):
+    def handle(self, item: dict):
+        self.file.write(f"{item['id']}\n")
+        return item
+
+
+class TagJsonWriter(JsonWriter):
+    def operate(self, item: dict):
+        self.file.write(f"{item['id']}\n")
+        return item
+
+
+@pytest.mark.parametrize("writer_class", [TagCsvWriter, TagJsonWriter])
+def test_batch_writer_overrides(tmp_path, writer_class):
+    for name, options in (("items", {}), ("batches", {"batch_size": 8})):
+        run_pipeline(ITEMS, [writer_class(path=str(tmp_path / name))], **options)
+    expected = "".join(f"{item['id']}\n" for item in ITEMS)
+    assert (tmp_path / "items").read_text(encoding="utf-8") == expected
+    assert (tmp_path / "batches").read_text(encoding="utf-8") == expected
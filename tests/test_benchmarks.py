@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of the benchmark suite, generated data is reproducible and every benchmark runs
+"""
+import json
+
+from benchmarks.__main__ import main
+from benchmarks.datagen import DataGenerator
+from benchmarks.runner import BENCHMARKS, compare, load_results, run_benchmarks, save_results
+from dfactory.seeders import CsvSeeder, JsonSeeder
+
+
+def test_generator_is_seeded():
+    rows = DataGenerator(fields=5, cardinality=20, seed=3).rows(100)
+    assert rows == DataGenerator(fields=5, cardinality=20, seed=3).rows(100)
+    assert rows != DataGenerator(fields=5, cardinality=20, seed=4).rows(100)
+    assert [row["f0"] for row in rows] == [str(index) for index in range(100)]
+    assert all(len({row[f"f{i}"] for row in rows}) <= 20 for i in range(1, 5))
+
+
+def test_generated_files(tmp_path):
+    generator = DataGenerator(fields=4, cardinality=10, seed=1)
+    rows = generator.rows(50)
+    generator.write_csv(str(tmp_path / "rows.csv"), 50)
+    generator.write_jsonl(str(tmp_path / "rows.jsonl"), 50)
+    generator.write_json_object(str(tmp_path / "rows.json"), 50)
+    generator.write_mapper(str(tmp_path / "mapper.json"), 2)
+    assert list(CsvSeeder(path=str(tmp_path / "rows.csv"), keys=generator.keys).iter()) == rows
+    assert list(JsonSeeder(path=str(tmp_path / "rows.jsonl"), is_list=True).iter()) == rows
+    assert list(JsonSeeder(path=str(tmp_path / "rows.json"), key="f0").iter()) == rows
+    assert json.loads((tmp_path / "mapper.json").read_text()) == generator.mapper(2)
+
+
+def test_run_all_benchmarks():
+    results = run_benchmarks(size=200, repeat=1, fields=5, cardinality=20)
+    assert set(results) == set(BENCHMARKS)
+    assert all(result["items"] > 0 and result["best"] >= 0 for result in results.values())
+
+
+def test_compare_and_main(tmp_path):
+    results = run_benchmarks(size=100, repeat=1, pattern="^codec\\.json\\.")
+    assert results and all(name.startswith("codec.json.") for name in results)
+    baseline = {name: dict(result, items_per_second=result["items_per_second"] * 2)
+                for name, result in results.items()}
+    rows = compare(results, baseline, 0.1)
+    assert [row["name"] for row in rows] == sorted(results)
+    assert all(row["regression"] and abs(row["ratio"] - 0.5) < 1e-9 for row in rows)
+    assert not any(row["regression"] for row in compare(results, results, 0.1))
+    path = str(tmp_path / "baseline.json")
+    save_results(baseline, path, size=100)
+    assert load_results(path) == baseline
+    args = ["--size", "100", "--repeat", "1", "--filter", "^codec\\.json\\.loads$"]
+    assert main(args + ["--output", str(tmp_path / "out.json")]) == 0
+    assert main(args + ["--baseline", path, "--threshold", "1.0"]) == 0
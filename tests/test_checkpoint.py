@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of checkpoint and resume
+"""
+import os
+
+import pytest
+
+from dfactory.core import AsyncPipeline, Handler, Pipeline, ProcessPipeline, StagedPipeline
+from dfactory.seeders import CsvSeeder
+from dfactory.writers import CsvWriter, JsonWriter
+
+
+class Crash(Handler):
+    """raise after limit items, never if limit is 0"""
+
+    def __init__(self, limit: int = 0):
+        super().__init__()
+        self.limit = limit
+        self.seen = 0
+
+    def handle(self, item: dict) -> dict:
+        self.seen += 1
+        if self.limit and self.seen > self.limit:
+            raise RuntimeError("crash")
+        return item
+
+
+def make_writer(kind: str, path: str):
+    if kind == "csv":
+        return CsvWriter(path=path, headers=["id", "name"])
+    return JsonWriter(path=path)
+
+
+def make_pipeline(tmp_path, operators, pipeline_class=Pipeline, **options) -> Pipeline:
+    with open(tmp_path / "in.csv", "w", encoding="utf-8") as fout:
+        fout.writelines(f"{index},name{index % 7}\n" for index in range(100))
+    pipeline = pipeline_class()
+    pipeline.seeder = CsvSeeder(path=str(tmp_path / "in.csv"), keys=["id", "name"])
+    pipeline.operators = operators
+    pipeline.checkpoint_path = str(tmp_path / "job.ckpt")
+    pipeline.checkpoint_interval = 7
+    for name, value in options.items():
+        setattr(pipeline, name, value)
+    return pipeline
+
+
+@pytest.mark.parametrize("kind", ["csv", "jsonl"])
+@pytest.mark.parametrize("options", [{}, {"batch_size": 5}, {"compiled": True}])
+def test_resume_after_crash(tmp_path, kind, options):
+    reference = str(tmp_path / f"ref.{kind}")
+    output = str(tmp_path / f"out.{kind}")
+    pipeline = make_pipeline(tmp_path, [make_writer(kind, reference)], **options)
+    pipeline.checkpoint_path = None
+    pipeline.execute()
+
+    pipeline = make_pipeline(tmp_path, [Crash(38), make_writer(kind, output)], **options)
+    with pytest.raises(RuntimeError):
+        pipeline.execute()
+    assert os.path.exists(pipeline.checkpoint_path)
+
+    pipeline = make_pipeline(tmp_path, [Crash(), make_writer(kind, output)], **options)
+    pipeline.execute()
+    assert not os.path.exists(pipeline.checkpoint_path)
+    with open(reference, "rb") as expected, open(output, "rb") as result:
+        assert result.read() == expected.read()
+
+
+@pytest.mark.parametrize("pipeline_class,options", [
+    (StagedPipeline, {}),
+    (AsyncPipeline, {}),
+    (ProcessPipeline, {"workers": 2}),
+])
+def test_pipelines_without_checkpoint_support(tmp_path, pipeline_class, options):
+    output = tmp_path / "out.jsonl"
+    pipeline = make_pipeline(tmp_path, [Crash(), JsonWriter(path=str(output))], pipeline_class,
+                             **options)
+    with open(pipeline.checkpoint_path, "w", encoding="utf-8") as fout:
+        fout.write("{}")
+    with pytest.raises(ValueError, match="does not support checkpoint"):
+        pipeline.execute()
+    assert os.path.exists(pipeline.checkpoint_path)
+    assert not os.path.exists(output)
+
+
+def test_process_pipeline_in_one_process(tmp_path):
+    reference = str(tmp_path / "ref.jsonl")
+    output = str(tmp_path / "out.jsonl")
+    pipeline = make_pipeline(tmp_path, [JsonWriter(path=reference)])
+    pipeline.checkpoint_path = None
+    pipeline.execute()
+
+    pipeline = make_pipeline(tmp_path, [Crash(50), JsonWriter(path=output)], ProcessPipeline,
+                             workers=1)
+    with pytest.raises(RuntimeError):
+        pipeline.execute()
+    pipeline = make_pipeline(tmp_path, [Crash(), JsonWriter(path=output)], ProcessPipeline,
+                             workers=1)
+    pipeline.execute()
+    with open(reference, "rb") as expected, open(output, "rb") as result:
+        assert result.read() == expected.read()
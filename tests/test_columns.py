@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of columnar batches, columnar handlers give the same items as row handlers
+"""
+from copy import deepcopy
+
+import pytest
+
+from dfactory.core import Handler
+from dfactory.core.columns import ColumnBatch, map_column, to_list, typed_column
+from dfactory.handlers.converters import DictConverter
+from dfactory.handlers.filters import Filter
+from dfactory.handlers.matches import AndMatch, DictMatch, KeyMatch, Match, NotMatch, OrMatch, \
+    RegexMatch, TrueMatch
+from dfactory.handlers.updaters import FormatUpdater
+from dfactory.seeders import FastCsvSeeder
+from dfactory.strings.cutter import StringCutter
+from dfactory.strings.formatter import StringFormatter
+from tests.helpers import run_handler, run_pipeline
+
+KEYS = ["id", "kind", "name", "score"]
+TYPES = {"id": "int", "score": "float"}
+ROWS = [{"id": index, "kind": "abcd"[index % 4],
+         "name": "" if index % 5 == 0 else f"name{index}", "score": index / 4}
+        for index in range(60)]
+
+
+def columnar_batch(rows: list, typed: bool = True) -> ColumnBatch:
+    batch = ColumnBatch.from_rows(rows, KEYS)
+    if typed:
+        for key, type_name in TYPES.items():
+            batch[key] = typed_column(batch[key], type_name)
+    return batch
+
+
+def make_matches():
+    return [
+        KeyMatch("kind", "b"), KeyMatch("kind", ["a", "c"]), KeyMatch("id", 7),
+        KeyMatch("id", [1, 2, 3]), KeyMatch("missing", None),
+        DictMatch({"kind": "a", "id": 4}), DictMatch({"missing": 1}), TrueMatch(),
+        RegexMatch("name", r"name1"),
+        AndMatch(KeyMatch("kind", "a"), NotMatch(KeyMatch("id", 0))),
+        OrMatch(KeyMatch("kind", "a"), RegexMatch("name", r".*9$")),
+    ]
+
+
+def make_handlers():
+    drop = Filter()
+    drop.matcher = OrMatch(KeyMatch("kind", "d"), KeyMatch("id", [5, 6]))
+    cutter = StringCutter()
+    cutter.load_data({"keys": {"name": {"start": 1, "end": 4, "append": "..."}}})
+    formatter = StringFormatter()
+    formatter.load_data({"keys": ["kind", "name"], "dst": "label", "format": "{kind}:{name}"})
+    return [
+        drop,
+        DictConverter(key="kind", dst="kind_name", mapper={"a": "A", "b": "B"}),
+        DictConverter(key="kind", dst="kind", mapper={"c": "C"}),
+        DictConverter(key="kind", dst="name", mapper={"a": "x"}, default="y",
+                      cond=KeyMatch("id", [0, 4, 9, 13])),
+        FormatUpdater({"code": None}, "{kind}-{id}", ["kind", "id"]),
+        cutter,
+        formatter,
+    ]
+
+
+class Double(Handler):
+    """a row handler mixed with columnar ones"""
+
+    def handle(self, item: dict) -> dict:
+        item["double"] = item["id"] * 2
+        return item
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_round_trip(typed):
+    batch = columnar_batch(ROWS, typed)
+    assert len(batch) == len(ROWS) and "kind" in batch and "other" not in batch
+    assert batch.to_rows() == ROWS and list(batch) == ROWS
+    assert batch.slice(10, 20).to_rows() == ROWS[10:20]
+    assert batch.slice(-5).to_rows() == ROWS[-5:]
+    mask = [index % 3 == 0 for index in range(len(ROWS))]
+    assert batch.select(mask).to_rows() == [row for row, keep in zip(ROWS, mask) if keep]
+    assert len(batch.select([False] * len(ROWS))) == 0
+    copy = batch.copy()
+    copy["kind"] = ["z"] * len(ROWS)
+    assert batch.to_rows() == ROWS
+    assert ColumnBatch({}, 3).to_rows() == [{}, {}, {}]
+
+
+def test_map_column_once_per_value():
+    calls = []
+
+    def func(value):
+        calls.append(value)
+        return value * 2
+
+    for column in (["a", "b", "a", "c", "b"], typed_column([3, 1, 3, 2], "int")):
+        calls.clear()
+        assert map_column(column, func) == [value * 2 for value in to_list(column)]
+        assert sorted(calls) == sorted(set(to_list(column)))
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_match_columns(typed):
+    batch = columnar_batch(ROWS, typed)
+    for match in make_matches():
+        assert [bool(value) for value in match.match_columns(batch)] == \
+            [bool(match.match(dict(row))) for row in ROWS], type(match).__name__
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_columnar_handlers(typed):
+    for handler, reference in zip(make_handlers(), make_handlers()):
+        result = handler.handle_batch(columnar_batch(ROWS, typed))
+        assert isinstance(result, ColumnBatch), type(handler).__name__
+        expected = run_handler(reference, deepcopy(ROWS))
+        assert result.to_rows() == expected, type(handler).__name__
+
+
+class UpperFilter(Filter):
+    """a subclass overriding handle is run by rows"""
+
+    def handle(self, item: dict) -> dict:
+        return None if item["kind"] == "a" else item
+
+
+class LastMatch(Match):
+    """a match without match_columns is run by rows"""
+
+    def match(self, item: dict) -> bool:
+        return item["id"] % 10 == 9
+
+
+def test_row_fallbacks():
+    drop = UpperFilter()
+    drop.matcher = TrueMatch()
+    assert drop.handle_batch(columnar_batch(ROWS)) == \
+        [row for row in ROWS if row["kind"] != "a"]
+    assert list(map(bool, LastMatch().match_columns(columnar_batch(ROWS)))) == \
+        [row["id"] % 10 == 9 for row in ROWS]
+
+
+@pytest.mark.parametrize("options", [{"batch_size": 1}, {"batch_size": 16},
+                                     {"batch_size": 1000}])
+def test_pipeline_with_columnar_seeder(tmp_path, options):
+    path = tmp_path / "in.csv"
+    path.write_text("".join(f"{row['id']},{row['kind']},{row['name']},{row['score']}\n"
+                            for row in ROWS), encoding="utf-8")
+
+    def make_seeder(columnar: bool) -> FastCsvSeeder:
+        return FastCsvSeeder(path=str(path), keys=KEYS, types=TYPES, columnar=columnar)
+
+    operators = make_handlers()
+    expected = run_pipeline(make_seeder(False), make_handlers()[:3] + [Double()] +
+                            make_handlers()[3:])
+    assert run_pipeline(make_seeder(True), operators[:3] + [Double()] + operators[3:],
+                        **options) == expected
+
+
+def test_numpy_columns():
+    numpy = pytest.importorskip("numpy")
+    column = typed_column([1, 2, 3], "int")
+    assert isinstance(column, numpy.ndarray) and column.dtype == numpy.int64
+    assert isinstance(typed_column([1, None], "int"), list)
+    assert isinstance(typed_column(["a"], "str"), list)
+    assert isinstance(KeyMatch("id", 2).match_columns(ColumnBatch({"id": column})),
+                      numpy.ndarray)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of compiled pipelines, the fused function gives the same items as the operators
+"""
+import pytest
+
+from dfactory.core import CondHandler, Handler
+from dfactory.core.compiler import compile_operators
+from dfactory.handlers.converters import Converter, DictConverter, KeysPicker
+from dfactory.handlers.filters import Filter
+from dfactory.handlers.matches import AndMatch, DictMatch, KeyMatch, Match, NotMatch, OrMatch, \
+    RegexMatch, TrueMatch
+from dfactory.handlers.updaters import FormatUpdater
+from dfactory.strings.cutter import StringCutter
+from dfactory.strings.formatter import StringFormatter
+from tests.helpers import run_pipeline
+
+ITEMS = [{"id": index, "kind": "abcd"[index % 4], "name": f"name{index}" if index % 3 else "",
+          "alias": None if index % 5 else f"a{index}"}
+         for index in range(80)]
+
+
+def make_filter(matcher: Match, filter_class=Filter) -> Filter:
+    handler = filter_class()
+    handler.matcher = matcher
+    return handler
+
+
+def make_operators():
+    return [
+        make_filter(OrMatch(KeyMatch("kind", "d"), AndMatch(DictMatch({"kind": "c"}),
+                                                             NotMatch(RegexMatch("name", "n"))))),
+        DictConverter(key="kind", dst="label", mapper={"a": "A"}, default="?"),
+        DictConverter(key="kind", dst="kind", mapper={"b": "B"},
+                      condition={"class": "dfactory.handlers.matches.RegexMatch",
+                                 "key": "name", "pattern": "name1"}),
+        KeysPicker(["alias", "name", "kind"], "pick"),
+        Converter(TrueMatch(), [FormatUpdater({"text": None}, "{id}:{kind}", ["id", "kind"])]),
+        StringCutter.from_dict({"class": "dfactory.strings.cutter.StringCutter",
+                                "keys": {"name": {"start": 1, "end": 4, "append": "~"}}}),
+        StringFormatter.from_dict({"class": "dfactory.strings.formatter.StringFormatter",
+                                   "keys": ["kind", "pick"], "dst": "both",
+                                   "format": "{kind}/{pick}"}),
+    ]
+
+
+def test_compiled_pipeline():
+    expected = run_pipeline(ITEMS, make_operators())
+    assert 0 < len(expected) < len(ITEMS)
+    assert run_pipeline(ITEMS, make_operators(), compiled=True) == expected
+
+
+@pytest.mark.parametrize("index", range(len(make_operators())))
+def test_compiled_operator(index):
+    operator = make_operators()[index]
+    fused = compile_operators([operator])
+    for item in ITEMS:
+        assert fused(dict(item)) == make_operators()[index].handle(dict(item))
+
+
+class Tag(CondHandler):
+    """tag items of kind a, drop items of kind b by handle"""
+
+    def check(self, item: dict) -> bool:
+        return item["kind"] == "a"
+
+    def operate(self, item: dict) -> dict:
+        item["tag"] = True
+        return item
+
+    def handle(self, item: dict) -> dict:
+        return None if item["kind"] == "b" else super().handle(item)
+
+
+class Count(Handler):
+    """number items"""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def handle(self, item: dict) -> dict:
+        self.count += 1
+        item["count"] = self.count
+        return item
+
+
+class EvenFilter(Filter):
+    def handle(self, item: dict) -> dict:
+        return item if item["id"] % 2 == 0 else None
+
+
+class CutTwo(StringCutter):
+    @staticmethod
+    def cut(src, start, end, append: str = None):
+        return src[:2]
+
+
+def test_compiled_overrides():
+    def operators():
+        cutter = CutTwo()
+        cutter.keys = {"kind": {"end": 1}}
+        return [Tag(), make_filter(KeyMatch("kind", "x"), EvenFilter), cutter, Count()]
+
+    expected = run_pipeline(ITEMS, operators())
+    assert run_pipeline(ITEMS, operators(), compiled=True) == expected
+    assert {item["kind"] for item in expected} == {"a", "c"}
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of compressed input and output, round trips are lossless
+"""
+import bz2
+import gzip
+import json
+import lzma
+
+import pytest
+
+from dfactory.seeders import CsvSeeder, JsonSeeder
+from dfactory.utils.compression import detect_compression, open_file
+from dfactory.utils.fileutils import iter_lines, open_output, read_lines
+from dfactory.writers import JsonWriter
+from tests.helpers import run_pipeline
+
+COMPRESS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+DECOMPRESS = {"gzip": gzip.decompress, "bz2": bz2.decompress, "xz": lzma.decompress}
+EXTENSIONS = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+TEXT = "".join(f"{index},name é{index}\n" for index in range(3000))
+ITEMS = [{"id": index, "name": f"ü{index}", "tags": ["a"] * (index % 4)} for index in range(500)]
+
+
+@pytest.fixture(name="compression", params=sorted(DECOMPRESS))
+def fixture_compression(request):
+    return request.param
+
+
+def compressed_path(tmp_path, compression: str, name: str = "data.txt") -> str:
+    return str(tmp_path / (name + EXTENSIONS[compression]))
+
+
+def write_output(path: str, text: str, position: int = None, **options):
+    fout = open_output(path, position, **options)
+    try:
+        fout.write(text)
+    finally:
+        fout.close()
+
+
+def test_detect_compression():
+    assert detect_compression("a.csv") is None
+    assert detect_compression("a.CSV.GZ") == "gzip"
+    assert detect_compression("a.bz2") == "bz2" and detect_compression("a.xz") == "xz"
+    assert detect_compression("a.gz", "none") is None
+    assert detect_compression("a.csv", "xz") == "xz"
+    with pytest.raises(ValueError):
+        detect_compression("a.csv", "zip")
+
+
+@pytest.mark.parametrize("block_size,workers", [(1, 1), (100, 3), (1 << 20, None)])
+def test_write_round_trip(tmp_path, compression, block_size, workers):
+    path = compressed_path(tmp_path, compression)
+    fout = open_output(path, block_size=block_size, workers=workers)
+    for line in TEXT.splitlines(keepends=True)[:300]:
+        fout.write(line)
+    fout.writelines(TEXT.splitlines(keepends=True)[300:])
+    fout.close()
+    with open(path, "rb") as fin:
+        assert DECOMPRESS[compression](fin.read()).decode("utf-8") == TEXT
+    with open_file(path, "rt") as fin:
+        assert fin.read() == TEXT
+
+
+def test_resume_at_member_boundary(tmp_path, compression):
+    path = compressed_path(tmp_path, compression)
+    head, tail = TEXT[:len(TEXT) // 2], TEXT[len(TEXT) // 2:]
+    fout = open_output(path, block_size=64)
+    fout.write(head)
+    fout.flush()
+    position = fout.tell()
+    fout.write("lost text\n" * 10)
+    fout.close()
+    write_output(path, tail, position, block_size=64)
+    with open_file(path, "rt") as fin:
+        assert fin.read() == TEXT
+
+
+def test_read_lines_with_offsets(tmp_path, compression):
+    path = compressed_path(tmp_path, compression)
+    with open(path, "wb") as fout:
+        fout.write(COMPRESS[compression](TEXT.encode("utf-8")))
+    lines = list(iter_lines(path))
+    assert [line for _, line in lines] == TEXT.splitlines()
+    offset = lines[1234][0]
+    assert list(read_lines(path, offset)) == TEXT.splitlines()[1235:]
+    assert list(read_lines(path, 0, offset)) == TEXT.splitlines()[:1235]
+
+
+def test_seeders_read_compressed_input(tmp_path, compression):
+    plain = tmp_path / "data.csv"
+    plain.write_text(TEXT, encoding="utf-8")
+    path = compressed_path(tmp_path, compression, "data.csv")
+    write_output(path, TEXT)
+    expected = list(CsvSeeder(path=str(plain), keys=["id", "name"]).iter())
+    seeder = CsvSeeder(path=path, keys=["id", "name"])
+    assert seeder.shards(4) is None
+    assert list(seeder.iter()) == expected
+
+
+def test_json_round_trip(tmp_path, compression):
+    path = compressed_path(tmp_path, compression, "out.jsonl")
+    writer = JsonWriter(path=path, buffer_size=100, compress_options={"block_size": 256})
+    run_pipeline(ITEMS, [writer])
+    assert list(JsonSeeder(path=path, is_list=True).iter()) == ITEMS
+    assert run_pipeline(JsonSeeder(path=path, is_list=True), []) == ITEMS
+
+    document = compressed_path(tmp_path, compression, "dict.json")
+    write_output(document, json.dumps({f"k{item['id']}": item for item in ITEMS}))
+    items = list(JsonSeeder(path=document, key="key").iter())
+    assert items == [dict(item, key=f"k{item['id']}") for item in ITEMS]
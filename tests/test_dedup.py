@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of Dedup, items left are the first items of each key, also after spilling to disk
+"""
+import os
+import random
+from copy import deepcopy
+
+import pytest
+
+from dfactory.handlers.dedup import Dedup, canonical
+from tests.helpers import run_handler, run_pipeline
+
+
+def make_items(count: int = 3000, seed: int = 7):
+    rnd = random.Random(seed)
+    return [{"id": index, "group": rnd.randrange(200), "kind": rnd.choice("abc"),
+             "name": rnd.choice([None, "x", "y", "z"])}
+            for index in range(count)]
+
+
+def first_items(items, keys):
+    result, seen = [], []
+    for item in items:
+        key = [item.get(k) for k in keys] if keys else item
+        if key not in seen:
+            seen.append(key)
+            result.append(item)
+    return result
+
+
+@pytest.mark.parametrize("memory,batch_size", [(64 << 20, 0), (2000, 0), (2000, 100)])
+def test_exact_spill(tmp_path, memory, batch_size):
+    items = make_items()
+    handler = Dedup(keys=["group", "kind"], memory=memory, spill_dir=str(tmp_path))
+    result = run_handler(handler, items, batch_size)
+    expected = first_items(items, ["group", "kind"])
+    assert result == expected
+    stats = handler.stats()
+    assert stats["items"] == len(items)
+    assert stats["duplicates"] == len(items) - len(expected)
+    assert (stats["disk"] > 0) == (memory < 64 << 20)
+    assert not os.listdir(tmp_path)
+
+
+@pytest.mark.parametrize("options", [{}, {"batch_size": 64}, {"compiled": True}])
+def test_pipeline(options):
+    items = make_items()
+    assert run_pipeline(items, [Dedup(keys=["group"])], **options) == \
+        first_items(items, ["group"])
+
+
+def test_all_fields_ignore_order():
+    items = [{"a": 1, "b": 2}, {"b": 2, "a": 1}, {"a": 1, "b": 3}, {"a": [1], "b": 2},
+             {"b": 2, "a": [1]}]
+    assert run_handler(Dedup(), items) == [items[0], items[2], items[3]]
+
+
+def test_equal_values():
+    text = "".join(["dup", "licate"])
+    items = [{"a": "duplicate", "b": 1, "c": [text, text]},
+             {"a": text, "b": 1.0, "c": ["duplicate", "".join(["dup", "licate"])]},
+             {"a": "duplicate", "b": True, "c": [text, "duplicate"]},
+             {"a": "duplicate", "b": 1.5, "c": [text, text]},
+             {"a": "duplicate", "b": 1, "c": (text, text)},
+             {"a": "duplicate", "b": 1, "c": {"x": 0.0, "y": {1, 2}}},
+             {"a": "duplicate", "b": 1, "c": {"y": {2.0, 1}, "x": -0.0}},
+             {"a": "duplicate", "b": "1", "c": [text, text]}]
+    for keys in ([], ["a", "b", "c"]):
+        result = run_handler(Dedup(keys=keys), deepcopy(items))
+        assert result == first_items(items, keys) == [items[i] for i in (0, 3, 4, 5, 7)]
+
+
+@pytest.mark.parametrize("value,other", [
+    (1, 1.0), (True, 1), (0, -0.0), ({"a": 1, "b": 2}, {"b": 2.0, "a": True}),
+    ({1: "x"}, {1.0: "x"}), ({1, 2}, {2, 1.0}), ([{"a": [1]}], [{"a": [1.0]}])])
+def test_canonical_equal(value, other):
+    assert repr(canonical(value)) == repr(canonical(other))
+
+
+@pytest.mark.parametrize("value,other", [
+    (1, "1"), (1, 1.5), ([1], (1,)), (None, "None"), ([1, 2], {1, 2}), (b"a", "a"),
+    ({"a": 1}, [("a", 1)])])
+def test_canonical_different(value, other):
+    assert repr(canonical(value)) != repr(canonical(other))
+
+
+def test_bloom_keeps_first_items():
+    items = make_items()
+    result = run_handler(Dedup(keys=["id"], mode="bloom", capacity=len(items),
+                               error_rate=0.01), items + items)
+    assert len(items) * 0.95 <= len(result) <= len(items)
+    assert all(item in items for item in result)
+
+
+def test_checkpoint_refused(tmp_path):
+    with pytest.raises(ValueError, match="Dedup"):
+        run_pipeline(make_items(10), [Dedup()], checkpoint_path=str(tmp_path / "job.ckpt"))
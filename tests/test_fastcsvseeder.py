@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of FastCsvSeeder, items are the same as the csv module parses
+"""
+import csv
+import gzip
+import io
+
+import pytest
+
+from dfactory.seeders import CsvSeeder, FastCsvSeeder
+
+KEYS = ["id", "name", "score", "flag"]
+QUOTED = (
+    '1,plain,1.5,true\n'
+    '2,"with, comma",2,no\n'
+    '3,"say ""hi""",,1\n'
+    '4,"two\nlines",x,yes\n'
+    'bad,row\n'
+    '5,"",-0.25,FALSE\n'
+    '6,"a\r\nb, ""c""\n",7e3,t\n'
+    '7,é ü,3,y\n'
+)
+PLAIN = "".join(f"{index},name{index},{index / 4},{index % 2}\n" for index in range(300))
+
+
+def write(tmp_path, text: str, name: str = "in.csv", newline: str = "\n") -> str:
+    path = tmp_path / name
+    path.write_bytes(text.replace("\n", newline).encode("utf-8"))
+    return str(path)
+
+
+def reference(text: str, types: dict = None) -> list:
+    items = [dict(zip(KEYS, row)) for row in csv.reader(io.StringIO(text, newline=""))
+             if len(row) == len(KEYS)]
+    converters = {"int": int, "float": float,
+                  "bool": lambda value: value.strip().lower() in ("1", "true", "yes", "y", "t")}
+    for item in items:
+        for key, type_name in (types or {}).items():
+            try:
+                item[key] = None if item[key] == "" else converters[type_name](item[key])
+            except ValueError:
+                item[key] = None
+    return items
+
+
+@pytest.mark.parametrize("block_size", [1, 5, 16, 1 << 16])
+@pytest.mark.parametrize("text", [QUOTED, PLAIN])
+def test_quoted_fields(tmp_path, block_size, text):
+    seeder = FastCsvSeeder(path=write(tmp_path, text), keys=KEYS, block_size=block_size)
+    assert list(seeder.iter()) == reference(text)
+
+
+@pytest.mark.parametrize("text", [QUOTED, PLAIN])
+def test_typed_columns(tmp_path, text):
+    types = {"id": "int", "score": "float", "flag": "bool"}
+    seeder = FastCsvSeeder(path=write(tmp_path, text), keys=KEYS, types=types, block_size=64)
+    items = list(seeder.iter())
+    assert items == reference(text, types)
+    assert all(isinstance(item["id"], int) for item in items)
+
+
+def test_crlf_lines(tmp_path):
+    path = write(tmp_path, PLAIN, newline="\r\n")
+    assert list(FastCsvSeeder(path=path, keys=KEYS, block_size=100).iter()) == reference(PLAIN)
+
+
+def test_same_items_as_csv_seeder(tmp_path):
+    path = write(tmp_path, PLAIN + "short,row\n")
+    expected = list(CsvSeeder(path=path, keys=KEYS).iter())
+    assert list(FastCsvSeeder(path=path, keys=KEYS).iter()) == expected
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("size", [1, 7, 1000])
+def test_batches(tmp_path, columnar, size):
+    types = {"id": "int", "score": "float"}
+    seeder = FastCsvSeeder(path=write(tmp_path, QUOTED + PLAIN), keys=KEYS, types=types,
+                           block_size=128, columnar=columnar)
+    batches = list(seeder.iter_batch(size))
+    assert all(0 < len(batch) <= size for batch in batches)
+    items = [item for batch in batches
+             for item in (batch.to_rows() if columnar else batch)]
+    assert [{key: item[key] for key in KEYS} for item in items] == reference(QUOTED + PLAIN, types)
+
+
+@pytest.mark.parametrize("count", [1, 4, 50])
+def test_shards(tmp_path, count):
+    seeder = FastCsvSeeder(path=write(tmp_path, PLAIN), keys=KEYS, block_size=100)
+    items = [item for shard in seeder.shards(count) for item in seeder.iter_shard(shard)]
+    assert items == reference(PLAIN)
+
+
+@pytest.mark.parametrize("stop", [0, 1, 3, 150, 299])
+def test_tell_and_seek(tmp_path, stop):
+    path = write(tmp_path, QUOTED + PLAIN)
+    seeder = FastCsvSeeder(path=path, keys=KEYS, block_size=50)
+    items = seeder.iter()
+    head = [next(items) for _ in range(stop)]
+    position = seeder.tell()
+    resumed = FastCsvSeeder(path=path, keys=KEYS, block_size=50)
+    resumed.seek(position)
+    assert head + list(resumed.iter()) == reference(QUOTED + PLAIN)
+
+
+def test_gzip_input(tmp_path):
+    path = tmp_path / "in.csv.gz"
+    path.write_bytes(gzip.compress(QUOTED.encode("utf-8")))
+    seeder = FastCsvSeeder(path=str(path), keys=KEYS, block_size=8)
+    assert seeder.shards(4) is None
+    assert list(seeder.iter()) == reference(QUOTED)
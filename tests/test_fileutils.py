@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of byte-range shards of line files, shards together read every line once
+"""
+import pytest
+
+from dfactory.utils.fileutils import iter_lines, iter_text_blocks, read_lines, split_file
+
+TEXTS = {
+    "lines": "".join(f"{index},name{index}\n" for index in range(200)),
+    "no_trailing_newline": "first\nsecond\nlast without newline",
+    "crlf": "".join(f"{index},é{index}\r\n" for index in range(50)),
+    "long_lines": "".join("ü" * (index * 37 % 300) + "\n" for index in range(40)),
+    "blank_lines": "\n\na\n\n\nb\n\n",
+    "one_line": "only",
+}
+
+
+def expected_lines(text: str) -> list:
+    lines = text.split("\n")
+    return lines[:-1] if lines[-1] == "" else lines
+
+
+def write(tmp_path, text: str) -> str:
+    path = tmp_path / "in.txt"
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 7, 64, 1000])
+@pytest.mark.parametrize("name", sorted(TEXTS))
+def test_shards_cover_file_on_line_boundaries(tmp_path, name, count):
+    data = TEXTS[name].encode("utf-8")
+    path = write(tmp_path, TEXTS[name])
+    shards = split_file(path, count)
+    assert 0 < len(shards) <= count
+    assert shards[0][0] == 0 and shards[-1][1] == len(data)
+    for (_, end), (start, _) in zip(shards, shards[1:]):
+        assert end == start
+        assert data[start - 1:start] == b"\n"
+    assert all(start < end for start, end in shards)
+    lines = [line for start, end in shards for line in read_lines(path, start, end)]
+    assert lines == expected_lines(TEXTS[name])
+
+
+def test_empty_file(tmp_path):
+    path = write(tmp_path, "")
+    assert split_file(path, 4) == []
+    assert list(iter_text_blocks(path)) == []
+    assert list(read_lines(path)) == []
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 16, 1 << 16])
+@pytest.mark.parametrize("name", sorted(TEXTS))
+def test_blocks_are_whole_lines(tmp_path, name, block_size):
+    data = TEXTS[name].encode("utf-8")
+    path = write(tmp_path, TEXTS[name])
+    blocks = list(iter_text_blocks(path, block_size=block_size))
+    assert "".join(text for _, text in blocks) == TEXTS[name]
+    for offset, text in blocks:
+        assert data[offset:offset + len(text.encode("utf-8"))].decode("utf-8") == text
+        assert offset == 0 or data[offset - 1:offset] == b"\n"
+
+
+@pytest.mark.parametrize("name", sorted(TEXTS))
+def test_end_inside_a_line_reads_it_to_its_end(tmp_path, name):
+    data = TEXTS[name].encode("utf-8")
+    path = write(tmp_path, TEXTS[name])
+    for end in range(0, len(data) + 1, 5):
+        text = "".join(text for _, text in iter_text_blocks(path, 0, end, block_size=8))
+        newline = data.find(b"\n", max(end - 1, 0))
+        stop = 0 if end == 0 else len(data) if newline < 0 else newline + 1
+        assert text.encode("utf-8") == data[:stop]
+
+
+@pytest.mark.parametrize("name", sorted(TEXTS))
+def test_line_offsets_resume(tmp_path, name):
+    path = write(tmp_path, TEXTS[name])
+    lines = list(iter_lines(path))
+    assert [line for _, line in lines] == expected_lines(TEXTS[name])
+    for index, (offset, _) in enumerate(lines):
+        assert [line for _, line in iter_lines(path, offset)] == \
+            [line for _, line in lines[index + 1:]]
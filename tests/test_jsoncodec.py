@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of json codecs, every codec decodes what it encodes and lines as json.loads
+"""
+import json
+
+import pytest
+
+from dfactory.utils.jsoncodec import available_codecs, get_codec
+from dfactory.utils.jsonutils import read_json_by_line
+
+OBJECTS = [
+    {"id": 1, "name": "a", "score": 1.5, "flag": True, "none": None},
+    {"text": "é ü 😀", "quote": "say \"hi\"", "slash": "a\\b", "brace": "},{"},
+    {"list": [1, [2, {"x": []}]], "nested": {"deep": {"deeper": "v"}}},
+    {},
+    {"number": -12345678901234, "float": 1e-7},
+]
+LINES = [json.dumps(obj, ensure_ascii=False) for obj in OBJECTS] + [
+    '{"a":1}', ' {"b": 2} ', '[1, 2]', '"text"', "3", "null", '{"c": 3}\r',
+]
+MALFORMED = [
+    ['{"a":"}', '{"},{}'],
+    ['{"a":1}{"b":2}'],
+    ['{"a":1},{"b":2}'],
+    ['{"a":1}', '{"b":}'],
+    ['{"a":1} x'],
+    ['{'],
+    [''],
+]
+
+
+@pytest.fixture(name="codec", params=available_codecs())
+def fixture_codec(request):
+    return get_codec(request.param)
+
+
+def test_round_trip(codec):
+    for obj in OBJECTS:
+        assert codec.loads(codec.dumps(obj)) == obj
+    text = codec.dumps_lines(OBJECTS)
+    assert text.endswith("\n") and text.count("\n") == len(OBJECTS)
+    assert codec.loads_lines(text.splitlines()) == OBJECTS
+    assert codec.dumps_lines([]) == "" and codec.loads_lines([]) == []
+
+
+def test_loads_lines_as_json_loads(codec):
+    assert codec.loads_lines(LINES) == [json.loads(line) for line in LINES]
+
+
+@pytest.mark.parametrize("lines", MALFORMED)
+def test_malformed_lines_raise(codec, lines):
+    with pytest.raises(ValueError):
+        list(map(json.loads, lines))
+    with pytest.raises(ValueError):
+        codec.loads_lines(lines)
+
+
+def test_get_codec():
+    assert get_codec("json") is get_codec("json")
+    assert get_codec("auto").name == available_codecs()[0]
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+def test_numpy_values(codec):
+    numpy = pytest.importorskip("numpy")
+    obj = {"int": numpy.int64(3), "float": numpy.float32(0.5), "array": numpy.arange(3)}
+    assert codec.loads(codec.dumps(obj)) == {"int": 3, "float": 0.5, "array": [0, 1, 2]}
+
+
+@pytest.mark.parametrize("name", available_codecs())
+def test_read_json_by_line(tmp_path, name):
+    path = tmp_path / "in.jsonl"
+    path.write_text(get_codec("json").dumps_lines(OBJECTS * 100), encoding="utf-8")
+    assert list(read_json_by_line(str(path), codec=name)) == OBJECTS * 100
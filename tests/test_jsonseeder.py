@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of the streaming parser of JsonSeeder dict mode, entries are the same as json.load
+"""
+import json
+
+import pytest
+
+from dfactory.seeders import JsonSeeder
+from dfactory.utils.jsonutils import iter_json_object
+
+DOCUMENT = {
+    "a": {"n": 12345678901234567890, "f": -1.25e-3, "t": True, "z": None},
+    "quote \" key": {"s": "x\\\"y}{,:", "u": "\u00e9\U0001f600", "list": [1, [2, {}], "]"]},
+    "": {"empty": {}, "nested": {"deep": {"deeper": [{"k": "v"}] * 3}}},
+}
+DOCUMENT.update({f"key{index}": {"id": index, "value": index / 3} for index in range(50)})
+TEXTS = {
+    "compact": json.dumps(DOCUMENT, separators=(",", ":")),
+    "indented": json.dumps(DOCUMENT, indent=4),
+    "ascii": json.dumps(DOCUMENT, ensure_ascii=True),
+    "unicode": json.dumps(DOCUMENT, ensure_ascii=False),
+    "spaced": "\n {\n" + ",\n".join(f' {json.dumps(key)} \t:\r\n {json.dumps(value)} '
+                                     for key, value in DOCUMENT.items()) + "\n}\n ",
+}
+
+
+def write(tmp_path, text: str) -> str:
+    path = tmp_path / "in.json"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("name", sorted(TEXTS))
+def test_entries_across_chunk_boundaries(tmp_path, name, chunk_size):
+    path = write(tmp_path, TEXTS[name])
+    entries = list(iter_json_object(path, chunk_size))
+    assert entries == list(json.loads(TEXTS[name]).items())
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("{}", []),
+    (" { } ", []),
+    ('{"n": 1}', [("n", 1)]),
+    ('{"n": 10.5e3 }', [("n", 10500.0)]),
+    ('{"a": "}"}', [("a", "}")]),
+])
+@pytest.mark.parametrize("chunk_size", [1, 4, 64])
+def test_small_objects(tmp_path, text, expected, chunk_size):
+    assert list(iter_json_object(write(tmp_path, text), chunk_size)) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "", "[]", '{"a" 1}', '{"a": 1,}', '{"a": 1', '{"a": 1 "b": 2}', '{a: 1}', '{"a": tru}',
+    '{"a": 12',
+])
+@pytest.mark.parametrize("chunk_size", [1, 64])
+def test_malformed_objects(tmp_path, text, chunk_size):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_object(write(tmp_path, text), chunk_size))
+
+
+@pytest.mark.parametrize("key", [None, "id"])
+def test_seeder_dict_mode(tmp_path, key):
+    path = write(tmp_path, TEXTS["indented"])
+    seeder = JsonSeeder(path=path, key=key)
+    name = JsonSeeder.KEY_NAME if key is None else key
+    expected = []
+    for item_key, item in DOCUMENT.items():
+        item = dict(item)
+        item.setdefault(name, item_key)
+        expected.append(item)
+    assert list(seeder.iter()) == expected
+    assert seeder.shards(4) is None
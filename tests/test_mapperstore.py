@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of compiled mapper stores, lookups give the values of the source dict
+"""
+import json
+import os
+import pickle
+
+import pytest
+
+from dfactory.handlers.converters import DictConverter
+from dfactory.utils.mapperstore import MapperStore, build_mapper_store, is_mapper_store, \
+    load_mapper
+from tests.helpers import run_pipeline
+
+MAPPER = {"a": 1, "b": None, "é": "ü", "": [1, {"x": 2.5}], "long" * 50: {"k": [True, False]}}
+MAPPER.update({f"key{index}": f"value{index}" for index in range(3000)})
+
+
+@pytest.fixture(name="store_path")
+def fixture_store_path(tmp_path) -> str:
+    path = str(tmp_path / "mapper.dfm")
+    build_mapper_store(MAPPER, path)
+    return path
+
+
+@pytest.mark.parametrize("cache_size", [0, 16])
+def test_lookup(store_path, cache_size):
+    store = MapperStore(store_path, cache_size)
+    assert len(store) == len(MAPPER)
+    assert list(store) == list(MAPPER)
+    for key, value in MAPPER.items():
+        assert key in store
+        assert store[key] == value
+        assert store.get(key, "missing") == value
+    assert dict(store) == MAPPER
+    for key in ("c", "key3000", 1, None):
+        assert key not in store
+        assert store.get(key) is None
+        with pytest.raises(KeyError):
+            _ = store[key]
+    store.close()
+
+
+def test_empty_store(tmp_path):
+    path = str(tmp_path / "empty.dfm")
+    build_mapper_store({}, path)
+    store = MapperStore(path)
+    assert len(store) == 0 and list(store) == [] and "a" not in store
+
+
+def test_build_from_json(tmp_path, store_path):
+    source = tmp_path / "mapper.json"
+    source.write_text(json.dumps(MAPPER), encoding="utf-8")
+    path = str(tmp_path / "from_json.dfm")
+    build_mapper_store(str(source), path)
+    with open(path, "rb") as built, open(store_path, "rb") as expected:
+        assert built.read() == expected.read()
+
+
+def test_load_mapper(tmp_path, store_path):
+    source = tmp_path / "mapper.json"
+    source.write_text(json.dumps({"a": 1}), encoding="utf-8")
+    assert is_mapper_store(store_path) and not is_mapper_store(str(source))
+    store = load_mapper(store_path)
+    assert isinstance(store, MapperStore)
+    assert load_mapper(store_path) is store
+    assert load_mapper(str(source)) == {"a": 1}
+    source.write_text(json.dumps({"a": 2}), encoding="utf-8")
+    os.utime(source, (1, 1))
+    assert load_mapper(str(source)) == {"a": 2}
+
+
+def test_pickle(store_path):
+    store = pickle.loads(pickle.dumps(MapperStore(store_path)))
+    assert store["key7"] == "value7"
+
+
+def test_not_a_store(tmp_path):
+    path = tmp_path / "bad.dfm"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        MapperStore(str(path))
+
+
+@pytest.mark.parametrize("options", [{}, {"batch_size": 16}, {"compiled": True}])
+def test_dict_converter_with_store(store_path, options):
+    items = [{"k": f"key{index}" if index % 4 else "none"} for index in range(100)]
+    expected = run_pipeline(items, [DictConverter(key="k", dst="v", mapper=MAPPER)])
+    assert run_pipeline(items, [DictConverter(key="k", dst="v", mapper=store_path)],
+                        **options) == expected
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of MultiFileSeeder, files give the same items as read one by one
+"""
+import os
+
+import pytest
+
+from dfactory.core import ProcessPipeline
+from dfactory.seeders import CsvSeeder, MultiFileSeeder
+from tests.helpers import run_pipeline
+
+KEYS = ["id", "name"]
+CSV = {"class": "dfactory.seeders.CsvSeeder", "keys": KEYS}
+SIZES = [0, 1, 7, 250, 33, 1000]
+
+
+@pytest.fixture(name="data_dir")
+def fixture_data_dir(tmp_path) -> str:
+    for number, size in enumerate(SIZES):
+        with open(tmp_path / f"part{number}.csv", "w", encoding="utf-8") as fout:
+            fout.writelines(f"{number}-{index},name{index}\n" for index in range(size))
+    (tmp_path / "notes.txt").write_text("not,data\n", encoding="utf-8")
+    os.mkdir(tmp_path / "sub.csv")
+    return str(tmp_path)
+
+
+def make_seeder(data_dir: str, **cfg) -> MultiFileSeeder:
+    cfg.setdefault("paths", [data_dir])
+    return MultiFileSeeder.from_dict(dict({"pattern": "*.csv", "seeder": CSV}, **cfg))
+
+
+def expected_items(data_dir: str, source_key: str = None) -> list:
+    items = []
+    for number in range(len(SIZES)):
+        path = os.path.join(data_dir, f"part{number}.csv")
+        for item in CsvSeeder(path=path, keys=KEYS).iter():
+            if source_key is not None:
+                item[source_key] = path
+            items.append(item)
+    return items
+
+
+def test_files(data_dir):
+    parts = [os.path.join(data_dir, f"part{number}.csv") for number in range(len(SIZES))]
+    assert make_seeder(data_dir).files() == parts
+    seeder = make_seeder(data_dir, paths=[parts[3], os.path.join(data_dir, "part*.csv"),
+                                          os.path.join(data_dir, "missing.csv")])
+    assert seeder.files() == [parts[3]] + parts[:3] + parts[4:]
+    assert make_seeder(data_dir, paths=parts[1]).files() == [parts[1]]
+
+
+@pytest.mark.parametrize("options", [
+    {}, {"prefetch": 1}, {"prefetch": 3, "batch_size": 5, "queue_size": 1},
+    {"batch_size": 1, "source_key": "file"}, {"prefetch": 2, "source_key": "file"},
+])
+def test_items_in_file_order(data_dir, options):
+    seeder = make_seeder(data_dir, **options)
+    assert list(seeder.iter()) == expected_items(data_dir, options.get("source_key"))
+
+
+@pytest.mark.parametrize("options", [{"interleave": 3}, {"interleave": 2, "prefetch": 2,
+                                                         "batch_size": 3}])
+def test_interleaved_files(data_dir, options):
+    items = list(make_seeder(data_dir, source_key="file", **options).iter())
+    expected = expected_items(data_dir, "file")
+    assert sorted(items, key=str) == sorted(expected, key=str)
+    for path in {item["file"] for item in expected}:
+        assert [item for item in items if item["file"] == path] == \
+            [item for item in expected if item["file"] == path]
+
+
+@pytest.mark.parametrize("size", [1, 4, 100])
+def test_batches(data_dir, size):
+    batches = list(make_seeder(data_dir, prefetch=1).iter_batch(size))
+    assert all(0 < len(batch) <= size for batch in batches)
+    assert [item for batch in batches for item in batch] == expected_items(data_dir)
+
+
+def test_columnar_batches_tagged(data_dir):
+    seeder = make_seeder(data_dir, source_key="file", prefetch=1, seeder={
+        "class": "dfactory.seeders.FastCsvSeeder", "keys": KEYS, "columnar": True})
+    items = [item for batch in seeder.iter_batch(64) for item in batch.to_rows()]
+    assert items == expected_items(data_dir, "file")
+
+
+@pytest.mark.parametrize("stop", [0, 1, 8, 300, 1290, 1291])
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_tell_and_seek(data_dir, stop, prefetch):
+    seeder = make_seeder(data_dir, prefetch=prefetch, batch_size=4)
+    items = seeder.iter()
+    head = [next(items) for _ in range(stop)]
+    position = seeder.tell()
+    items.close()
+    resumed = make_seeder(data_dir, prefetch=prefetch, batch_size=4)
+    resumed.seek(position)
+    assert head + list(resumed.iter()) == expected_items(data_dir)
+
+
+def test_interleave_has_no_position(data_dir):
+    seeder = make_seeder(data_dir, interleave=2)
+    assert seeder.tell() is None
+    with pytest.raises(NotImplementedError):
+        seeder.seek([1, 0])
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_error_in_file(data_dir, prefetch):
+    with open(os.path.join(data_dir, "part3.csv"), "ab") as fout:
+        fout.write(b"\xff\xfe,bad\n")
+    with pytest.raises(UnicodeDecodeError):
+        list(make_seeder(data_dir, prefetch=prefetch).iter())
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_file_shards(data_dir, ordered):
+    seeder = make_seeder(data_dir, source_key="file")
+    assert seeder.shards(2) == seeder.files()
+    result = run_pipeline(seeder, [], ProcessPipeline, workers=2, ordered=ordered)
+    expected = expected_items(data_dir, "file")
+    if not ordered:
+        result.sort(key=expected.index)
+    assert result == expected
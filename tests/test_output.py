@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of buffered and background writes, writers give the same files as unbuffered ones
+"""
+import io
+import threading
+
+import pytest
+
+from dfactory.core import Handler
+from dfactory.utils.fileutils import BufferedOutput, buffered_output
+from dfactory.writers import CsvWriter, JsonWriter
+from tests.helpers import run_pipeline
+
+ITEMS = [{"id": index, "name": f"é{index}", "text": "x" * (index % 50)} for index in range(2000)]
+OPTIONS = [{"buffer_size": 1}, {"buffer_size": 100}, {"buffer_size": 1 << 20},
+           {"background": True}, {"buffer_size": 64, "background": True}]
+
+
+class Recorder(io.StringIO):
+    """text file recording writelines calls and the thread making them"""
+
+    def __init__(self, fail_after: int = None):
+        super().__init__()
+        self.calls = []
+        self.threads = set()
+        self.fail_after = fail_after
+
+    def writelines(self, lines):
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise OSError("disk full")
+        lines = list(lines)
+        self.calls.append(lines)
+        self.threads.add(threading.current_thread().name)
+        super().writelines(lines)
+
+
+class Crash(Handler):
+    """raise after limit items, never if limit is 0"""
+
+    def __init__(self, limit: int = 0):
+        super().__init__()
+        self.limit = limit
+        self.seen = 0
+
+    def handle(self, item: dict) -> dict:
+        self.seen += 1
+        if self.limit and self.seen > self.limit:
+            raise RuntimeError("crash")
+        return item
+
+
+def make_writer(kind: str, path: str, **options):
+    if kind == "csv":
+        return CsvWriter(path=path, headers=["id", "name", "text"], **options)
+    return JsonWriter(path=path, **options)
+
+
+def test_buffer_size():
+    file = Recorder()
+    output = BufferedOutput(file, buffer_size=10)
+    output.write("abcd")
+    output.writelines(["ef", "gh"])
+    assert file.calls == []
+    output.write("ij")
+    assert file.calls == [["abcd", "ef", "gh", "ij"]]
+    output.writelines(iter(["k"]))
+    output.flush()
+    assert file.calls[-1] == ["k"] and file.getvalue() == "abcdefghijk"
+    assert output.tell() == len("abcdefghijk")
+    output.close()
+    assert output.closed and file.closed
+
+
+@pytest.mark.parametrize("buffer_size", [1, 7, 1000])
+def test_background(buffer_size):
+    file = Recorder()
+    output = BufferedOutput(file, buffer_size=buffer_size, background=True, queue_size=1)
+    text = [f"line {index}\n" for index in range(500)]
+    for line in text[:250]:
+        output.write(line)
+    output.writelines(text[250:])
+    output.flush()
+    assert file.getvalue() == "".join(text)
+    assert file.threads == {"writer"}
+    output.write("tail")
+    output.close()
+    assert file.closed
+    assert not any(thread.name == "writer" and thread.is_alive()
+                   for thread in threading.enumerate())
+
+
+def test_background_error():
+    file = Recorder(fail_after=2)
+    output = BufferedOutput(file, buffer_size=1, background=True)
+    with pytest.raises(OSError, match="disk full"):
+        for _ in range(100):
+            output.write("text")
+        output.flush()
+    file.fail_after = None
+    output.close()
+    assert output.closed
+
+
+def test_close_raises_pending_error():
+    output = BufferedOutput(Recorder(fail_after=0), buffer_size=1000, background=True)
+    output.write("text")
+    with pytest.raises(OSError, match="disk full"):
+        output.close()
+    assert output.closed
+
+
+def test_buffered_output():
+    file = io.StringIO()
+    assert buffered_output(file, 0) is file
+    assert isinstance(buffered_output(file, 10), BufferedOutput)
+    output = buffered_output(file, 0, background=True)
+    assert isinstance(output, BufferedOutput) and output.buffer_size > 0
+    output.close()
+
+
+@pytest.mark.parametrize("kind", ["csv", "jsonl"])
+@pytest.mark.parametrize("options", OPTIONS)
+@pytest.mark.parametrize("batch_size", [0, 64])
+def test_writers_write_same_files(tmp_path, kind, options, batch_size):
+    reference = str(tmp_path / f"ref.{kind}")
+    output = str(tmp_path / f"out.{kind}")
+    run_pipeline(ITEMS, [make_writer(kind, reference)])
+    run_pipeline(ITEMS, [make_writer(kind, output, **options)], batch_size=batch_size)
+    with open(reference, "rb") as expected, open(output, "rb") as result:
+        assert result.read() == expected.read()
+
+
+@pytest.mark.parametrize("kind", ["csv", "jsonl"])
+@pytest.mark.parametrize("options", OPTIONS[1:])
+def test_resume_buffered_writer(tmp_path, kind, options):
+    reference = str(tmp_path / f"ref.{kind}")
+    output = str(tmp_path / f"out.{kind}")
+    checkpoint = str(tmp_path / "job.ckpt")
+    run_pipeline(ITEMS, [make_writer(kind, reference)])
+    with pytest.raises(RuntimeError):
+        run_pipeline(ITEMS, [Crash(1234), make_writer(kind, output, **options)],
+                     checkpoint_path=checkpoint, checkpoint_interval=100)
+    run_pipeline(ITEMS, [Crash(), make_writer(kind, output, **options)],
+                 checkpoint_path=checkpoint, checkpoint_interval=100)
+    with open(reference, "rb") as expected, open(output, "rb") as result:
+        assert result.read() == expected.read()
+
+
+def test_writer_config():
+    writer = JsonWriter.from_dict({"path": "out.jsonl", "buffer_size": 10, "background": True,
+                                   "compression": "gzip"})
+    assert (writer.buffer_size, writer.background, writer.compression) == (10, True, "gzip")
+    writer.load_data({"path": "other.jsonl"})
+    assert (writer.buffer_size, writer.background, writer.compression) == (10, True, "gzip")
+    assert not writer.is_created()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of PartitionedWriter, each partition file has the lines a single writer
+gives for the items of that partition
+"""
+import json
+import os
+
+import pytest
+
+from dfactory.core import Handler
+from dfactory.handlers.matches import KeyMatch
+from dfactory.utils.fileutils import read_lines
+from dfactory.writers import PartitionedWriter
+from dfactory.writers.partitionedwriter import path_value
+from tests.helpers import run_pipeline
+
+ITEMS = [{"id": index, "region": "abc"[index % 3], "day": index % 7, "name": f"é{index}"}
+         for index in range(2000)]
+MODES = [{}, {"batch_size": 64}, {"compiled": True}, {"batch_size": 64, "compiled": True}]
+
+
+class Crash(Handler):
+    """raise after limit items, never if limit is 0"""
+
+    def __init__(self, limit: int = 0):
+        super().__init__()
+        self.limit = limit
+        self.seen = 0
+
+    def handle(self, item: dict) -> dict:
+        self.seen += 1
+        if self.limit and self.seen > self.limit:
+            raise RuntimeError("crash")
+        return item
+
+
+class Tagged(PartitionedWriter):
+    """a subclass changing items in operate"""
+
+    def operate(self, item: dict):
+        super().operate(dict(item, tagged=True))
+        return item
+
+
+def expected_files(root, items: list, fmt: str = "jsonl") -> dict:
+    files = {}
+    for item in items:
+        path = os.path.join(root, item["region"], f"{item['day']:02d}.{fmt}")
+        files.setdefault(path, []).append(item)
+    if fmt == "csv":
+        return {path: ["id,region,day,name"] +
+                      [f"{item['id']},{item['region']},{item['day']},{item['name']}"
+                       for item in group]
+                for path, group in files.items()}
+    return {path: [json.dumps(item) for item in group] for path, group in files.items()}
+
+
+def read_files(root, fmt: str = "jsonl") -> dict:
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            lines = list(read_lines(path))
+            files[os.path.splitext(path)[0] if name.endswith(".gz") else path] = \
+                lines if fmt == "csv" else [json.dumps(json.loads(line)) for line in lines]
+    return files
+
+
+@pytest.mark.parametrize("options", MODES)
+@pytest.mark.parametrize("max_open,buffer_lines", [(64, 1000), (1, 1), (2, 7)])
+def test_partitions(tmp_path, options, max_open, buffer_lines):
+    writer = PartitionedWriter(path=str(tmp_path / "{region}" / "{day:02d}.jsonl"),
+                               max_open=max_open, buffer_lines=buffer_lines)
+    assert run_pipeline(ITEMS, [writer], **options) == ITEMS
+    assert read_files(tmp_path) == expected_files(tmp_path, ITEMS)
+
+
+@pytest.mark.parametrize("options", MODES[:2])
+@pytest.mark.parametrize("headers", [None, ["id", "region", "day", "name"]])
+def test_csv(tmp_path, options, headers):
+    writer = PartitionedWriter(path=str(tmp_path / "{region}" / "{day:02d}.csv"),
+                               headers=headers, max_open=2, buffer_lines=5)
+    run_pipeline(ITEMS, [writer], **options)
+    assert read_files(tmp_path, "csv") == expected_files(tmp_path, ITEMS, "csv")
+
+
+@pytest.mark.parametrize("options", MODES[:2])
+def test_compressed(tmp_path, options):
+    writer = PartitionedWriter(path=str(tmp_path / "{region}" / "{day:02d}.jsonl.gz"),
+                               max_open=2, buffer_lines=10)
+    run_pipeline(ITEMS, [writer], **options)
+    assert read_files(tmp_path) == expected_files(tmp_path, ITEMS)
+
+
+@pytest.mark.parametrize("options", MODES[:2])
+def test_match(tmp_path, options):
+    writer = PartitionedWriter(path=str(tmp_path / "{region}" / "{day:02d}.jsonl"))
+    writer.match = KeyMatch("region", ["a"])
+    assert run_pipeline(ITEMS, [writer], **options) == ITEMS
+    assert read_files(tmp_path) == expected_files(
+        tmp_path, [item for item in ITEMS if item["region"] == "a"])
+
+
+@pytest.mark.parametrize("batch_size", [0, 16])
+def test_subclass_operate(tmp_path, batch_size):
+    writer = Tagged(path=str(tmp_path / "{region}" / "{day:02d}.jsonl"))
+    assert run_pipeline(ITEMS[:100], [writer], batch_size=batch_size) == ITEMS[:100]
+    assert read_files(tmp_path) == expected_files(
+        tmp_path, [dict(item, tagged=True) for item in ITEMS[:100]])
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("a/b", "a%2Fb"), ("a\\b", "a%5Cb"), ("..", "%2E%2E"), (".", "%2E"), ("50%", "50%25"),
+    ("../x", "..%2Fx"), ("a\x00", "a%00"), ("a..b", "a..b"), (None, "None"), (7, 7), (0.5, 0.5)])
+def test_path_value(value, expected):
+    assert path_value(value) == expected
+
+
+@pytest.mark.parametrize("batch_size", [0, 16])
+def test_unsafe_values(tmp_path, batch_size):
+    root = tmp_path / "out"
+    items = [{"key": key, "id": index} for index, key in
+             enumerate(["../x", "/abs", "..", ".", "a/b", "a%2Fb", "a\\b", "ok"] * 3)]
+    writer = PartitionedWriter(path=str(root / "{key}" / "part.jsonl"))
+    run_pipeline(items, [writer], batch_size=batch_size)
+    assert os.listdir(tmp_path) == ["out"]
+    files = read_files(root)
+    assert len(files) == 8
+    for key in {item["key"] for item in items}:
+        path = os.path.join(str(root), path_value(key), "part.jsonl")
+        assert files[path] == [json.dumps(item) for item in items if item["key"] == key]
+
+
+def test_resume_after_crash(tmp_path):
+    root = tmp_path / "out"
+    checkpoint = str(tmp_path / "job.ckpt")
+
+    def writer():
+        return PartitionedWriter(path=str(root / "{region}" / "{day:02d}.csv.gz"),
+                                 max_open=2, buffer_lines=10)
+    with pytest.raises(RuntimeError):
+        run_pipeline(ITEMS, [Crash(1234), writer()], checkpoint_path=checkpoint,
+                     checkpoint_interval=100, batch_size=32)
+    run_pipeline(ITEMS, [Crash(), writer()], checkpoint_path=checkpoint,
+                 checkpoint_interval=100, batch_size=32)
+    assert read_files(root, "csv") == expected_files(root, ITEMS, "csv")
+    assert not os.path.exists(checkpoint)
+
+
+def test_config():
+    match = {"class": "dfactory.handlers.matches.KeyMatch", "key": "a", "value": 1}
+    writer = PartitionedWriter.from_dict({"path": "out/{a}.txt", "format": "csv",
+                                          "max_open": 3, "match": match})
+    assert (writer.output_format(), writer.max_open) == ("csv", 3)
+    assert writer.match is not None and not writer.is_created()
+    assert PartitionedWriter(path="out/{a}.csv.gz").output_format() == "csv"
+    assert PartitionedWriter(path="out/{a}.jsonl").output_format() == "jsonl"
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of ProcessPipeline, workers give the same items as a plain Pipeline
+"""
+import pytest
+
+from dfactory.core import Handler, ProcessPipeline
+from dfactory.handlers.converters import DictConverter
+from dfactory.seeders import CsvSeeder
+from tests.helpers import run_pipeline
+
+
+class Fail(Handler):
+    """raise on item 37"""
+
+    def handle(self, item: dict) -> dict:
+        if item["id"] == "37":
+            raise ValueError("bad item")
+        return item
+
+
+def write_csv(tmp_path, count: int = 500) -> str:
+    path = str(tmp_path / "in.csv")
+    with open(path, "w", encoding="utf-8") as fout:
+        fout.writelines(f"{index},k{index % 3},{'x' * (index % 11)}\n" for index in range(count))
+    return path
+
+
+def make_seeder(path: str) -> CsvSeeder:
+    return CsvSeeder(path=path, keys=["id", "kind", "text"])
+
+
+def make_operators():
+    return [DictConverter(key="kind", dst="label", mapper={"k0": "zero", "k1": "one"})]
+
+
+@pytest.mark.parametrize("count", [1, 3, 17, 600])
+def test_csv_shards_cover_file(tmp_path, count):
+    seeder = make_seeder(write_csv(tmp_path))
+    shards = seeder.shards(count)
+    assert 1 <= len(shards) <= count
+    items = [item for shard in shards for item in seeder.iter_shard(shard)]
+    assert items == list(seeder.iter())
+
+
+@pytest.mark.parametrize("batch_size", [0, 7])
+@pytest.mark.parametrize("shards", [None, 1, 5, 64])
+def test_ordered_shards(tmp_path, batch_size, shards):
+    path = write_csv(tmp_path)
+    expected = run_pipeline(make_seeder(path), make_operators())
+    result = run_pipeline(make_seeder(path), make_operators(), ProcessPipeline, workers=2,
+                          shard_count=shards, batch_size=batch_size)
+    assert result == expected
+
+
+def test_unordered_shards(tmp_path):
+    path = write_csv(tmp_path)
+    expected = run_pipeline(make_seeder(path), make_operators())
+    result = run_pipeline(make_seeder(path), make_operators(), ProcessPipeline, workers=3,
+                          ordered=False, shard_count=9)
+    assert sorted(result, key=lambda item: int(item["id"])) == expected
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_items_sent_to_workers(ordered):
+    items = [{"id": str(index), "kind": f"k{index % 3}"} for index in range(300)]
+    expected = run_pipeline(items, make_operators())
+    result = run_pipeline(items, make_operators(), ProcessPipeline, workers=2,
+                          ordered=ordered, batch_size=16)
+    if not ordered:
+        result.sort(key=lambda item: int(item["id"]))
+    assert result == expected
+
+
+def test_worker_error(tmp_path):
+    with pytest.raises(RuntimeError, match="bad item"):
+        run_pipeline(make_seeder(write_csv(tmp_path)), [Fail()], ProcessPipeline, workers=2)
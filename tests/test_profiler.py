@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of profiled Pipeline runs
+"""
+import json
+
+import pytest
+
+from dfactory.core import OperatorStats, Pipeline
+from dfactory.handlers.filters import Filter
+from dfactory.handlers.matches import KeyMatch
+from tests.helpers import Collect, ListSeeder
+
+ITEMS = [{"id": index, "kind": "abc"[index % 3]} for index in range(100)]
+
+
+def make_pipeline(**options) -> Pipeline:
+    drop = Filter()
+    drop.matcher = KeyMatch("kind", "a")
+    pipeline = Pipeline()
+    pipeline.seeder = ListSeeder(ITEMS)
+    pipeline.operators = [drop, Collect()]
+    for name, value in options.items():
+        setattr(pipeline, name, value)
+    return pipeline
+
+
+def run_plain():
+    pipeline = make_pipeline()
+    pipeline.execute()
+    return pipeline.operators[1].items
+
+
+@pytest.mark.parametrize("options,calls", [
+    ({}, [100, 66]),
+    ({"batch_size": 10}, [10, 10]),
+    ({"compiled": True}, [100, 66]),
+])
+def test_profile(options, calls):
+    pipeline = make_pipeline(**options)
+    operators = list(pipeline.operators)
+    stats = pipeline.run(profile=True)
+    assert pipeline.operators == operators
+    assert operators[1].items == run_plain()
+    assert stats.items == stats.seeder.items_out == 100
+    assert [operator.name for operator in stats.operators] == ["0:Filter", "1:Collect"]
+    assert [operator.calls for operator in stats.operators] == calls
+    assert [operator.items_in for operator in stats.operators] == [100, 66]
+    assert [operator.dropped for operator in stats.operators] == [34, 0]
+    assert stats.elapsed > 0
+
+
+def test_report(tmp_path):
+    path = tmp_path / "report.json"
+    assert make_pipeline().run(report=str(path)) is not None
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["items"] == 100
+    assert report["seeder"]["name"] == "seeder:ListSeeder"
+    assert [operator["items_out"] for operator in report["operators"]] == [66, 66]
+
+
+def test_run_without_profile():
+    assert make_pipeline().run() is None
+
+
+def test_percentile_sample():
+    stats = OperatorStats("op", sample_size=50)
+    for index in range(1000):
+        stats.record(index / 1000, 1, index % 2)
+    assert stats.calls == 1000
+    assert stats.dropped == 500
+    assert len(stats.to_dict()) == 10
+    assert 0.0 <= stats.percentile(50) <= stats.percentile(99) <= 0.999
+    assert stats.percentile(0) == min(stats.percentile(p) for p in range(101))
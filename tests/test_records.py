@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of record files, items written by RecordWriter are read back unchanged
+"""
+import datetime
+import os
+
+import pytest
+
+from dfactory.core import Handler, ProcessPipeline
+from dfactory.seeders import RecordSeeder
+from dfactory.utils.records import decode_records, encode_records, frame_offsets, read_schema
+from dfactory.writers import RecordWriter
+from tests.helpers import run_pipeline
+
+ITEMS = [{"id": index, "name": f"é{index}", "score": index / 8, "tags": ["a"] * (index % 3),
+          "blob": bytes([index % 256]), "none": None} for index in range(1000)]
+MIXED = [dict(item, extra=True) if item["id"] % 10 == 0 else item for item in ITEMS]
+MIXED = [{key: item[key] for key in reversed(list(item))} if item["id"] % 7 == 0 else item
+         for item in MIXED]
+MODES = [{}, {"batch_size": 64}, {"compiled": True}]
+
+
+class Scramble(Handler):
+    """change fields of items after they are written"""
+
+    def handle(self, item: dict) -> dict:
+        item["name"] = "changed"
+        item["tags"] = None
+        return item
+
+
+class Crash(Handler):
+    """raise after limit items, never if limit is 0"""
+
+    def __init__(self, limit: int = 0):
+        super().__init__()
+        self.limit = limit
+        self.seen = 0
+
+    def handle(self, item: dict) -> dict:
+        self.seen += 1
+        if self.limit and self.seen > self.limit:
+            raise RuntimeError("crash")
+        return item
+
+
+class Tagged(RecordWriter):
+    """a subclass changing items in operate"""
+
+    def operate(self, item: dict):
+        return super().operate(dict(item, tagged=True))
+
+
+def write(path: str, items: list, **cfg) -> str:
+    run_pipeline(items, [RecordWriter(path=path, **cfg)])
+    return path
+
+
+@pytest.mark.parametrize("codec", ["marshal", "pickle"])
+@pytest.mark.parametrize("schema", [False, True])
+@pytest.mark.parametrize("items", [ITEMS, MIXED, []], ids=["same", "mixed", "empty"])
+def test_round_trip(tmp_path, codec, schema, items):
+    path = write(str(tmp_path / "out.dfr"), items, codec=codec, schema=schema, batch_size=77)
+    assert list(RecordSeeder(path=path).iter()) == items
+    assert read_schema(path) == (tuple(items[0]) if schema and items else None)
+
+
+@pytest.mark.parametrize("schema", [None, tuple(ITEMS[0])])
+def test_frames(schema):
+    for codec in ("marshal", "pickle"):
+        frame = encode_records(MIXED, schema, codec)
+        assert decode_records(frame[5:], schema) == MIXED
+    with pytest.raises(ValueError):
+        encode_records(ITEMS, schema, "json")
+
+
+def test_pickle_objects(tmp_path):
+    items = [{"when": datetime.date(2020, 1, index + 1), "raw": bytearray(b"x" * 1000 * index),
+              "set": {index}} for index in range(20)]
+    path = write(str(tmp_path / "out.dfr"), items, codec="pickle", batch_size=8)
+    assert list(RecordSeeder(path=path).iter()) == items
+    with pytest.raises(ValueError):
+        write(str(tmp_path / "bad.dfr"), items, codec="marshal")
+
+
+@pytest.mark.parametrize("options", MODES)
+def test_buffered_items_are_copies(tmp_path, options):
+    path = str(tmp_path / "out.dfr")
+    result = run_pipeline(ITEMS, [RecordWriter(path=path, batch_size=100), Scramble()],
+                          **options)
+    assert all(item["name"] == "changed" for item in result)
+    assert list(RecordSeeder(path=path).iter()) == ITEMS
+
+
+@pytest.mark.parametrize("batch_size", [0, 16])
+def test_subclass_operate(tmp_path, batch_size):
+    path = str(tmp_path / "out.dfr")
+    run_pipeline(ITEMS[:50], [Tagged(path=path)], batch_size=batch_size)
+    assert list(RecordSeeder(path=path).iter()) == [dict(item, tagged=True)
+                                                   for item in ITEMS[:50]]
+
+
+@pytest.mark.parametrize("size", [1, 30, 5000])
+def test_batches(tmp_path, size):
+    path = write(str(tmp_path / "out.dfr"), ITEMS, batch_size=64)
+    batches = list(RecordSeeder(path=path).iter_batch(size))
+    assert all(0 < len(batch) <= size for batch in batches)
+    assert [item for batch in batches for item in batch] == ITEMS
+
+
+@pytest.mark.parametrize("stop", [0, 1, 63, 64, 500, 1000])
+@pytest.mark.parametrize("schema", [False, True])
+def test_tell_and_seek(tmp_path, stop, schema):
+    path = write(str(tmp_path / "out.dfr"), ITEMS, batch_size=64, schema=schema)
+    seeder = RecordSeeder(path=path)
+    items = seeder.iter()
+    head = [next(items) for _ in range(stop)]
+    position = seeder.tell()
+    items.close()
+    resumed = RecordSeeder(path=path)
+    resumed.seek(position)
+    assert head + list(resumed.iter()) == ITEMS
+
+
+@pytest.mark.parametrize("count", [1, 3, 16, 100])
+def test_shards(tmp_path, count):
+    path = write(str(tmp_path / "out.dfr"), ITEMS, batch_size=64, schema=True)
+    seeder = RecordSeeder(path=path)
+    shards = seeder.shards(count)
+    assert 0 < len(shards) <= min(count, len(frame_offsets(path)))
+    assert [item for shard in shards for item in seeder.iter_shard(shard)] == ITEMS
+    result = run_pipeline(RecordSeeder(path=path), [], ProcessPipeline, workers=2,
+                          shard_count=count)
+    assert result == ITEMS
+
+
+def test_resume_after_crash(tmp_path):
+    source = write(str(tmp_path / "in.dfr"), ITEMS, batch_size=50)
+    path = str(tmp_path / "out.dfr")
+    checkpoint = str(tmp_path / "job.ckpt")
+    with pytest.raises(RuntimeError):
+        run_pipeline(RecordSeeder(path=source),
+                     [Crash(555), RecordWriter(path=path, batch_size=30, schema=True)],
+                     checkpoint_path=checkpoint, checkpoint_interval=100)
+    run_pipeline(RecordSeeder(path=source),
+                 [Crash(), RecordWriter(path=path, batch_size=30, schema=True)],
+                 checkpoint_path=checkpoint, checkpoint_interval=100)
+    assert list(RecordSeeder(path=path).iter()) == ITEMS
+    assert not os.path.exists(checkpoint)
+
+
+def test_invalid_files(tmp_path):
+    path = tmp_path / "bad.dfr"
+    path.write_bytes(b"not a record file")
+    with pytest.raises(ValueError, match="not a record file"):
+        list(RecordSeeder(path=str(path)).iter())
+    good = write(str(tmp_path / "out.dfr"), ITEMS[:10])
+    with open(good, "rb") as fin:
+        path.write_bytes(fin.read()[:-3])
+    with pytest.raises(ValueError, match="truncated"):
+        list(RecordSeeder(path=str(path)).iter())
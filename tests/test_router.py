@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of Router branches, fan-out and copying of shared items
+"""
+import json
+
+import pytest
+
+from dfactory.core import Handler, Pipeline
+from dfactory.handlers.router import Router
+from tests.helpers import run_pipeline
+
+ITEMS = [{"id": index, "kind": "abc"[index % 3], "seen": []} for index in range(30)]
+MODES = [{}, {"batch_size": 4}, {"compiled": True}]
+
+
+class Tag(Handler):
+    """mark the item with the branch name, in a field and in the nested seen list"""
+
+    def __init__(self):
+        super().__init__()
+        self.name = None
+
+    def load_data(self, cfg: dict):
+        self.name = cfg["name"]
+
+    def handle(self, item: dict) -> dict:
+        item["tag"] = self.name
+        item["seen"].append(self.name)
+        return item
+
+
+def kind_match(kind: str) -> dict:
+    return {"class": "dfactory.handlers.matches.KeyMatch", "key": "kind", "value": kind}
+
+
+def branch(name: str, match: dict = None, mutates: bool = True) -> dict:
+    return {"name": name, "match": match, "mutates": mutates,
+            "handlers": [{"class": "tests.test_router.Tag", "name": name},
+                         {"class": "tests.helpers.Collect"}]}
+
+
+def make_router(**cfg) -> Router:
+    cfg.setdefault("routes", [branch("a", kind_match("a")), branch("ab", {
+        "class": "dfactory.handlers.matches.OrMatch", "a": kind_match("a"), "b": kind_match("b")
+    }), branch("reader", None, False)])
+    cfg.setdefault("default", {"name": "rest", "handlers": [{"class": "tests.helpers.Collect"}]})
+    return Router.from_dict(dict(cfg, **{"class": "dfactory.handlers.router.Router"}))
+
+
+def collected(router: Router) -> dict:
+    return {branch.name: [item["id"] for item in branch.operators[-1].items]
+            for branch in router.branches}
+
+
+@pytest.mark.parametrize("options", MODES)
+def test_first_and_all(options):
+    first = make_router()
+    assert run_pipeline(ITEMS, [first], **options) == []
+    assert collected(first) == {"a": list(range(0, 30, 3)), "ab": list(range(1, 30, 3)),
+                                "reader": list(range(2, 30, 3)), "rest": []}
+    fan_out = make_router(mode="all")
+    run_pipeline(ITEMS, [fan_out], **options)
+    assert collected(fan_out) == {"a": list(range(0, 30, 3)),
+                                  "ab": [i for i in range(30) if i % 3 < 2],
+                                  "reader": list(range(30)), "rest": []}
+
+
+@pytest.mark.parametrize("options", MODES)
+def test_default_and_passthrough(options):
+    router = make_router(routes=[branch("a", kind_match("x"))], passthrough=True)
+    assert run_pipeline(ITEMS, [router], **options) == ITEMS
+    assert collected(router) == {"a": [], "rest": list(range(30))}
+
+
+@pytest.mark.parametrize("options", MODES)
+@pytest.mark.parametrize("copy", ["shallow", "deep"])
+def test_shared_items_are_copied(options, copy):
+    router = make_router(mode="all", copy=copy)
+    run_pipeline(ITEMS, [router], **options)
+    branches = {branch.name: branch.operators[-1].items for branch in router.branches}
+    for item in branches["a"]:
+        assert item["tag"] == "a"
+    for item in branches["ab"]:
+        assert item["tag"] == "ab"
+    assert all("tag" not in item or item["tag"] == "reader" for item in branches["reader"])
+    if copy == "deep":
+        assert [item["seen"] for item in branches["a"]] == [["a"]] * 10
+        assert all(item["seen"] == ["reader"] for item in branches["reader"])
+
+
+def test_branches_config(tmp_path):
+    source = tmp_path / "in.csv"
+    source.write_text("".join(f"{i},{'abc'[i % 3]}\n" for i in range(20)), encoding="utf-8")
+    Pipeline.from_dict({
+        "seeder": {"class": "dfactory.seeders.CsvSeeder", "path": str(source),
+                   "keys": ["id", "kind"]},
+        "branches": [
+            {"match": kind_match("a"),
+             "handlers": [{"class": "dfactory.writers.JsonWriter", "path": str(tmp_path / "a")}]},
+            {"mutates": False,
+             "handlers": [{"class": "dfactory.handlers.sorter.Sorter", "keys": [["id", "desc"]]},
+                          {"class": "dfactory.writers.JsonWriter", "path": str(tmp_path / "all")}]},
+        ],
+    }).run()
+    lines = (tmp_path / "a").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [str(i) for i in range(0, 20, 3)]
+    lines = (tmp_path / "all").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == sorted(map(str, range(20)), reverse=True)
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        make_router(mode="any")
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of generated serializers, output is the same as the generic formatting
+"""
+import json
+
+import pytest
+
+from dfactory.utils.serializers import csv_escape, csv_serializer, json_serializer
+from dfactory.writers import CsvWriter, JsonWriter
+from tests.helpers import run_pipeline
+
+ITEMS = [
+    {"a": 1, "b": "x,\"y\n", "c": 1.5, "d": True, "e": None, "f": [1, {"z": "é"}],
+     "g": float("nan")},
+    {"a": True, "b": 3, "c": 2, "d": 0, "e": "s", "f": {}, "g": 1e300},
+    {"a": -7, "b": "", "c": float("inf"), "d": False, "e": 0.1, "f": " ", "g": -0.0},
+]
+KEYS = list(ITEMS[0])
+TYPES = [{}, {"a": "int", "b": "str", "c": "float", "d": "bool", "g": "float"}]
+
+
+@pytest.mark.parametrize("types", TYPES)
+@pytest.mark.parametrize("item", ITEMS)
+def test_json_serializer_matches_json_dumps(types, item):
+    serialize = json_serializer(KEYS, types)
+    assert serialize(item) == json.dumps({k: item[k] for k in KEYS}, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("types", TYPES)
+@pytest.mark.parametrize("item", ITEMS)
+def test_csv_serializer_matches_join(types, item):
+    serialize = csv_serializer(KEYS, ";", types)
+    assert serialize(item) == ";".join([str(item[k]) for k in KEYS])
+
+
+def test_empty_keys():
+    assert json_serializer([])({"a": 1}) == "{}"
+    assert csv_serializer([])({"a": 1}) == ""
+
+
+def test_csv_escape():
+    escape = csv_escape(",")
+    assert escape("plain") == "plain"
+    assert escape("a,b") == '"a,b"'
+    assert escape('say "hi"') == '"say ""hi"""'
+    assert escape("two\nlines") == '"two\nlines"'
+    serialize = csv_serializer(["a", "b"], ",", {"a": "int"}, escape=True)
+    assert serialize({"a": 1, "b": "x,y"}) == '1,"x,y"'
+
+
+def run_writer(writer, items):
+    writer.__enter__()
+    try:
+        writer.handle(items[0])
+        writer.handle_batch(items[1:])
+    finally:
+        writer.__exit__(None, None, None)
+
+
+@pytest.mark.parametrize("types", TYPES)
+def test_csv_writer_output(tmp_path, types):
+    path = tmp_path / "out.csv"
+    run_writer(CsvWriter(path=str(path), headers=KEYS, types=types), ITEMS)
+    expected = "".join(",".join([str(item[k]) for k in KEYS]) + "\n" for item in ITEMS)
+    assert path.read_text(encoding="utf-8") == ",".join(KEYS) + "\n" + expected
+
+
+@pytest.mark.parametrize("headers", [[], ["a", "b", "g"]])
+@pytest.mark.parametrize("types", TYPES)
+def test_json_writer_output(tmp_path, headers, types):
+    path = tmp_path / "out.jsonl"
+    run_writer(JsonWriter(path=str(path), headers=headers, types=types), ITEMS)
+    keys = headers or KEYS
+    expected = "".join(json.dumps({k: item[k] for k in keys}, ensure_ascii=False) + "\n"
+                       for item in ITEMS)
+    assert path.read_text(encoding="utf-8") == expected
+
+
+@pytest.mark.parametrize("kind", ["csv", "jsonl"])
+@pytest.mark.parametrize("options", [{}, {"batch_size": 2}, {"compiled": True}])
+def test_pipeline_output(tmp_path, kind, options):
+    writer = CsvWriter if kind == "csv" else JsonWriter
+    reference = tmp_path / f"ref.{kind}"
+    output = tmp_path / f"out.{kind}"
+    run_pipeline(ITEMS * 100, [writer(path=str(reference))])
+    result = run_pipeline(ITEMS * 100, [writer(path=str(output), headers=KEYS, types=TYPES[1])],
+                          **options)
+    assert json.dumps(result) == json.dumps(ITEMS * 100)
+    header = (",".join(KEYS) + "\n").encode() if kind == "csv" else b""
+    assert output.read_bytes() == header + reference.read_bytes()
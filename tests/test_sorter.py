@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of Sorter, items are in the order of stable sorts by each key, also after spilling
+"""
+import os
+import random
+
+import pytest
+
+from dfactory.core import ProcessPipeline
+from dfactory.handlers.sorter import Sorter
+from tests.helpers import run_handler, run_pipeline
+
+KEYS = [
+    ["group"],
+    [["group", "desc"]],
+    ["kind", "name"],
+    [["kind", "desc"], ["name", "desc"]],
+    ["kind", ["name", "desc"], "amount"],
+]
+
+
+class Evens(Sorter):
+    """a subclass sorting items of even id only"""
+
+    def handle(self, item: dict):
+        if item["id"] % 2 == 0:
+            super().handle(item)
+
+
+def make_items(count: int = 3000, seed: int = 7):
+    rnd = random.Random(seed)
+    return [{"id": index, "group": rnd.randrange(200), "kind": rnd.choice("abc"),
+             "amount": rnd.choice([None, rnd.randrange(1000)]),
+             "name": rnd.choice([None, "x", "y", "z"])}
+            for index in range(count)]
+
+
+def reference_sort(items, keys):
+    """sort by stable passes, None after other values in ascending order"""
+    result = list(items)
+    for key in reversed(keys):
+        field, descending = (key, False) if isinstance(key, str) else (key[0], key[1] == "desc")
+        result.sort(key=lambda item, f=field: (item[f] is None, item[f]), reverse=descending)
+    return result
+
+
+@pytest.mark.parametrize("keys", KEYS)
+@pytest.mark.parametrize("options", [
+    {},
+    {"buffer_size": 100},
+    {"buffer_size": 100, "merge_width": 3, "codec": "pickle"},
+    {"buffer_size": 500, "workers": 2},
+])
+def test_spill(tmp_path, keys, options):
+    items = make_items()
+    handler = Sorter(keys=keys, spill_dir=str(tmp_path), **options)
+    result = run_handler(handler, items, 64)
+    assert result == reference_sort(items, keys)
+    assert not os.listdir(tmp_path)
+
+
+@pytest.mark.parametrize("keys", KEYS[2:])
+@pytest.mark.parametrize("options", [{}, {"batch_size": 64}, {"compiled": True}])
+def test_pipeline(tmp_path, keys, options):
+    items = make_items()
+    result = run_pipeline(items, [Sorter(keys=keys, buffer_size=700, spill_dir=str(tmp_path))],
+                          **options)
+    assert result == reference_sort(items, keys)
+
+
+def test_process_pipeline():
+    items = make_items()
+    result = run_pipeline(items, [Sorter(keys=KEYS[4])], ProcessPipeline, workers=2)
+    assert result == reference_sort(items, KEYS[4])
+
+
+@pytest.mark.parametrize("batch_size", [0, 16])
+def test_subclass_handle(batch_size):
+    items = make_items(500)
+    result = run_handler(Evens(keys=["group"], buffer_size=100), items, batch_size)
+    assert result == reference_sort([item for item in items if item["id"] % 2 == 0], ["group"])
+
+
+def test_checkpoint_refused(tmp_path):
+    with pytest.raises(ValueError, match="Sorter"):
+        run_pipeline(make_items(10), [Sorter(keys=["id"])],
+                     checkpoint_path=str(tmp_path / "job.ckpt"))
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of SqliteSeeder and SqliteWriter, rows written are read back unchanged
+"""
+import os
+import sqlite3
+
+import pytest
+
+from dfactory.core import Handler, ProcessPipeline
+from dfactory.handlers.matches import KeyMatch
+from dfactory.seeders import SqliteSeeder
+from dfactory.writers import SqliteWriter
+from tests.helpers import run_pipeline
+
+ITEMS = [{"id": index, "name": f"é{index}" if index % 7 else None, "score": index / 8,
+          "data": bytes([index % 256])} for index in range(1000)]
+MODES = [{}, {"batch_size": 64}, {"compiled": True}]
+
+
+class Crash(Handler):
+    """raise after limit items, never if limit is 0"""
+
+    def __init__(self, limit: int = 0):
+        super().__init__()
+        self.limit = limit
+        self.seen = 0
+
+    def handle(self, item: dict) -> dict:
+        self.seen += 1
+        if self.limit and self.seen > self.limit:
+            raise RuntimeError("crash")
+        return item
+
+
+class Upper(SqliteWriter):
+    """a subclass changing rows in operate"""
+
+    def operate(self, item: dict):
+        return super().operate(dict(item, name=(item["name"] or "").upper()))
+
+
+def read_rows(path: str, table: str = "items") -> list:
+    conn = sqlite3.connect(path)
+    try:
+        cursor = conn.execute(f'SELECT * FROM "{table}" ORDER BY rowid')
+        keys = [column[0] for column in cursor.description]
+        return [dict(zip(keys, row)) for row in cursor]
+    finally:
+        conn.close()
+
+
+@pytest.fixture(name="database")
+def fixture_database(tmp_path) -> str:
+    path = str(tmp_path / "data.db")
+    run_pipeline(ITEMS, [SqliteWriter(path=path, table="items", batch_size=100)])
+    return path
+
+
+@pytest.mark.parametrize("options", MODES)
+@pytest.mark.parametrize("batch_size,commit_size", [(1, 1), (10, 25), (10000, 100000)])
+def test_write_round_trip(tmp_path, options, batch_size, commit_size):
+    path = str(tmp_path / "out.db")
+    writer = SqliteWriter(path=path, table="items", batch_size=batch_size,
+                          commit_size=commit_size)
+    assert run_pipeline(ITEMS, [writer], **options) == ITEMS
+    assert read_rows(path) == ITEMS
+    assert run_pipeline(SqliteSeeder(path=path, table="items"), []) == ITEMS
+
+
+@pytest.mark.parametrize("options", MODES)
+def test_keys_match_and_append(tmp_path, options):
+    path = str(tmp_path / "out.db")
+    for _ in range(2):
+        writer = SqliteWriter(path=path, table="items", keys=["id", "missing"])
+        writer.match = KeyMatch("score", [0.5, 1.0])
+        run_pipeline(ITEMS, [writer], **options)
+    assert read_rows(path) == [{"id": 4, "missing": None}, {"id": 8, "missing": None}] * 2
+
+
+def test_upsert(tmp_path):
+    path = str(tmp_path / "out.db")
+    run_pipeline(ITEMS[:10], [SqliteWriter(path=path, table="items", upsert=["id"])])
+    changed = [dict(item, name="new") for item in ITEMS[5:15]]
+    run_pipeline(changed, [SqliteWriter(path=path, table="items", upsert=["id"])],
+                 batch_size=4)
+    assert read_rows(path) == ITEMS[:5] + changed
+
+
+@pytest.mark.parametrize("batch_size", [0, 16])
+def test_subclass_operate(tmp_path, batch_size):
+    path = str(tmp_path / "out.db")
+    run_pipeline(ITEMS[:20], [Upper(path=path, table="items")], batch_size=batch_size)
+    assert [row["name"] for row in read_rows(path)] == \
+        [(item["name"] or "").upper() for item in ITEMS[:20]]
+
+
+@pytest.mark.parametrize("name", ["plain.db", "what?.db", "hash#1.db", "pct%20.db",
+                                  "space é.db"])
+def test_paths_with_uri_characters(tmp_path, name):
+    path = str(tmp_path / name)
+    run_pipeline(ITEMS[:10], [SqliteWriter(path=path, table="items")])
+    assert list(SqliteSeeder(path=path, table="items").iter()) == ITEMS[:10]
+    assert [file for file in os.listdir(tmp_path) if not file.endswith(("-wal", "-shm"))] \
+        == [name]
+
+
+def test_read_only(database):
+    seeder = SqliteSeeder(path=database, query="SELECT 1")
+    conn = seeder.connect()
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM items")
+    conn.close()
+
+
+def test_query(database):
+    seeder = SqliteSeeder.from_dict({"path": database, "params": [10],
+                                     "query": "SELECT id, name FROM items WHERE id < ?"})
+    assert list(seeder.iter()) == [{"id": item["id"], "name": item["name"]}
+                                   for item in ITEMS[:10]]
+    with pytest.raises(ValueError):
+        list(SqliteSeeder(path=database).iter())
+
+
+@pytest.mark.parametrize("size", [1, 7, 5000])
+def test_batches(database, size):
+    batches = list(SqliteSeeder(path=database, table="items").iter_batch(size))
+    assert all(0 < len(batch) <= size for batch in batches)
+    assert [item for batch in batches for item in batch] == ITEMS
+
+
+@pytest.mark.parametrize("stop", [0, 1, 999, 1000])
+def test_tell_and_seek(database, stop):
+    seeder = SqliteSeeder(path=database, table="items", batch_size=64)
+    items = seeder.iter()
+    head = [next(items) for _ in range(stop)]
+    position = seeder.tell()
+    items.close()
+    resumed = SqliteSeeder(path=database, table="items", batch_size=64)
+    resumed.seek(position)
+    assert head + list(resumed.iter()) == ITEMS
+
+
+@pytest.mark.parametrize("count", [1, 3, 64, 5000])
+def test_shards(database, count):
+    seeder = SqliteSeeder(path=database, table="items")
+    shards = seeder.shards(count)
+    assert 0 < len(shards) <= count
+    assert [item for shard in shards for item in seeder.iter_shard(shard)] == ITEMS
+    assert SqliteSeeder(path=database, query="SELECT * FROM items").shards(4) is None
+
+
+def test_process_pipeline(database):
+    result = run_pipeline(SqliteSeeder(path=database, table="items"), [], ProcessPipeline,
+                          workers=2, shard_count=5)
+    assert result == ITEMS
+
+
+def test_resume_after_crash(tmp_path, database):
+    path = str(tmp_path / "out.db")
+    checkpoint = str(tmp_path / "job.ckpt")
+    with pytest.raises(RuntimeError):
+        run_pipeline(SqliteSeeder(path=database, table="items"),
+                     [Crash(555), SqliteWriter(path=path, table="items", batch_size=50)],
+                     checkpoint_path=checkpoint, checkpoint_interval=100)
+    assert 0 < len(read_rows(path)) <= 555
+    run_pipeline(SqliteSeeder(path=database, table="items"),
+                 [Crash(), SqliteWriter(path=path, table="items", batch_size=50)],
+                 checkpoint_path=checkpoint, checkpoint_interval=100)
+    assert read_rows(path) == ITEMS
+    assert not os.path.exists(checkpoint)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+tests of StagedPipeline, stages give the same items as a plain Pipeline
+"""
+import pytest
+
+from dfactory.core import Handler, StagedPipeline
+from dfactory.handlers.converters import DictConverter
+from dfactory.handlers.filters import Filter
+from dfactory.handlers.matches import KeyMatch
+from dfactory.handlers.sorter import Sorter
+from tests.helpers import ListSeeder, run_pipeline
+
+ITEMS = [{"id": index, "kind": "abc"[index % 3]} for index in range(500)]
+
+
+class Fail(Handler):
+    """raise on item 123"""
+
+    def handle(self, item: dict) -> dict:
+        if item["id"] == 123:
+            raise ValueError("bad item")
+        return item
+
+
+def make_operators():
+    drop = Filter()
+    drop.matcher = KeyMatch("kind", "b")
+    return [drop, DictConverter(key="kind", dst="label", mapper={"a": "A"}),
+            Sorter(keys=[["id", "desc"]], buffer_size=100)]
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"batch_size": 7},
+    {"batch_size": 64, "queue_size": 1},
+    {"stages": [1, 2]},
+    {"stages": [0, 1]},
+    {"stages": [3]},
+])
+def test_staged_matches_pipeline(options):
+    expected = run_pipeline(ITEMS, make_operators())
+    assert len(expected) == 333
+    assert run_pipeline(ITEMS, make_operators(), StagedPipeline, **options) == expected
+
+
+def test_group_operators():
+    pipeline = StagedPipeline()
+    pipeline.operators = make_operators()
+    assert [len(group) for group in pipeline.group_operators()] == [2, 1]
+    pipeline.stages = [1]
+    assert [len(group) for group in pipeline.group_operators()] == [1, 1, 1]
+
+
+def test_stage_error():
+    with pytest.raises(ValueError, match="bad item"):
+        run_pipeline(ITEMS, [Fail()] + make_operators(), StagedPipeline, batch_size=10,
+                     queue_size=1)
+
+
+def test_stage_stats():
+    pipeline = StagedPipeline()
+    pipeline.seeder = ListSeeder(ITEMS)
+    pipeline.operators = make_operators()
+    pipeline.batch_size = 50
+    pipeline.execute()
+    stats = pipeline.stage_stats()
+    assert [stage["name"] for stage in stats] == ["seeder", "stage0", "stage1"]
+    assert [stage["items_out"] for stage in stats] == [500, 333, 333]
+    assert [stage["items_in"] for stage in stats] == [500, 500, 333]
+    assert stats[-1]["queue_depth"] is None
+    assert all(0 <= stage["utilization"] for stage in stats)